@@ -0,0 +1,115 @@
+import math
+from typing import Any, Dict, Literal, NamedTuple, Optional
+
+from simulation import ENGINES, AdaptiveEstimate, simulate_adaptive
+
+__all__ = ['BALANCE_SETTINGS', 'BalanceResult', 'TargetNotBracketed', 'find_setting']
+
+# Game settings the win probability of the survivors depends on monotonically
+BALANCE_SETTINGS = (
+    'zombie_count', 'survivor_count', 'hit_chance', 'zombify_chance', 'zombie_variety', 'weapon_variety', 'armor_variety'
+)
+
+
+class TargetNotBracketed(ValueError):
+    """ Raised by `find_setting` if both ends of the range are on the same side of the target """
+    reached: bool  # at both ends, else at neither
+
+    def __init__(self, message: str, reached: bool):
+        super().__init__(message)
+        self.reached = reached
+
+
+class BalanceResult(NamedTuple):
+    """ Outcome of `find_setting`, the bounds belong to the requested confidence """
+    setting: str
+    value: int  # closest to the boundary among the values found to reach the target
+    low: int  # the boundary, the last value that reaches the target, lies between these two
+    high: int
+    win_probability: float  # estimated at `value`
+    runs: int  # battles simulated for all evaluations together
+    evaluations: int  # values of the setting that were simulated
+    borderline: int  # evaluations too close to the target to tell apart, decided by their estimate
+
+
+def find_setting(
+        config: Dict[str, Any],
+        setting: str,
+        low: int,
+        high: int,
+        target: float = 0.95,
+        resolution: int = 1,
+        precision: float = 0.01,
+        confidence: float = 0.95,
+        max_runs: int = 10000,
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        engine: Literal['threads', 'turns', 'pool', 'vectorized', 'buckets', 'shared'] = 'threads',
+        seed: Optional[int] = None
+) -> BalanceResult:
+    """
+    Searches the value of `setting` between `low` and `high` at which the win probability of the survivors
+    crosses `target`, e.g. the smallest `hit_chance` or the largest `zombie_count` that still wins 95% of the time.
+    Noisy bisection: each value is simulated with `simulate_adaptive` until its interval lies on one side of
+    the target, so values far from the boundary take a few dozen runs and only those near it many, a handful of
+    evaluations replace a sweep over the whole range. Values within `precision` of the target, which can't be told
+    apart from it, go by their estimate. The search stops once the boundary is known to `resolution`.
+    Every evaluation uses the same `seed`, the common random numbers keep neighbouring values comparable.
+    """
+    if setting not in BALANCE_SETTINGS:
+        raise ValueError(f'Unknown setting: {setting}')
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown engine: {engine}')
+    if not 0 < target < 1:
+        raise ValueError('The target win probability must lie between 0 and 1')
+    if low >= high or resolution < 1:
+        raise ValueError('The search needs low < high and a resolution of at least 1')
+
+    # Each decision may go wrong with the error rate of the confidence, so all of them together share it
+    decisions = 2 + math.ceil(math.log2(max(1, (high - low) / resolution)))
+    decision_confidence = 1 - (1 - confidence) / decisions
+    estimates: Dict[int, AdaptiveEstimate] = dict()
+
+    def reaches(value: int) -> bool:
+        estimates[value] = simulate_adaptive(
+            dict(config, **{setting: value}),
+            precision=precision,
+            confidence=decision_confidence,
+            max_runs=max_runs,
+            parallel=parallel,
+            max_workers=max_workers,
+            engine=engine,
+            seed=seed,
+            target=target
+        )
+        return estimates[value].win_probability >= target
+
+    # Whether more of the setting helps or hurts the survivors shows at the ends of the range
+    reaching, failing = (low, high) if reaches(low) else (high, low)
+    if reaches(high) == (reaching == low):
+        raise TargetNotBracketed(
+            f'{setting}: the target win probability {target} is reached at '
+            f'{"both ends" if reaching == low else "neither end"} of {low} to {high}',
+            reached=reaching == low
+        )
+
+    while abs(reaching - failing) > resolution:
+        middle = (reaching + failing) // 2
+        if reaches(middle):
+            reaching = middle
+        else:
+            failing = middle
+
+    # The boundary lies between the reaching value and the one next to the failing value
+    step = 1 if reaching > failing else -1
+    bounds = sorted((failing + step, reaching))
+    return BalanceResult(
+        setting=setting,
+        value=reaching,
+        low=bounds[0],
+        high=bounds[1],
+        win_probability=estimates[reaching].win_probability,
+        runs=sum(estimate.runs for estimate in estimates.values()),
+        evaluations=len(estimates),
+        borderline=sum(estimate.low <= target <= estimate.high for estimate in estimates.values())
+    )
@@ -0,0 +1,195 @@
+import json
+import threading
+from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple
+
+import numpy as np
+
+from events import EventSink, Verbosity, render_event
+from models import BaseHumanoid, BattleResult
+from population import HumanoidView
+
+__all__ = ['EVENT_DTYPE', 'KINDS', 'BattleLog', 'BattleLogSink', 'record', 'render_log', 'log_stats']
+
+# One fixed-size record per event, humanoids are referenced by their row in the humanoid table of the log
+EVENT_DTYPE = np.dtype([('tick', '<u8'), ('kind', 'u1'), ('survivor', '<i4'), ('zombie', '<i4')])
+# Index is the kind of a record, summaries keep the index of their message in the zombie field
+KINDS = ('spawn', 'attack', 'kill', 'miss', 'bite', 'evade', 'summary')
+NOBODY = -1
+
+
+class _Logged(BaseHumanoid):
+    """ Stand-in for a humanoid of a log, enough to render the messages about it """
+    __slots__ = ('name', '_hit_modifier', '_defense_modifier')
+
+    def __init__(self, name: str, hit_modifier: int, defense_modifier: int):
+        self.name = name
+        self._hit_modifier = hit_modifier
+        self._defense_modifier = defense_modifier
+
+
+class BattleLog:
+    """
+    Events of a battle as structured array plus the humanoids they refer to.
+    Every humanoid has a name and modifiers, bitten survivors have zombie modifiers besides their human ones.
+    """
+    events: np.ndarray
+    names: List[str]
+    modifiers: np.ndarray  # (hit, defense) while human or for zombies from the start
+    zombie_modifiers: np.ndarray  # (hit, defense) after being bitten, unused for everyone else
+    summaries: List[str]
+
+    def __init__(
+            self,
+            events: np.ndarray,
+            names: List[str],
+            modifiers: np.ndarray,
+            zombie_modifiers: np.ndarray,
+            summaries: List[str]
+    ):
+        self.events = events
+        self.names = names
+        self.modifiers = modifiers
+        self.zombie_modifiers = zombie_modifiers
+        self.summaries = summaries
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as log_file:
+            np.savez_compressed(
+                log_file,
+                events=self.events,
+                modifiers=self.modifiers,
+                zombie_modifiers=self.zombie_modifiers,
+                text=np.array(json.dumps(dict(names=self.names, summaries=self.summaries))),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> 'BattleLog':
+        with np.load(path) as log_file:
+            text = json.loads(str(log_file['text']))
+            return cls(
+                events=log_file['events'],
+                names=text['names'],
+                modifiers=log_file['modifiers'],
+                zombie_modifiers=log_file['zombie_modifiers'],
+                summaries=text['summaries']
+            )
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+
+class BattleLogSink(EventSink):
+    """
+    Records the events of a battle as fixed-size binary records instead of formatting any text,
+    `render_log` narrates them afterwards. Safe to share between the fight threads.
+    """
+    chunk_size: int
+
+    def __init__(self, chunk_size: int = 65536):
+        super().__init__(Verbosity.STORY)
+        self.chunk_size = chunk_size
+        self._chunks: List[np.ndarray] = [np.empty(chunk_size, EVENT_DTYPE)]
+        self._position = 0
+        self._tick = 0
+        self._rows: Dict[int, int] = dict()  # id of a humanoid, or the complement of the row of a view
+        self._humanoids: List[BaseHumanoid] = list()
+        self._modifiers: List[tuple] = list()
+        self._zombie_modifiers: Dict[int, tuple] = dict()
+        self._summaries: List[str] = list()
+        self._lock = threading.Lock()
+
+    def _write_event(self, kind: str, story: bool, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            if kind == 'attack':
+                self._tick += 1
+            survivor = fields.get('survivor')
+            survivor_row = self._row(survivor) if survivor is not None else NOBODY
+            zombie_row = self._row(fields['zombie'])
+            if kind == 'bite':
+                self._zombie_modifiers[survivor_row] = (survivor._hit_modifier, survivor._defense_modifier)
+            self._record(KINDS.index(kind), survivor_row, zombie_row)
+
+    def _write_summary(self, message: str) -> None:
+        with self._lock:
+            self._summaries.append(message)
+            self._record(KINDS.index('summary'), NOBODY, len(self._summaries) - 1)
+
+    def _row(self, humanoid: BaseHumanoid) -> int:
+        # Views are created anew for every access, their row in the population is what stays the same
+        key = ~humanoid.index if isinstance(humanoid, HumanoidView) else id(humanoid)
+        row = self._rows.get(key)
+        if row is None:
+            # Keeping the humanoid also keeps its id from being reused by another object
+            row = self._rows[key] = len(self._humanoids)
+            self._humanoids.append(humanoid)
+            self._modifiers.append((humanoid._hit_modifier, humanoid._defense_modifier))
+        return row
+
+    def _record(self, kind: int, survivor: int, zombie: int) -> None:
+        if self._position == self.chunk_size:
+            self._chunks.append(np.empty(self.chunk_size, EVENT_DTYPE))
+            self._position = 0
+        self._chunks[-1][self._position] = (self._tick, kind, survivor, zombie)
+        self._position += 1
+
+    def log(self) -> BattleLog:
+        """ Everything recorded so far, names nobody needed during the battle are drawn now """
+        with self._lock:
+            events = np.concatenate(self._chunks[:-1] + [self._chunks[-1][:self._position]])
+            zombie_modifiers = np.zeros((len(self._humanoids), 2), dtype=np.int32)
+            for row, modifiers in self._zombie_modifiers.items():
+                zombie_modifiers[row] = modifiers
+            return BattleLog(
+                events=events,
+                names=[humanoid.name for humanoid in self._humanoids],
+                modifiers=np.array(self._modifiers, dtype=np.int32).reshape(-1, 2),
+                zombie_modifiers=zombie_modifiers,
+                summaries=list(self._summaries)
+            )
+
+
+def record(
+        config: Dict[str, Any],
+        engine: Literal['threads', 'turns', 'pool'] = 'threads',
+        seed: Optional[int] = None
+) -> Tuple[BattleResult, BattleLog]:
+    """ Runs a headless battle like `simulation.simulate_once` and returns its log along with the result """
+    from simulation import HEADLESS_ENGINES, simulate_once
+
+    if engine in HEADLESS_ENGINES:
+        raise ValueError(f'The {engine} engine has no events to log')
+    sink = BattleLogSink()
+    result = simulate_once(dict(config, events=sink), engine, seed)
+    return result, sink.log()
+
+
+def render_log(log: BattleLog, story: bool = True) -> Iterator[str]:
+    """ The text the game would have printed for the battle, in storymode or in short """
+    humans = [_Logged(name, int(hit), int(defense)) for name, (hit, defense) in zip(log.names, log.modifiers.tolist())]
+    bitten: Dict[int, _Logged] = dict()
+    for _, kind, survivor, zombie in log.events.tolist():
+        kind = KINDS[kind]
+        if kind == 'summary':
+            yield log.summaries[zombie]
+            continue
+
+        fields = dict(zombie=bitten.get(zombie, humans[zombie]))
+        if survivor != NOBODY:
+            fields['survivor'] = humans[survivor]
+        if kind == 'bite':
+            hit, defense = log.zombie_modifiers[survivor].tolist()
+            bitten[survivor] = _Logged(log.names[survivor], hit, defense)
+        yield from render_event(kind, story, fields)
+
+
+def log_stats(log: BattleLog) -> Dict[str, Any]:
+    """ Counts per kind of event and the kills of every survivor, straight from the records """
+    kinds = np.bincount(log.events['kind'], minlength=len(KINDS))
+    kills = log.events['survivor'][log.events['kind'] == KINDS.index('kill')]
+    kills_by_row = np.bincount(kills, minlength=len(log.names))
+    survivors = np.unique(log.events['survivor'][log.events['survivor'] != NOBODY])
+    return dict(
+        ticks=int(log.events['tick'].max()) if len(log) else 0,
+        events={kind: int(count) for kind, count in zip(KINDS, kinds.tolist())},
+        kills={log.names[row]: int(kills_by_row[row]) for row in survivors.tolist()},
+    )
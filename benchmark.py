@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from itertools import count, product
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from events import EventSink, StreamSink, Verbosity
+from main import ZombieSurvival
+from models import Humanoid, name_pool
+from sharded import ZOMBIE_POOLS
+
+__all__ = ['run_benchmarks', 'compare', 'main']
+
+Results = Dict[str, Dict[str, float]]
+
+ZOMBIE_COUNTS = (100, 1000, 10000)
+SURVIVOR_COUNTS = (5, 50)
+ENGINES = ('threads', 'turns', 'pool')
+
+
+class _Discard:
+    def write(self, text: str) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+
+class CountingGame(ZombieSurvival):
+    """ Counts the attacks without any events, so silent battles are timed on the path headless runs take """
+    attacks: Iterator[int]
+
+    def __init__(self):
+        super().__init__()
+        self.attacks = count()
+
+    def _fight_round(self, *args: Any, **kwargs: Any) -> bool:
+        next(self.attacks)  # atomic for the fight threads
+        return super()._fight_round(*args, **kwargs)
+
+
+def _game(
+        zombie_count: int,
+        survivor_count: int,
+        storymode: bool,
+        engine: str = 'threads',
+        zombie_pool: str = 'queue'
+) -> CountingGame:
+    game = CountingGame()
+    game.zombie_count = zombie_count
+    game.survivor_count = survivor_count
+    game.storymode = storymode
+    game.engine = engine
+    game.zombie_pool = zombie_pool
+    game.seed = 1
+    # In storymode every message is rendered like the game would, otherwise the battle is silent
+    game.events = StreamSink(_Discard(), Verbosity.STORY) if storymode else EventSink()
+    return game
+
+
+def _measure(function: Callable[[], float], repeat: int) -> Tuple[float, int]:
+    """ Best rate of `repeat` runs and the peak memory of one more, the function returns how much it did """
+    best_rate = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operations = function()
+        best_rate = max(best_rate, operations / max(time.perf_counter() - start, 1e-9))
+
+    tracemalloc.start()
+    function()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best_rate, peak_memory
+
+
+def run_benchmarks(
+        zombie_counts=ZOMBIE_COUNTS,
+        survivor_counts=SURVIVOR_COUNTS,
+        engines=ENGINES,
+        zombie_pools=ZOMBIE_POOLS,
+        repeat: int = 3
+) -> Results:
+    results: Results = dict()
+    name_pool.draw(0)  # reads the name files, once per process, which no measurement should pay for
+
+    def record(name: str, unit: str, function: Callable[[], float]) -> None:
+        rate, peak_memory = _measure(function, repeat)
+        results[name] = {unit: rate, 'peak_memory': peak_memory}
+        print(f'{name:<63} {rate:>14,.0f} {unit:<18} {peak_memory / 1024:>10,.0f} KiB')
+
+    for size in zombie_counts:
+        def construct(size=size) -> float:
+            zombies = [
+                Humanoid(hit_chance=30, is_zombie=True, zombie_variety=5, name=str(number))
+                for number in range(size)
+            ]
+            return len(zombies)
+        record(f'humanoid zombies={size}', 'humanoids/s', construct)
+
+    for zombie_count, survivor_count, storymode in product(zombie_counts, survivor_counts, (False, True)):
+        label = f'zombies={zombie_count} survivors={survivor_count} storymode={storymode}'
+
+        def setup(zombie_count=zombie_count, survivor_count=survivor_count, storymode=storymode) -> float:
+            _game(zombie_count, survivor_count, storymode)._setup_game()
+            return 1
+        record(f'setup {label}', 'setups/s', setup)
+
+        for engine, zombie_pool in product(engines, zombie_pools):
+            def fight(zombie_count=zombie_count, survivor_count=survivor_count, storymode=storymode, engine=engine,
+                      zombie_pool=zombie_pool):
+                game = _game(zombie_count, survivor_count, storymode, engine, zombie_pool)
+                game._setup_game()
+                game._start_fights()
+                return next(game.attacks)
+            # The queue keeps the names of the measurements in older baselines
+            pool = '' if zombie_pool == 'queue' else f' {zombie_pool}'
+            record(f'fight {engine}{pool} {label}', 'attacks/s', fight)
+
+    return results
+
+
+def compare(results: Results, baseline: Results, tolerance: float) -> List[str]:
+    """ Names of all measurements which got slower or hungrier than the baseline allows """
+    regressions = []
+    for name, measurement in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric, value in measurement.items():
+            expected = reference.get(metric)
+            if not expected:
+                continue
+            if metric == 'peak_memory':
+                if value > expected * (1 + tolerance):
+                    regressions.append(f'{name}: {metric} {value:,.0f} > {expected:,.0f}')
+            elif value < expected * (1 - tolerance):
+                regressions.append(f'{name}: {metric} {value:,.0f} < {expected:,.0f}')
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks for the setup and the fight engines')
+    parser.add_argument('--baseline', default='benchmark-baseline.json', help='JSON file with earlier results')
+    parser.add_argument('--save', action='store_true', help='store the results as new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown')
+    parser.add_argument('--quick', action='store_true', help='only the smallest scenarios')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        results = run_benchmarks(ZOMBIE_COUNTS[:1], SURVIVOR_COUNTS[:1], repeat=args.repeat)
+    else:
+        results = run_benchmarks(repeat=args.repeat)
+
+    if args.save:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+        print(f'Baseline saved to {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}, run with --save to create one')
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        regressions = compare(results, json.load(baseline_file), args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
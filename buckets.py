@@ -0,0 +1,151 @@
+from time import perf_counter
+from typing import Optional
+
+import numpy as np
+
+from models import BattleResult, bound_chance
+from simulation import battle_settings
+
+__all__ = ['BucketBattle']
+
+
+def _chance(hit_chance: np.ndarray) -> np.ndarray:
+    """ Probability of `randint(1, 100) < hit_chance`, the roll every attack of `ZombieSurvival` makes """
+    return np.minimum(np.maximum((hit_chance - 1) / 100, 0.0), 1.0)
+
+
+class BucketBattle:
+    """
+    Fight engine for hordes of look-alikes: humanoids with the same modifiers are only counted, not stored.
+    Survivors are counted per weapon, armor and whether they evaded once, zombies per hit modifier, so memory
+    and setup don't grow with the horde. Every round pairs each living survivor with a random zombie and resolves
+    the attacks of a bucket with binomial draws, following the rules of `Humanoid` like `VectorizedBattle`.
+    Unlike the queue of the other engines the horde has no order, zombies that were missed mix back in.
+    Nobody is named, battles that are narrated need one of the engines with humanoids.
+    """
+    rng: np.random.Generator
+    zombify_chance: int
+    zombie_variety: int
+
+    # survivors[weapon, armor, evaded] counts the living survivors with that hit and defense modifier
+    survivors: np.ndarray
+    survivor_hit_chance: np.ndarray  # same shape, the chance of a survivor in the bucket
+    survivor_defense: np.ndarray
+    # zombies[i] counts the zombies with hit modifier i - zombie_variety
+    zombies: np.ndarray
+    zombie_hit_chance: np.ndarray
+
+    rounds: int
+    attacks: int
+
+    def __init__(
+            self,
+            zombie_count: int,
+            survivor_count: int,
+            hit_chance: int,
+            zombify_chance: int,
+            zombie_variety: int = 0,
+            weapon_variety: int = 0,
+            armor_variety: int = 0,
+            rng: Optional[np.random.Generator] = None
+    ):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.zombify_chance = bound_chance(zombify_chance)
+        self.zombie_variety = zombie_variety or 0
+        weapon_variety = weapon_variety or 0
+        armor_variety = armor_variety or 0
+
+        # Weapon and armor are drawn independently and uniformly for every survivor, as for `Humanoid`
+        shape = (weapon_variety + 1, armor_variety + 1)
+        self.survivors = np.zeros(shape + (2,), dtype=np.int64)
+        self.survivors[..., 0] = self._spread(survivor_count, shape[0] * shape[1]).reshape(shape)
+        weapon, armor, evaded = np.indices(self.survivors.shape)
+        self.survivor_hit_chance = bound_chance(hit_chance) + weapon + 3 * evaded
+        self.survivor_defense = armor
+
+        self.zombie_hit_chance = self.zombify_chance + np.arange(-self.zombie_variety, self.zombie_variety + 1)
+        self.zombies = self._new_zombies(zombie_count)
+
+        self.rounds = 0
+        self.attacks = 0
+
+    @classmethod
+    def from_game(cls, game, rng: Optional[np.random.Generator] = None) -> 'BucketBattle':
+        """ Builds a battle from the settings of a `ZombieSurvival` instance """
+        return cls(**battle_settings(game), rng=rng)
+
+    def run(self) -> BattleResult:
+        start_time = perf_counter()
+        while self.zombies.sum() and self._fight_round():
+            pass
+
+        survivors_left = int(self.survivors.sum())
+        return BattleResult(
+            winner='survivors' if survivors_left else 'zombies',
+            survivors_left=survivors_left,
+            zombies_left=int(self.zombies.sum()),
+            duration=perf_counter() - start_time
+        )
+
+    def _fight_round(self) -> bool:
+        """ Resolves one round, returns False once no survivor is left """
+        rng = self.rng
+        alive = self.survivors.ravel()
+        survivor_count = int(alive.sum())
+        if not survivor_count:
+            return False
+
+        count = min(survivor_count, int(self.zombies.sum()))
+        # Not enough zombies for everyone, so pick the attackers at random
+        attackers = alive if count == survivor_count else self._draw(alive, count)
+        unmatched = self._draw(self.zombies, count)
+        self.rounds += 1
+        self.attacks += count
+
+        # matched[bucket] counts the zombies the survivors of the bucket fight, none is fought twice
+        buckets = np.flatnonzero(attackers)
+        matched = np.empty((buckets.size, self.zombies.size), dtype=np.int64)
+        for position, bucket in enumerate(buckets.tolist()):
+            matched[position] = self._draw(unmatched, int(attackers[bucket]))
+            unmatched = unmatched - matched[position]
+
+        # Survivors attack zombies
+        kills = rng.binomial(matched, _chance(self.survivor_hit_chance.ravel()[buckets])[:, np.newaxis])
+        # Zombies attack survivors
+        misses = matched - kills
+        bite_chance = _chance(self.zombie_hit_chance - self.survivor_defense.ravel()[buckets][:, np.newaxis])
+        bites = rng.binomial(misses, bite_chance).sum(axis=1)
+        evaded = np.zeros_like(alive)
+        evaded[buckets] = misses.sum(axis=1) - bites
+
+        self.zombies -= kills.sum(axis=0)
+        if bites.any():
+            self.zombies += self._new_zombies(int(bites.sum()))
+        alive[buckets] -= bites
+        # Whoever evaded for the first time moves over to the bucket with the bonus
+        first_evasions = evaded.reshape(self.survivors.shape)[..., 0]
+        self.survivors[..., 0] -= first_evasions
+        self.survivors[..., 1] += first_evasions
+        return True
+
+    def _draw(self, counts: np.ndarray, size: int) -> np.ndarray:
+        """ Counts per bucket of `size` members drawn at random without replacement """
+        total = int(counts.sum())
+        if size == total:
+            return counts.copy()
+        filled = np.flatnonzero(counts)
+        if filled.size == 1:
+            drawn = np.zeros_like(counts)
+            drawn[filled] = size
+            return drawn
+        if total < 10 ** 9:
+            return self.rng.multivariate_hypergeometric(counts, size)
+        # Too many for numpy to draw without replacement, but then a round barely changes the proportions
+        return np.minimum(self.rng.multinomial(size, counts / total), counts)
+
+    def _new_zombies(self, count: int) -> np.ndarray:
+        return self._spread(count, 2 * self.zombie_variety + 1)
+
+    def _spread(self, count: int, buckets: int) -> np.ndarray:
+        """ Counts of `count` uniform draws out of `buckets` values """
+        return self.rng.multinomial(count, np.full(buckets, 1 / buckets))
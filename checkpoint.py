@@ -0,0 +1,172 @@
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from models import BaseHumanoid, BattleResult, Humanoid
+from population import HumanoidView, Population, PopulationQueue
+from rng import restore_rng, rng_state
+
+__all__ = ['SETTINGS', 'save_checkpoint', 'load_checkpoint', 'resume']
+
+# Everything of a `ZombieSurvival` a resumed battle has to know besides the humanoids
+SETTINGS = (
+    'zombie_count', 'survivor_count', 'hit_chance', 'zombify_chance',
+    'storymode', 'zombie_variety', 'weapon_variety', 'armor_variety',
+    'compact', 'seed', 'engine', 'checkpoint_path', 'checkpoint_interval', 'zombie_pool',
+)
+
+
+def _population_of(game) -> Tuple[Population, np.ndarray]:
+    """
+    The humanoids of a game as population, with the rows of the queued zombies in queue order. In the object
+    mode the survivors come first, then zombies with a name of their own, then the spawned zombies at the row
+    of their number, which names them like in the compact mode, so only real names are stored.
+    Killed zombies leave their rows empty.
+    """
+    if isinstance(game.zombies, PopulationQueue):
+        ring = game.zombies.queue
+        return game.zombies.population, ring.ring[(ring.head + np.arange(ring.size)) % ring.ring.size]
+
+    queued: List[BaseHumanoid] = list(game.zombies.queue)
+    rows = {id(survivor): row for row, survivor in enumerate(game.survivors)}
+    named: List[BaseHumanoid] = []
+    numbered: Dict[int, BaseHumanoid] = dict()
+    for zombie in queued:
+        if id(zombie) in rows:
+            continue
+        name = zombie._name
+        number = int(name) if name is not None and name.isdecimal() else 0
+        if 1 <= number <= game.zombie_count and number not in numbered:
+            numbered[number] = zombie
+        else:
+            named.append(zombie)
+
+    humanoids = list(game.survivors) + named
+    numbered_from = len(humanoids)
+    rows.update((id(zombie), row) for row, zombie in enumerate(named, len(game.survivors)))
+    rows.update((id(zombie), numbered_from + number - 1) for number, zombie in numbered.items())
+    humanoids.extend(numbered.values())
+    members = np.array([rows[id(humanoid)] for humanoid in humanoids], dtype=np.int64)
+
+    population = Population(numbered_from + max(numbered, default=0), numbered_from=numbered_from)
+    population.base_chance[members] = [humanoid._hit_chance for humanoid in humanoids]
+    population.hit_modifier[members] = [humanoid._hit_modifier for humanoid in humanoids]
+    population.defense_modifier[members] = [humanoid._defense_modifier for humanoid in humanoids]
+    population.zombie[members] = [humanoid._zombie for humanoid in humanoids]
+    population.evaded[members] = [humanoid.evaded for humanoid in humanoids]
+    # Names nobody asked for yet stay undrawn
+    population.names = {
+        row: humanoid._name for row, humanoid in enumerate(humanoids[:numbered_from]) if humanoid._name is not None
+    }
+    return population, np.array([rows[id(zombie)] for zombie in queued], dtype=np.int64)
+
+
+def save_checkpoint(game, path: str) -> None:
+    """
+    Writes the whole state of a battle between two rounds to a `.npz` file: every humanoid as columns,
+    the order of the zombie queue, the random state and the fight time so far.
+    """
+    population, queue_rows = _population_of(game)
+    if isinstance(game.zombies, PopulationQueue):
+        survivor_rows = np.array([survivor.index for survivor in game.survivors], dtype=np.int64)
+    else:
+        survivor_rows = np.arange(len(game.survivors), dtype=np.int64)
+
+    settings = {name: getattr(game, name) for name in SETTINGS}
+    if not isinstance(game.seed, int):
+        settings['seed'] = None  # a SeedSequence of a batch run, the random state below covers it
+    rng = rng_state(game.rng)
+    # The block of drawn numbers of a seeded stream is stored as floats, not as text
+    rng_block = np.array(rng['stream'].pop('block') if rng['kind'] == 'stream' else [], dtype=np.float64)
+    state = dict(
+        settings=settings,
+        rng=rng,
+        elapsed=(datetime.now() - game._fights_started).total_seconds(),
+        numbered_from=population.numbered_from,
+    )
+    named_rows = np.array(sorted(population.names), dtype=np.int64)
+
+    # Write aside and rename, a crash while saving must not destroy the previous checkpoint
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'wb') as checkpoint_file:
+        np.savez(
+            checkpoint_file,
+            state=np.frombuffer(json.dumps(state).encode(), dtype=np.uint8),
+            rng_block=rng_block,
+            base_chance=population.base_chance,
+            hit_modifier=population.hit_modifier,
+            defense_modifier=population.defense_modifier,
+            zombie=population.zombie,
+            evaded=population.evaded,
+            named_rows=named_rows,
+            names=np.array([population.names[row] for row in named_rows.tolist()], dtype=str),
+            survivor_rows=survivor_rows,
+            queue_rows=queue_rows,
+        )
+    os.replace(temporary_path, path)
+
+
+def load_checkpoint(path: str, **options: Any):
+    """ `ZombieSurvival` in the state of the checkpoint, `options` override settings like `events` """
+    from main import ZombieSurvival
+
+    with np.load(path) as checkpoint:
+        saved_state = checkpoint['state']
+        # Checkpoints of earlier versions hold the state as text, with the random block inside
+        state: Dict[str, Any] = json.loads(str(saved_state) if saved_state.dtype.kind == 'U' else saved_state.tobytes())
+        columns = {name: checkpoint[name] for name in checkpoint.files if name != 'state'}
+
+    game = ZombieSurvival()
+    for name, value in state['settings'].items():
+        setattr(game, name, value)
+    for name, value in options.items():
+        if not hasattr(game, name):
+            raise ValueError(f'Unknown setting: {name}')
+        setattr(game, name, value)
+    if state['rng']['kind'] == 'stream' and 'rng_block' in columns:
+        state['rng']['stream']['block'] = columns['rng_block'].tolist()
+    game.rng = restore_rng(state['rng'])
+    game.resumed_elapsed = timedelta(seconds=state['elapsed'])
+
+    population = Population(len(columns['zombie']), numbered_from=state['numbered_from'])
+    for name in ('base_chance', 'hit_modifier', 'defense_modifier', 'zombie', 'evaded'):
+        getattr(population, name)[:] = columns[name]
+    population.names = dict(zip(columns['named_rows'].tolist(), columns['names'].tolist()))
+
+    survivor_rows = columns['survivor_rows'].tolist()
+    if game.compact:
+        game.survivors = [HumanoidView(population, row) for row in survivor_rows]
+        game.zombies = PopulationQueue(population)
+        for row in columns['queue_rows'].tolist():
+            game.zombies.put(HumanoidView(population, row))
+        return game
+
+    # Only the rows still in the battle, a bitten survivor stays one object in both places
+    humanoids = {row: _humanoid(population, row) for row in survivor_rows}
+    game.survivors = [humanoids[row] for row in survivor_rows]
+    game.zombies = game._zombie_queue()
+    for row in columns['queue_rows'].tolist():
+        humanoid = humanoids.get(row)
+        game.zombies.put(humanoid if humanoid is not None else _humanoid(population, row))
+    return game
+
+
+def _humanoid(population: Population, row: int) -> Humanoid:
+    name = population.names.get(row)
+    if name is None and population.numbered_from is not None and row >= population.numbered_from:
+        name = str(row - population.numbered_from + 1)
+    humanoid = Humanoid(hit_chance=int(population.base_chance[row]), name=name)
+    humanoid._hit_modifier = int(population.hit_modifier[row])
+    humanoid._defense_modifier = int(population.defense_modifier[row])
+    humanoid._zombie = bool(population.zombie[row])
+    humanoid.evaded = bool(population.evaded[row])
+    return humanoid
+
+
+def resume(path: str, **options: Any) -> BattleResult:
+    """ Continues a battle from its checkpoint, a seeded battle ends exactly like it would have without the break """
+    game = load_checkpoint(path, **options)
+    return game._result(game._start_fights())
@@ -0,0 +1,473 @@
+import argparse
+import csv
+import json
+import sys
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Sequence, TextIO
+
+from balance import BALANCE_SETTINGS, BalanceResult, TargetNotBracketed, find_setting
+from battlelog import BattleLog, log_stats, record, render_log
+from checkpoint import resume
+from events import EventSink, JsonlSink, Verbosity
+from jobqueue import JobQueue, work
+from main import ZombieSurvival
+from models import BattleResult
+from sharded import ZOMBIE_POOLS
+from simulation import (
+    ENGINES, HEADLESS_ENGINES, AdaptiveEstimate, simulate_adaptive, simulate_once, simulate_stream, spawn_seeds
+)
+from storage import ResultStore, ResultWriter
+from validators import validate_chance, validate_count, validate_int, validate_variety
+
+__all__ = ['SETTINGS', 'FORMATS', 'parse_number', 'validate_settings', 'load_scenario', 'write_results', 'main']
+
+# Game settings a scenario may contain, checked with the same rules as the settings menu
+SETTINGS: Dict[str, Callable[[str], Any]] = {
+    'zombie_count': validate_count,
+    'survivor_count': validate_count,
+    'hit_chance': validate_chance,
+    'zombify_chance': validate_chance,
+    'zombie_variety': validate_variety,
+    'weapon_variety': validate_variety,
+    'armor_variety': validate_variety,
+}
+# Options of the batch itself, which are allowed in a scenario as well
+RUN_OPTIONS: Dict[str, Callable[[str], Any]] = {
+    'runs': validate_count,
+    'seed': validate_variety,
+    'workers': validate_count,
+}
+FLAGS = ('compact', 'parallel')
+# Options with a fixed set of values
+CHOICES: Dict[str, Sequence[str]] = {
+    'engine': ENGINES,
+    'zombie_pool': ZOMBIE_POOLS,
+}
+FRACTIONS = ('precision', 'confidence')  # of the adaptive mode
+FORMATS = ('text', 'json', 'jsonl', 'csv')
+FIELDS = ('run',) + BattleResult._fields
+
+
+def parse_number(value: Any) -> str:
+    """ Accepts scientific notation like `1e6` for whole numbers, so big hordes are easy to type """
+    text = str(value).strip()
+    if isinstance(validate_int(text), int):
+        return text
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return str(int(number)) if number.is_integer() else text
+
+
+def validate_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """ Checks settings and run options, raises a ValueError naming the first invalid one """
+    validated: Dict[str, Any] = dict()
+    for name, value in settings.items():
+        if name in CHOICES:
+            if value not in CHOICES[name]:
+                raise ValueError(f'{name}: {value} (erlaubt: {", ".join(CHOICES[name])})')
+            validated[name] = value
+            continue
+        if name in FRACTIONS:
+            try:
+                fraction = float(value)
+            except ValueError:
+                fraction = None
+            if fraction is None or not 0 < fraction < 1:
+                raise ValueError(f'{name}: Bitte gebe eine Zahl zwischen 0 und 1 an')
+            validated[name] = fraction
+            continue
+        if name in FLAGS:
+            if not isinstance(value, bool):
+                raise ValueError(f'{name}: Bitte gebe true oder false an')
+            validated[name] = value
+            continue
+
+        validator = SETTINGS.get(name) or RUN_OPTIONS.get(name)
+        if validator is None:
+            raise ValueError(f'Unbekannte Einstellung: {name}')
+        text = parse_number(value)
+        result = validator(text)
+        if result is not True:
+            raise ValueError(f'{name}: {result}')
+        validated[name] = int(text)
+    return validated
+
+
+def load_scenario(path: str) -> Dict[str, Any]:
+    """ Reads a scenario from a JSON or, with a `.toml` suffix, TOML file with the setting names as keys """
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ValueError('TOML-Szenarien brauchen Python 3.11 oder das Paket tomli') from None
+        with open(path, 'rb') as scenario_file:
+            scenario = tomllib.load(scenario_file)
+    else:
+        with open(path) as scenario_file:
+            scenario = json.load(scenario_file)
+
+    if not isinstance(scenario, dict):
+        raise ValueError(f'Das Szenario {path} muss eine Tabelle mit Einstellungen enthalten')
+    return validate_settings(scenario)
+
+
+def _summary(results: Sequence[BattleResult]) -> Dict[str, Any]:
+    if isinstance(results, ResultStore):
+        return results.summary()
+    runs = len(results)
+    survivor_wins = sum(1 for result in results if result.winner == 'survivors')
+    return dict(
+        runs=runs,
+        survivor_wins=survivor_wins,
+        win_rate=survivor_wins / runs if runs else 0.0,
+        mean_survivors_left=sum(result.survivors_left for result in results) / runs if runs else 0.0,
+        mean_zombies_left=sum(result.zombies_left for result in results) / runs if runs else 0.0,
+        mean_duration=sum(result.duration for result in results) / runs if runs else 0.0,
+    )
+
+
+def write_results(
+        results: Sequence[BattleResult],
+        output_format: str,
+        stream: TextIO,
+        settings: Optional[Dict[str, Any]] = None
+) -> None:
+    """ Writes the results as German summary text, one JSON document, JSON lines or CSV """
+    if output_format == 'jsonl':
+        for run, result in enumerate(results, 1):
+            stream.write(json.dumps(dict(run=run, **result._asdict())) + '\n')
+    elif output_format == 'csv':
+        writer = csv.writer(stream, lineterminator='\n')
+        writer.writerow(FIELDS)
+        writer.writerows((run,) + tuple(result) for run, result in enumerate(results, 1))
+    elif output_format == 'json':
+        json.dump(dict(
+            settings=settings or dict(),
+            summary=_summary(results),
+            results=[dict(run=run, **result._asdict()) for run, result in enumerate(results, 1)]
+        ), stream, indent=2)
+        stream.write('\n')
+    else:
+        summary = _summary(results)
+        stream.write(
+            f'Läufe: {summary["runs"]}\n'
+            f'Gewinner Überlebende: {summary["survivor_wins"]} ({summary["win_rate"]:.1%})\n'
+            f'Überlebende im Schnitt: {summary["mean_survivors_left"]:.2f}\n'
+            f'Zombies im Schnitt: {summary["mean_zombies_left"]:.2f}\n'
+            f'Dauer im Schnitt: {summary["mean_duration"]:.6f}s\n'
+        )
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Zombie Survival, without a command the interactive game starts')
+    commands = parser.add_subparsers(dest='command')
+
+    simulate = commands.add_parser('simulate', help='run battles without prompts')
+    simulate.set_defaults(handler=_simulate)
+    simulate.add_argument('--config', help='JSON or TOML scenario file, the options below take precedence')
+    simulate.add_argument('--zombies', dest='zombie_count', help='e.g. 1e6')
+    simulate.add_argument('--survivors', dest='survivor_count')
+    simulate.add_argument('--hit-chance', dest='hit_chance')
+    simulate.add_argument('--zombify-chance', dest='zombify_chance')
+    simulate.add_argument('--zombie-variety', dest='zombie_variety')
+    simulate.add_argument('--weapon-variety', dest='weapon_variety')
+    simulate.add_argument('--armor-variety', dest='armor_variety')
+    simulate.add_argument('--runs')
+    simulate.add_argument('--seed')
+    simulate.add_argument('--engine', choices=ENGINES)
+    simulate.add_argument('--zombie-pool', dest='zombie_pool', choices=ZOMBIE_POOLS, help='to compare the pools')
+    simulate.add_argument('--compact', action='store_const', const=True, help='column store for huge hordes')
+    simulate.add_argument('--parallel', action='store_const', const=True, help='spread the runs over all cores')
+    simulate.add_argument('--workers', help='processes of --parallel')
+    simulate.add_argument('--precision', help='adaptive mode: stop once the win rate is known to +/- this, e.g. 0.005')
+    simulate.add_argument('--confidence', help='of the adaptive mode, 0.95 unless given')
+    simulate.add_argument('--format', choices=FORMATS, default='text')
+    simulate.add_argument('--output', help='file to write to instead of stdout')
+    simulate.add_argument('--store', help='directory of a columnar result store to append the results to')
+    simulate.add_argument('--checkpoint', help='save a single battle of the turns engine regularly to this file')
+    simulate.add_argument('--checkpoint-interval', type=float, default=60.0, help='seconds between checkpoints')
+    simulate.add_argument('--log', help='record every event of a single battle to this file, see narrate')
+    simulate.add_argument('--events-jsonl', dest='events_jsonl', help='write every event of a single battle as JSON lines')
+
+    resume_battle = commands.add_parser('resume', help='continue a battle from its checkpoint')
+    resume_battle.set_defaults(handler=_resume)
+    resume_battle.add_argument('checkpoint')
+    resume_battle.add_argument('--format', choices=FORMATS, default='text')
+    resume_battle.add_argument('--output', help='file to write to instead of stdout')
+
+    submit = commands.add_parser('submit', help='add the points of a sweep to a job queue for worker')
+    submit.set_defaults(handler=_submit)
+    submit.add_argument('queue', help='SQLite file of the job queue, created if missing')
+    submit.add_argument('--config', help='JSON or TOML scenario with the settings every point shares')
+    submit.add_argument('--vary', action='append', default=[], metavar='SETTING=A,B',
+                        help='values of a setting to sweep, e.g. hit_chance=40,60, may be repeated')
+    submit.add_argument('--runs')
+    submit.add_argument('--seed')
+    submit.add_argument('--engine', choices=ENGINES)
+
+    worker = commands.add_parser('worker', help='simulate the jobs of a queue until none is left')
+    worker.set_defaults(handler=_worker)
+    worker.add_argument('queue', help='SQLite file of the job queue')
+    worker.add_argument('--lease', type=float, default=300.0, help='seconds until the job of a dead worker is retried')
+    worker.add_argument('--poll-interval', type=float, default=5.0, help='seconds between looking for jobs to retry')
+    worker.add_argument('--max-jobs', type=int, help='stop after this many jobs')
+
+    balance = commands.add_parser('balance', help='search the value of a setting where the win rate crosses a target')
+    balance.set_defaults(handler=_balance)
+    balance.add_argument('setting', choices=BALANCE_SETTINGS)
+    balance.add_argument('low', help='range to search, e.g. 1 and 100 for hit_chance')
+    balance.add_argument('high')
+    balance.add_argument('--target', type=float, default=0.95, help='win rate of the survivors, 0.95 unless given')
+    balance.add_argument('--config', help='JSON or TOML scenario with the other settings')
+    balance.add_argument('--resolution', type=int, default=1, help='stop once the value is known to this')
+    balance.add_argument('--precision', help='win rates this close to the target count as reached, 0.01 unless given')
+    balance.add_argument('--confidence', help='of the whole search, 0.95 unless given')
+    balance.add_argument('--runs', help='most runs per value, 10000 unless given')
+    balance.add_argument('--seed')
+    balance.add_argument('--engine', choices=ENGINES)
+    balance.add_argument('--parallel', action='store_const', const=True, help='spread the runs over all cores')
+    balance.add_argument('--workers', help='processes of --parallel')
+    balance.add_argument('--format', choices=('text', 'json'), default='text')
+    balance.add_argument('--output', help='file to write to instead of stdout')
+
+    narrate = commands.add_parser('narrate', help='tell the story of a battle recorded with simulate --log')
+    narrate.set_defaults(handler=_narrate)
+    narrate.add_argument('log')
+    narrate.add_argument('--short', action='store_true', help='the short messages instead of the story')
+    narrate.add_argument('--stats', action='store_true', help='counts of the events as JSON instead of the text')
+    narrate.add_argument('--limit', type=int, help='stop after this many lines')
+    narrate.add_argument('--output', help='file to write to instead of stdout')
+    return parser
+
+
+def _simulate(args: argparse.Namespace) -> None:
+    options = load_scenario(args.config) if args.config else dict()
+    options.update(validate_settings({
+        name: value for name, value in vars(args).items()
+        if value is not None and (
+            name in SETTINGS or name in RUN_OPTIONS or name in FLAGS or name in FRACTIONS or name in CHOICES
+        )
+    }))
+
+    settings = {name: value for name, value in options.items() if name in SETTINGS}
+    if options.get('compact'):
+        settings['compact'] = True
+    if 'zombie_pool' in options:
+        settings['zombie_pool'] = options['zombie_pool']
+    if args.checkpoint:
+        _check_single_battle(options, '--checkpoint')
+        if options.setdefault('engine', 'turns') != 'turns':
+            raise ValueError('--checkpoint geht nur mit der turns-Engine')
+        settings.update(checkpoint_path=args.checkpoint, checkpoint_interval=args.checkpoint_interval)
+    if args.log or args.events_jsonl:
+        _check_single_battle(options, '--log' if args.log else '--events-jsonl')
+    if args.events_jsonl:
+        with open(args.events_jsonl, 'w') as stream:
+            sink = JsonlSink(stream)
+            result = simulate_once(
+                dict(settings, events=sink), options.get('engine', 'threads'), next(iter(spawn_seeds(options.get('seed'), 1)))
+            )
+            sink.flush()
+        _write(args, [result], options)
+        return
+    if args.log:
+        result, log = record(settings, options.get('engine', 'threads'), next(iter(spawn_seeds(options.get('seed'), 1))))
+        log.save(args.log)
+        _write(args, [result], options)
+        return
+    if 'precision' in options:
+        _write_estimate(args, simulate_adaptive(
+            settings,
+            precision=options['precision'],
+            confidence=options.get('confidence', 0.95),
+            max_runs=options.get('runs', 100000),
+            parallel=options.get('parallel', False),
+            max_workers=options.get('workers'),
+            engine=options.get('engine', 'threads'),
+            seed=options.get('seed')
+        ), options)
+        return
+
+    results = simulate_stream(
+        settings,
+        runs=options.get('runs', 1),
+        parallel=options.get('parallel', False),
+        max_workers=options.get('workers'),
+        engine=options.get('engine', 'threads'),
+        seed=options.get('seed')
+    )
+    if args.store:
+        # Appends to an existing store, so batches can be split over several calls
+        with ResultWriter(args.store) as writer:
+            writer.extend(results)
+        results = ResultStore(args.store)
+    else:
+        results = list(results)
+    _write(args, results, options)
+
+
+def _check_single_battle(options: Dict[str, Any], option: str) -> None:
+    """ Options that follow the events of one battle, which only the engines with humanoids have """
+    if options.get('runs', 1) != 1 or 'precision' in options:
+        raise ValueError(f'{option} geht nur mit einer einzelnen Schlacht')
+    if options.get('engine') in HEADLESS_ENGINES:
+        raise ValueError(f'{option} braucht eine Engine mit Humanoiden: threads, turns oder pool')
+
+
+def _write_estimate(args: argparse.Namespace, estimate: AdaptiveEstimate, options: Dict[str, Any]) -> None:
+    if args.format == 'json':
+        text = json.dumps(dict(settings=options, estimate=estimate._asdict()), indent=2) + '\n'
+    elif args.format == 'text':
+        text = (
+            f'Läufe: {estimate.runs}{"" if estimate.converged else " (Genauigkeit nicht erreicht)"}\n'
+            f'Siegchance Überlebende: {estimate.win_probability:.2%} '
+            f'({estimate.low:.2%} bis {estimate.high:.2%})\n'
+            f'Überlebende im Schnitt: {estimate.survivors_left:.2f} ± {estimate.survivors_left_error:.2f}\n'
+            f'Zombies im Schnitt: {estimate.zombies_left:.2f} ± {estimate.zombies_left_error:.2f}\n'
+        )
+    else:
+        raise ValueError('--precision unterstützt nur die Formate text und json')
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+def _resume(args: argparse.Namespace) -> None:
+    result = resume(args.checkpoint, events=EventSink(Verbosity.SILENT), storymode=False)
+    _write(args, [result], dict(checkpoint=args.checkpoint))
+
+
+def _submit(args: argparse.Namespace) -> None:
+    options = load_scenario(args.config) if args.config else dict()
+    options.update(validate_settings({
+        name: value for name, value in vars(args).items()
+        if value is not None and (name in RUN_OPTIONS or name == 'engine')
+    }))
+    grid: Dict[str, Sequence[Any]] = {
+        name: [value] for name, value in options.items() if name in SETTINGS or name in ('compact', 'zombie_pool')
+    }
+    for variation in args.vary:
+        name, _, values = variation.partition('=')
+        if name not in SETTINGS:
+            raise ValueError(f'--vary: {variation} (z.B. hit_chance=40,60)')
+        grid[name] = [validate_settings({name: value})[name] for value in values.split(',')]
+
+    with JobQueue(args.queue) as queue:
+        ids = queue.submit(grid, options.get('runs', 1), options.get('engine', 'threads'), options.get('seed'))
+        counts = queue.counts()
+    sys.stdout.write(f'Aufträge hinzugefügt: {len(ids)}, offen: {counts["pending"]}\n')
+
+
+def _worker(args: argparse.Namespace) -> None:
+    with JobQueue(args.queue, lease_seconds=args.lease) as queue:
+        completed = work(queue, poll_interval=args.poll_interval, max_jobs=args.max_jobs)
+        counts = queue.counts()
+    sys.stdout.write(
+        f'Aufträge erledigt: {completed}, insgesamt fertig: {counts["done"]}, fehlgeschlagen: {counts["failed"]}\n'
+    )
+
+
+def _balance(args: argparse.Namespace) -> None:
+    options = load_scenario(args.config) if args.config else dict()
+    options.update(validate_settings({
+        name: value for name, value in vars(args).items()
+        if value is not None and (name in RUN_OPTIONS or name in FLAGS or name in FRACTIONS or name == 'engine')
+    }))
+    settings = {name: value for name, value in options.items() if name in SETTINGS}
+    low = validate_settings({args.setting: args.low})[args.setting]
+    high = validate_settings({args.setting: args.high})[args.setting]
+    if low >= high:
+        raise ValueError(f'{args.setting}: Der Anfang {low} muss kleiner als das Ende {high} sein')
+    if not 0 < args.target < 1:
+        raise ValueError('--target: Bitte gebe eine Zahl zwischen 0 und 1 an')
+    if args.resolution < 1:
+        raise ValueError('--resolution: Bitte gebe eine Zahl ab 1 an')
+    try:
+        result = find_setting(
+            settings,
+            args.setting,
+            low=low,
+            high=high,
+            target=args.target,
+            resolution=args.resolution,
+            precision=options.get('precision', 0.01),
+            confidence=options.get('confidence', 0.95),
+            max_runs=options.get('runs', 10000),
+            parallel=options.get('parallel', False),
+            max_workers=options.get('workers'),
+            engine=options.get('engine', 'threads'),
+            seed=options.get('seed')
+        )
+    except TargetNotBracketed as error:
+        where = 'an beiden Enden' if error.reached else 'an keinem Ende'
+        raise ValueError(
+            f'{args.setting}: Die Siegchance {args.target:.0%} wird {where} von {low} bis {high} erreicht'
+        ) from None
+    _write_balance(args, result, settings)
+
+
+def _write_balance(args: argparse.Namespace, result: BalanceResult, settings: Dict[str, Any]) -> None:
+    if args.format == 'json':
+        text = json.dumps(dict(settings=settings, target=args.target, result=result._asdict()), indent=2) + '\n'
+    else:
+        bounds = '' if result.low == result.high else f' (Grenze zwischen {result.low} und {result.high})'
+        text = (
+            f'{result.setting}: {result.value}{bounds}\n'
+            f'Siegchance Überlebende: {result.win_probability:.2%} (Ziel: {args.target:.2%})\n'
+            f'Läufe: {result.runs} für {result.evaluations} Werte'
+            f'{f", davon {result.borderline} zu knapp am Ziel" if result.borderline else ""}\n'
+        )
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+def _narrate(args: argparse.Namespace) -> None:
+    log = BattleLog.load(args.log)
+    if args.stats:
+        lines = [json.dumps(log_stats(log), ensure_ascii=False, indent=2)]
+    else:
+        lines = islice(render_log(log, story=not args.short), args.limit)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.writelines(f'{line}\n' for line in lines)
+    else:
+        sys.stdout.writelines(f'{line}\n' for line in lines)
+
+
+def _write(args: argparse.Namespace, results: Sequence[BattleResult], options: Dict[str, Any]) -> None:
+    if args.output:
+        with open(args.output, 'w', newline='') as output:
+            write_results(results, args.format, output, options)
+    else:
+        write_results(results, args.format, sys.stdout, options)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        ZombieSurvival().run()
+    else:
+        try:
+            args.handler(args)
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
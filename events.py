@@ -0,0 +1,134 @@
+import json
+import sys
+import threading
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+__all__ = ['Verbosity', 'EventSink', 'PrintSink', 'StreamSink', 'JsonlSink', 'render_event']
+
+
+class Verbosity(IntEnum):
+    SILENT = 0
+    SUMMARY = 1  # only the outcome of a battle
+    STORY = 2  # every single attack
+
+
+STORY_MESSAGES: Dict[str, Tuple[str, ...]] = {
+    'spawn': ('Zombie {zombie.name}: "Grrrrr"',),
+    'attack': ('{survivor} greift den Zombie {zombie} an.',),
+    'kill': ('*Klatsch* {survivor.name} erschlägt den Zombie {zombie.name}.',),
+    'miss': ('{survivor.name}: "Mist!"',),
+    'bite': (
+        '{survivor.name} wird von Zombie {zombie.name} gebissen und verwandelt sich.',
+        'Zombie {survivor.name}: "Grrrrr"',
+    ),
+    'evade': ('{survivor.name}: "Juhu"',),
+}
+
+SHORT_MESSAGES: Dict[str, Tuple[str, ...]] = {
+    'spawn': ('Grrrrr',),
+    'attack': (),
+    'kill': ('Klatsch',),
+    'miss': ('Mist!',),
+    'bite': ('Grrrrr',),
+    'evade': ('Juhu',),
+}
+
+
+def render_event(kind: str, story: bool, fields: Dict[str, Any]) -> List[str]:
+    """ Turns an event into the lines of text the game always printed for it """
+    messages = STORY_MESSAGES if story else SHORT_MESSAGES
+    return [message.format(**fields) for message in messages[kind]]
+
+
+class EventSink:
+    """
+    Receives everything a battle has to tell. Messages are only formatted if the verbosity asks for them,
+    this base class drops everything and serves as silent sink.
+    """
+    verbosity: Verbosity
+
+    def __init__(self, verbosity: Verbosity = Verbosity.SILENT):
+        self.verbosity = verbosity
+
+    def event(self, kind: str, story: bool = False, **fields: Any) -> None:
+        """ Something happened during the fight, e.g. `kill` with the `survivor` and `zombie` involved """
+        if self.verbosity >= Verbosity.STORY:
+            self._write_event(kind, story, fields)
+
+    def summary(self, message: str) -> None:
+        if self.verbosity >= Verbosity.SUMMARY:
+            self._write_summary(message)
+
+    def flush(self) -> None:
+        pass
+
+    def _write_event(self, kind: str, story: bool, fields: Dict[str, Any]) -> None:
+        pass
+
+    def _write_summary(self, message: str) -> None:
+        pass
+
+
+class PrintSink(EventSink):
+    """ Prints every line right away, used for the interactive game """
+
+    def __init__(self, verbosity: Verbosity = Verbosity.STORY):
+        super().__init__(verbosity)
+
+    def _write_event(self, kind: str, story: bool, fields: Dict[str, Any]) -> None:
+        for line in render_event(kind, story, fields):
+            print(line)
+
+    def _write_summary(self, message: str) -> None:
+        print(message)
+
+
+class StreamSink(EventSink):
+    """ Collects lines and writes them to the stream in batches, so fight threads don't wait on I/O """
+    stream: TextIO
+    buffer_size: int
+    _buffer: List[str]
+    _lock: threading.Lock
+
+    def __init__(
+            self,
+            stream: Optional[TextIO] = None,
+            verbosity: Verbosity = Verbosity.STORY,
+            buffer_size: int = 1000
+    ):
+        super().__init__(verbosity)
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self._buffer = list()
+        self._lock = threading.Lock()
+
+    def flush(self) -> None:
+        with self._lock:
+            lines, self._buffer = self._buffer, list()
+            if lines:
+                self.stream.write('\n'.join(lines) + '\n')
+                self.stream.flush()
+
+    def _write_event(self, kind: str, story: bool, fields: Dict[str, Any]) -> None:
+        self._append(render_event(kind, story, fields))
+
+    def _write_summary(self, message: str) -> None:
+        self._append([message])
+
+    def _append(self, lines: List[str]) -> None:
+        self._buffer.extend(lines)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+
+class JsonlSink(StreamSink):
+    """ Writes one JSON object per event or summary line, humanoids are referenced by name """
+
+    def _write_event(self, kind: str, story: bool, fields: Dict[str, Any]) -> None:
+        event = dict(event=kind)
+        event.update((key, getattr(value, 'name', value)) for key, value in fields.items())
+        self._append([json.dumps(event, ensure_ascii=False)])
+
+    def _write_summary(self, message: str) -> None:
+        self._append([json.dumps(dict(event='summary', message=message), ensure_ascii=False)])
@@ -0,0 +1,208 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from models import BattleResult
+from simulation import ENGINES, simulate_many
+from sweep import SweepPoint, expand_grid
+
+__all__ = ['Job', 'JobQueue', 'work']
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    settings TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    seed INTEGER,
+    runs INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    results TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+'''
+STATUSES = ('pending', 'running', 'done', 'failed')
+
+
+class Job(NamedTuple):
+    id: int
+    settings: Dict[str, Any]
+    engine: str
+    seed: Optional[int]
+    runs: int
+    attempts: int  # this claim included
+
+
+class JobQueue:
+    """
+    Sweep points waiting to be simulated, in a SQLite file that any number of workers share, also across hosts
+    as long as the file system supports locking. No broker is involved: a worker claims a job in an immediate
+    transaction and holds a lease on it, once the lease expires, e.g. because the worker died, the job is
+    handed out again. Jobs that fail or lose their lease `max_attempts` times are given up.
+    """
+    path: str
+    lease_seconds: float
+    max_attempts: int
+
+    def __init__(self, path: str, lease_seconds: float = 300.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Autocommit, every write below starts its own transaction
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> 'JobQueue':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def submit(
+            self,
+            grid: Dict[str, Sequence[Any]],
+            runs: int = 1,
+            engine: str = 'threads',
+            seed: Optional[int] = None
+    ) -> List[int]:
+        """ Adds a job for every point of the grid, each runs like `sweep.sweep` with the same arguments """
+        if engine not in ENGINES:
+            raise ValueError(f'Unknown engine: {engine}')
+        ids = []
+        with self._transaction():
+            for settings in expand_grid(grid):
+                cursor = self._connection.execute(
+                    'INSERT INTO jobs (settings, engine, seed, runs) VALUES (?, ?, ?, ?)',
+                    (json.dumps(settings, sort_keys=True), engine, seed, runs)
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """ Leases the oldest pending job, or one whose lease expired, to `worker` """
+        now = time.time()
+        with self._transaction():
+            # Expired leases of jobs which used up their attempts aren't worth another try
+            self._connection.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired', worker = NULL "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            row = self._connection.execute(
+                "SELECT id, settings, engine, seed, runs, attempts FROM jobs "
+                "WHERE status = 'pending' OR (status = 'running' AND lease_expires < ?) ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, settings, engine, seed, runs, attempts = row
+            self._connection.execute(
+                "UPDATE jobs SET status = 'running', attempts = ?, worker = ?, lease_expires = ? WHERE id = ?",
+                (attempts + 1, worker, now + self.lease_seconds, job_id)
+            )
+        return Job(job_id, json.loads(settings), engine, seed, runs, attempts + 1)
+
+    def renew(self, job_id: int, worker: str) -> bool:
+        """ Extends the lease, False if the job isn't leased to `worker` anymore """
+        cursor = self._connection.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time() + self.lease_seconds, job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, results: List[BattleResult]) -> bool:
+        """ Stores the results, False if the lease was lost and someone else took over the job """
+        cursor = self._connection.execute(
+            "UPDATE jobs SET status = 'done', results = ?, lease_expires = NULL "
+            "WHERE id = ? AND worker = ? AND status = 'running'",
+            (json.dumps([result._asdict() for result in results]), job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str) -> None:
+        """ Gives the job back for another attempt, or gives up on it after `max_attempts` """
+        self._connection.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, worker = NULL, lease_expires = NULL WHERE id = ? AND worker = ? AND status = 'running'",
+            (self.max_attempts, error, job_id, worker)
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """ Jobs per status, expired leases still count as running """
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(self._connection.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        return counts
+
+    def results(self) -> Iterator[SweepPoint]:
+        """ The finished points in the order they were submitted """
+        for settings, results in self._connection.execute(
+                "SELECT settings, results FROM jobs WHERE status = 'done' ORDER BY id"
+        ):
+            yield SweepPoint(
+                settings=json.loads(settings),
+                results=[BattleResult(**result) for result in json.loads(results)],
+                cached=False
+            )
+
+    def _transaction(self) -> 'sqlite3.Connection':
+        """ Takes the write lock right away, so two workers never read the same pending job """
+        self._connection.execute('BEGIN IMMEDIATE')
+        return self._connection
+
+
+def _keep_leased(path: str, lease_seconds: float, job_id: int, worker: str, done: threading.Event) -> None:
+    """ Renews the lease of a running job until it's done, with its own connection for its own thread """
+    queue = JobQueue(path, lease_seconds)
+    try:
+        while not done.wait(lease_seconds / 3):
+            if not queue.renew(job_id, worker):
+                return
+    finally:
+        queue.close()
+
+
+def work(
+        queue: JobQueue,
+        worker: Optional[str] = None,
+        poll_interval: float = 5.0,
+        max_jobs: Optional[int] = None
+) -> int:
+    """
+    Claims and simulates jobs until none is left, returns how many were completed. While others still hold
+    leases it waits, their jobs come back if they die. The lease is renewed as long as a job is simulated.
+    """
+    worker = worker or f'{socket.gethostname()}:{os.getpid()}'
+    completed = 0
+    while max_jobs is None or completed < max_jobs:
+        job = queue.claim(worker)
+        if job is None:
+            if not queue.counts()['running']:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        done = threading.Event()
+        lease = threading.Thread(
+            target=_keep_leased, args=(queue.path, queue.lease_seconds, job.id, worker, done), daemon=True
+        )
+        lease.start()
+        try:
+            results = simulate_many(job.settings, job.runs, engine=job.engine, seed=job.seed)
+        except Exception as error:
+            queue.fail(job.id, worker, f'{type(error).__name__}: {error}')
+            continue
+        finally:
+            done.set()
+            lease.join()
+        completed += queue.complete(job.id, worker, results)
+    return completed
@@ -1,19 +1,72 @@
 #!/usr/bin/env python3
-import random
+import os
 import threading
+import time
+from collections import deque
+from contextlib import nullcontext
 from datetime import datetime, timedelta
-from queue import Queue
-from typing import Optional, List, NoReturn, Literal
+from queue import Queue, Empty
+from time import perf_counter
+from typing import Any, Callable, ContextManager, Dict, Optional, List, NoReturn, Literal
+
+from checkpoint import save_checkpoint
+from events import EventSink, PrintSink, Verbosity
+from metrics import BattleMetrics, SurvivorStats
+from models import BaseHumanoid, Humanoid, BattleResult
+from population import Population, PopulationQueue
+from rng import RandomSource, Seed, make_rng, numpy_generator, spawn_rngs
+from sharded import ShardedZombiePool
+from stats import BatchSummary
+from validators import validate_variety, validate_count, validate_chance
 
-from PyInquirer import prompt, Separator
 
-from models import Humanoid
-from validators import validate_variety, validate_count, validate_chance
+def prompt(questions: Any) -> Dict[str, Any]:
+    """ Asks PyInquirer, which is imported (with prompt_toolkit) only once the interactive menu is shown """
+    from PyInquirer import prompt as inquirer_prompt
+    return inquirer_prompt(questions)
+
+
+def separator() -> Any:
+    """ Line between the choices of a menu, imported like `prompt` once the menu is shown """
+    from PyInquirer import Separator
+    return Separator()
+
+
+class ZombiesInFight:
+    """
+    Counts the zombies taken from the pool until they are killed or back in it, so a fight thread that finds
+    the pool empty can tell whether a zombie may still return. The lock only guards the counter,
+    taking and returning zombies is left to the pool and its own locking.
+    """
+    count: int  # includes zombies about to be taken, so the pool is never empty behind our back
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def take(self, zombies: 'Queue[BaseHumanoid]') -> Optional[BaseHumanoid]:
+        """ Takes a zombie, None if one might still return, raises `Empty` once the pool stays empty """
+        with self._lock:
+            self.count += 1
+        try:
+            return zombies.get_nowait()
+        except Empty:
+            with self._lock:
+                self.count -= 1
+                # With no other zombie taken or in a fight the pool can't fill up again
+                if not self.count and zombies.empty():
+                    raise
+            return None
+
+    def done(self) -> None:
+        """ The zombie of `take` is dead or back in the pool, as is the survivor it bit """
+        with self._lock:
+            self.count -= 1
 
 
 class ZombieSurvival:
-    zombies: 'Queue[Humanoid]'
-    survivors: List[Humanoid]
+    zombies: 'Queue[BaseHumanoid]'
+    survivors: List[BaseHumanoid]
 
     # Base options
     zombie_count: int
@@ -27,6 +80,22 @@ class ZombieSurvival:
     weapon_variety: Optional[int]
     armor_variety: Optional[int]
 
+    # output and headless options
+    events: EventSink
+    compact: bool  # keep all humanoids in a column store instead of one object each
+    seed: Seed  # makes the setup and the random draws of each fight reproducible
+    engine: Literal['threads', 'turns', 'pool']  # one thread per survivor, turns in one thread or a pool of threads
+    workers: int  # threads of the pool engine
+    zombie_pool: Literal['queue', 'sharded']  # holds the zombies unless `compact`, see `sharded.ShardedZombiePool`
+    rng: RandomSource
+    metrics: Optional[BattleMetrics]  # instrumentation of the last battle, skipped entirely while None
+    checkpoint_path: Optional[str]  # the turns engine saves the battle there, see `checkpoint.resume`
+    checkpoint_interval: float  # seconds between two checkpoints
+    resumed_elapsed: timedelta  # fight time before the checkpoint this battle was resumed from
+    _fights_started: Optional[datetime]  # start of the running fights, moved back by `resumed_elapsed`
+    _in_fight: ZombiesInFight  # shared by the fight threads
+    history: Optional[BatchSummary]  # battles of `start` since the settings last changed
+
     def __init__(self):
         self.zombies = Queue()
         self.survivors = list()
@@ -41,6 +110,21 @@ class ZombieSurvival:
         self.weapon_variety = 0
         self.armor_variety = 0
 
+        self.events = PrintSink()
+        self.compact = False
+        self.seed = None
+        self.rng = make_rng(self.seed)
+        self.engine = 'threads'
+        self.workers = min(32, (os.cpu_count() or 1) + 4)
+        self.zombie_pool = 'queue'
+        self.metrics = None
+        self.checkpoint_path = None
+        self.checkpoint_interval = 60.0
+        self.resumed_elapsed = timedelta(0)
+        self._fights_started = None
+        self._in_fight = ZombiesInFight()
+        self.history = None
+
     def run(self):
         while True:
             selection = self._show_menu()
@@ -52,73 +136,173 @@ class ZombieSurvival:
                 exit(0)
 
     def start(self):
-        if self.storymode:
-            print('Die Nacht bricht an und die Zombies regen sich...')
+        if self.metrics is not None:
+            self.metrics.reset()
 
-        self._setup_game()
+        with self._phase('setup'):
+            if self.storymode:
+                self.events.summary('Die Nacht bricht an und die Zombies regen sich...')
+            self._setup_game()
+
+        with self._phase('fights'):
+            execution_time = self._start_fights()
 
-        execution_time = self._start_fights()
+        with self._phase('report'):
+            self._report(execution_time)
 
+    def _report(self, execution_time: timedelta) -> None:
         if self.storymode:
-            print(f'Nach grade mal {round(execution_time.total_seconds())} Stunde(n) ist die Schlacht vorbei.')
+            self.events.summary(f'Nach grade mal {round(execution_time.total_seconds())} Stunde(n) ist die Schlacht vorbei.')
         else:
-            print(f'Dauer: {execution_time}')
+            self.events.summary(f'Dauer: {execution_time}')
 
         if any(self.survivors):
             survived = [s for s in self.survivors if s]
             if self.storymode:
                 died = [s for s in self.survivors if not s]
                 if len(survived) == 1:
-                    print('Nur ein Überlebender steht noch:')
+                    self.events.summary('Nur ein Überlebender steht noch:')
                 else:
-                    print(f'{len(survived)} haben überlebt, darunter sind:')
+                    self.events.summary(f'{len(survived)} haben überlebt, darunter sind:')
                 for survivor in survived:
-                    print(f'  {survivor}')
+                    self.events.summary(f'  {survivor}')
                 if died:
-                    print(f'{len(died)} sind gefallen, ihre Namen sind:')
+                    self.events.summary(f'{len(died)} sind gefallen, ihre Namen sind:')
                     for dead_survivor in died:
-                        print(f'  † {dead_survivor}')
+                        self.events.summary(f'  † {dead_survivor}')
             else:
-                print('Gewinner: Überlebende')
-                print(f'Anzahl: {len(survived)}')
+                self.events.summary('Gewinner: Überlebende')
+                self.events.summary(f'Anzahl: {len(survived)}')
         else:
-            zombies_alive: List[Humanoid] = list(self.zombies.queue)
+            zombies_alive = self.zombies.qsize()  # counted, not listed, a big horde would be copied otherwise
             if self.storymode:
-                print('Leider überwältigten die Zombies alle Überlebenden.')
-                print(f'So streifen jetzt {len(zombies_alive)} Zombies weiter durch das Land.')
+                self.events.summary('Leider überwältigten die Zombies alle Überlebenden.')
+                self.events.summary(f'So streifen jetzt {zombies_alive} Zombies weiter durch das Land.')
             else:
-                print('Gewinner: Zombies')
-                print(f'Anzahl: {len(zombies_alive)}')
+                self.events.summary('Gewinner: Zombies')
+                self.events.summary(f'Anzahl: {zombies_alive}')
+
+        self._report_history(self._result(execution_time))
+        self.events.flush()
+
+    def _report_history(self, result: BattleResult) -> None:
+        """ Sums up all battles since the settings last changed, once there is more than one """
+        if self.history is None:
+            self.history = BatchSummary(self.zombie_count, self.survivor_count)
+        kills = None
+        if self.metrics is not None:
+            kills = [self.metrics.survivor(survivor).kills for survivor in self.survivors]
+        self.history.add(result, kills)
+
+        if self.history.runs < 2:
+            return
+        if self.storymode:
+            self.events.summary(
+                f'Von {self.history.runs} Nächten haben die Überlebenden {self.history.survivor_wins} überstanden.'
+            )
+        else:
+            self.events.summary(
+                f'Schlachten: {self.history.runs}, Siegquote Überlebende: {self.history.win_rate:.1%}, '
+                f'Überlebende im Schnitt: {self.history.survivors_left.mean:.2f}, '
+                f'Zombies im Schnitt: {self.history.zombies_left.mean:.2f}'
+            )
 
-    def _setup_game(self) -> NoReturn:
-        # setup Surviors
-        self.survivors = [
-            Humanoid(hit_chance=self.hit_chance, armor_variety=self.armor_variety, weapon_variety=self.weapon_variety)
-            for _ in range(0, self.survivor_count)
-        ]
+    def simulate(self) -> BattleResult:
+        """ Runs one battle without prompts or a final report and returns its outcome """
+        if self.metrics is not None:
+            self.metrics.reset()
+        with self._phase('setup'):
+            self._setup_game()
+        with self._phase('fights'):
+            execution_time = self._start_fights()
+        return self._result(execution_time)
+
+    def _result(self, execution_time: timedelta) -> BattleResult:
+        survivors_left = sum(1 for s in self.survivors if s)
+        return BattleResult(
+            winner='survivors' if survivors_left else 'zombies',
+            survivors_left=survivors_left,
+            zombies_left=self.zombies.qsize(),
+            duration=execution_time.total_seconds()
+        )
+
+    def _phase(self, name: str) -> ContextManager[None]:
+        return self.metrics.phase(name) if self.metrics is not None else nullcontext()
 
-        # setup Zombies
-        self.zombies = Queue()
-        for _ in range(0, self.zombie_count):
-            zombie = Humanoid(
-                hit_chance=self.zombify_chance,
-                is_zombie=True,
+    def _setup_game(self) -> NoReturn:
+        self.rng = make_rng(self.seed)
+
+        if self.compact:
+            population = Population.create(
+                survivor_count=self.survivor_count,
+                zombie_count=self.zombie_count,
+                hit_chance=self.hit_chance,
+                zombify_chance=self.zombify_chance,
                 zombie_variety=self.zombie_variety,
-                name=str(_ + 1)
+                weapon_variety=self.weapon_variety,
+                armor_variety=self.armor_variety,
+                rng=numpy_generator(self.rng)
             )
-            if self.storymode:
-                print(f'Zombie {zombie.name}: "Grrrrr"')
-            else:
-                print('Grrrrr')
+            self.survivors = [population[index] for index in range(0, self.survivor_count)]
+            zombies = (population[index] for index in range(self.survivor_count, len(population)))
+            self.zombies = PopulationQueue(population)
+        else:
+            # setup Surviors
+            self.survivors = [
+                Humanoid(
+                    hit_chance=self.hit_chance,
+                    armor_variety=self.armor_variety,
+                    weapon_variety=self.weapon_variety,
+                    rng=self.rng
+                )
+                for _ in range(0, self.survivor_count)
+            ]
+            zombies = (
+                Humanoid(
+                    hit_chance=self.zombify_chance,
+                    is_zombie=True,
+                    zombie_variety=self.zombie_variety,
+                    name=str(_ + 1),
+                    rng=self.rng
+                )
+                for _ in range(0, self.zombie_count)
+            )
+            self.zombies = self._zombie_queue()
+
+        # setup Zombies
+        narrate = self.events.verbosity >= Verbosity.STORY
+        for zombie in zombies:
+            if narrate:
+                self.events.event('spawn', self.storymode, zombie=zombie)
             self.zombies.put(zombie)
 
+    def _zombie_queue(self) -> Queue:
+        """ Empty pool for the zombies of the object mode, with a shard per worker if sharded """
+        if self.zombie_pool == 'sharded':
+            return ShardedZombiePool(max(1, self.workers))
+        return Queue()
+
     def _start_fights(self) -> timedelta:
-        start_time = datetime.now()
+        start_time = datetime.now() - self.resumed_elapsed
+        self._fights_started = start_time
+        self.resumed_elapsed = timedelta(0)  # only the resumed battle continues the old time, not the next one
+        if self.metrics is not None:
+            self.metrics.fights_started = perf_counter()
+        if self.engine == 'turns':
+            self._fight_turns()
+        elif self.engine == 'pool':
+            self._fight_pool()
+        else:
+            self._fight_threads()
+        return datetime.now() - start_time
+
+    def _fight_threads(self) -> None:
         fights: List[threading.Thread] = []
-        for survivor in self.survivors:
+        # Every fight draws from its own stream, a seeded stream isn't safe to share between threads
+        for survivor, rng in zip(self.survivors, spawn_rngs(self.rng, len(self.survivors))):
             fight = threading.Thread(
                 target=self._fight_execution,
-                kwargs=dict(survivor=survivor)
+                kwargs=dict(survivor=survivor, rng=rng)
             )
             fights.append(fight)
             fight.start()
@@ -127,47 +311,159 @@ class ZombieSurvival:
         for fight in fights:
             fight.join()
 
-        return datetime.now() - start_time
+    def _fight_turns(self) -> None:
+        """
+        Lets all Survivors attack one after another in a single thread, one Zombie per turn.
+        With a `checkpoint_path` the battle is saved between two rounds, where all survivors still fight.
+        """
+        narrate = self.events.verbosity >= Verbosity.STORY
+        metrics = self.metrics
+        next_checkpoint = perf_counter() + self.checkpoint_interval if self.checkpoint_path else None
+        fighting = [survivor for survivor in self.survivors if survivor]
+        while fighting:
+            if next_checkpoint is not None and perf_counter() >= next_checkpoint:
+                save_checkpoint(self, self.checkpoint_path)
+                next_checkpoint = perf_counter() + self.checkpoint_interval
+            still_fighting = []
+            for survivor in fighting:
+                if self.zombies.empty():
+                    return
+                if metrics is None:
+                    stats = None
+                    zombie = self.zombies.get_nowait()
+                else:
+                    stats = metrics.survivor(survivor)
+                    zombie = self._timed(stats, self.zombies.get_nowait)
+                if self._fight_round(survivor, zombie, self.rng, narrate, stats):
+                    still_fighting.append(survivor)
+            fighting = still_fighting
+
+    def _fight_pool(self) -> None:
+        """ Multiplexes any number of Survivors over a fixed number of threads, one attack at a time """
+        ready = deque(survivor for survivor in self.survivors if survivor)
+        in_fight = self._in_fight
+        narrate = self.events.verbosity >= Verbosity.STORY
+        metrics = self.metrics
+
+        def work(rng: RandomSource) -> None:
+            while True:
+                try:
+                    survivor = ready.popleft()
+                except IndexError:
+                    # The others hold the remaining survivors and keep fighting with them
+                    return
+
+                stats = metrics.survivor(survivor) if metrics is not None else None
+                try:
+                    if stats is None:
+                        zombie = in_fight.take(self.zombies)
+                    else:
+                        zombie = self._timed(stats, in_fight.take, self.zombies)
+                except Empty:
+                    return  # no zombie left and none can come back
+
+                if zombie is None:
+                    # A zombie which is still fought by another thread might return
+                    ready.append(survivor)
+                    time.sleep(0)
+                    continue
+
+                if self._fight_round(survivor, zombie, rng, narrate, stats):
+                    ready.append(survivor)
+                in_fight.done()
+
+        workers = [
+            threading.Thread(target=work, kwargs=dict(rng=rng))
+            for rng in spawn_rngs(self.rng, max(1, self.workers))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
 
-    def _fight_execution(self, survivor: Humanoid) -> None:
+    def _fight_execution(self, survivor: Humanoid, rng: Optional[RandomSource] = None) -> None:
         """ Handles fights between one Survivor and all Zombies """
+        rng = rng or self.rng
+        narrate = self.events.verbosity >= Verbosity.STORY
+        stats = self.metrics.survivor(survivor) if self.metrics is not None else None
 
-        while not self.zombies.empty():
-            zombie = self.zombies.get()
-            if self.storymode:
-                print(f'{survivor} greift den Zombie {zombie} an.')
-
-            # Survivor attacks zombie
-            if random.randint(1, 100) < survivor.hit_chance:
-                if self.storymode:
-                    print(f'*Klatsch* {survivor.name} erschlägt den Zombie {zombie.name}.')
+        while True:
+            try:
+                # Never block, another thread might have taken the last zombie since we looked
+                if stats is None:
+                    zombie = self._in_fight.take(self.zombies)
                 else:
-                    print('Klatsch')
-                self.zombies.task_done()
+                    zombie = self._timed(stats, self._in_fight.take, self.zombies)
+            except Empty:
+                return
+            if zombie is None:
+                # A zombie which is still fought by another thread might return
+                time.sleep(0)
                 continue
-            else:
-                if self.storymode:
-                    print(f'{survivor.name}: "Mist!"')
-                else:
-                    print('Mist!')
-                self.zombies.put(zombie)
+            alive = self._fight_round(survivor, zombie, rng, narrate, stats)
+            self._in_fight.done()
+            if not alive:
+                return
 
-            # Zombie attacks survivor
-            if random.randint(1, 100) < (zombie.hit_chance - survivor.defense):
-                survivor.zombify(hit_chance=self.zombify_chance, zombie_variety=self.zombie_variety)
-                if self.storymode:
-                    print(f'{survivor.name} wird von Zombie {zombie.name} gebissen und verwandelt sich.')
-                    print(f'Zombie {survivor.name}: "Grrrrr"')
-                else:
-                    print('Grrrrr')
+    def _fight_round(
+            self,
+            survivor: Humanoid,
+            zombie: Humanoid,
+            rng: RandomSource,
+            narrate: bool,
+            stats: Optional[SurvivorStats] = None
+    ) -> bool:
+        """ Survivor attacks the Zombie and, if that fails, the Zombie strikes back. Returns if the Survivor is still human """
+        events = self.events
+        if narrate:
+            events.event('attack', self.storymode, survivor=survivor, zombie=zombie)
+        if stats is not None:
+            stats.attacks += 1
+
+        # Survivor attacks zombie
+        if rng.randint(1, 100) < survivor.hit_chance:
+            if narrate:
+                events.event('kill', self.storymode, survivor=survivor, zombie=zombie)
+            if stats is not None:
+                stats.kills += 1
+            self.zombies.task_done()
+            return True
+        else:
+            if narrate:
+                events.event('miss', self.storymode, survivor=survivor, zombie=zombie)
+            if stats is None:
+                self.zombies.put(zombie)
+            else:
+                stats.misses += 1
+                self._timed(stats, self.zombies.put, zombie)
+
+        # Zombie attacks survivor
+        if rng.randint(1, 100) < (zombie.hit_chance - survivor.defense):
+            survivor.zombify(hit_chance=self.zombify_chance, zombie_variety=self.zombie_variety, rng=rng)
+            if narrate:
+                events.event('bite', self.storymode, survivor=survivor, zombie=zombie)
+            if stats is None:
                 self.zombies.put(survivor)
-                return
             else:
-                survivor.evaded = True  # Optional
-                if self.storymode:
-                    print(f'{survivor.name}: "Juhu"')
-                else:
-                    print('Juhu')
+                stats.zombified_after = perf_counter() - self.metrics.fights_started
+                self._timed(stats, self.zombies.put, survivor)
+            return False
+        else:
+            survivor.evaded = True  # Optional
+            if narrate:
+                events.event('evade', self.storymode, survivor=survivor, zombie=zombie)
+            if stats is not None:
+                stats.evasions += 1
+            return True
+
+    @staticmethod
+    def _timed(stats: SurvivorStats, operation: Callable[..., Any], *args: Any) -> Any:
+        """ Runs a queue operation and books the time it took, lock contention included, on the survivor """
+        start = perf_counter()
+        try:
+            return operation(*args)
+        finally:
+            stats.queue_wait += perf_counter() - start
 
     @staticmethod
     def _show_menu() -> Optional[Literal['start', 'settings']]:
@@ -243,7 +539,7 @@ class ZombieSurvival:
                         'filter': lambda a: int(a)
                     }
                 },
-                Separator(),
+                separator(),
                 {
                     "name": f"Storymodus ({'Ja' if self.storymode else 'Nein'})",
                     "value": {
@@ -301,8 +597,10 @@ class ZombieSurvival:
             return False
 
         setattr(self, option_name, option_new_value)
+        self.history = None
         return True
 
 
 if __name__ == '__main__':  # pragma: no cover
-    ZombieSurvival().run()
+    from cli import main
+    exit(main())
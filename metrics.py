@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional
+
+__all__ = ['SurvivorStats', 'BattleMetrics']
+
+
+class SurvivorStats:
+    """ Counters of one survivor, only ever written by the thread fighting with that survivor """
+    __slots__ = ('attacks', 'kills', 'misses', 'evasions', 'zombified_after', 'queue_wait')
+
+    attacks: int
+    kills: int
+    misses: int
+    evasions: int
+    zombified_after: Optional[float]  # seconds after the fights started, None while still human
+    queue_wait: float  # seconds spent waiting on the zombie queue
+
+    def __init__(self):
+        self.attacks = 0
+        self.kills = 0
+        self.misses = 0
+        self.evasions = 0
+        self.zombified_after = None
+        self.queue_wait = 0.0
+
+
+class BattleMetrics:
+    """
+    Instrumentation of the last battle of a `ZombieSurvival` game.
+    Only collected while assigned to `ZombieSurvival.metrics`, otherwise the game skips all of it.
+    """
+    phases: Dict[str, float]
+    survivors: Dict[object, SurvivorStats]
+    fights_started: float
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.phases = dict()
+        self.survivors = dict()
+        self.fights_started = perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + perf_counter() - start
+
+    def survivor(self, survivor: object) -> SurvivorStats:
+        """ Stats of a survivor, looked up by identity """
+        stats = self.survivors.get(survivor)
+        if stats is None:
+            stats = self.survivors[survivor] = SurvivorStats()
+        return stats
+
+    def total(self, counter: str) -> float:
+        return sum(getattr(stats, counter) for stats in self.survivors.values())
+
+    @property
+    def zombification_times(self) -> List[float]:
+        return [stats.zombified_after for stats in self.survivors.values() if stats.zombified_after is not None]
+
+    def to_prometheus(self, prefix: str = 'zombie_survival') -> str:
+        """ Text exposition format of Prometheus """
+        lines = [
+            f'# HELP {prefix}_phase_seconds Time spent per phase of the battle',
+            f'# TYPE {prefix}_phase_seconds gauge',
+        ]
+        lines.extend(f'{prefix}_phase_seconds{{phase="{name}"}} {seconds}' for name, seconds in self.phases.items())
+
+        for counter, description in (
+                ('attacks', 'Attacks of all survivors'),
+                ('kills', 'Zombies killed'),
+                ('misses', 'Attacks that missed'),
+                ('evasions', 'Zombie attacks evaded'),
+        ):
+            lines.append(f'# HELP {prefix}_{counter}_total {description}')
+            lines.append(f'# TYPE {prefix}_{counter}_total counter')
+            lines.append(f'{prefix}_{counter}_total {int(self.total(counter))}')
+
+        lines.append(f'# HELP {prefix}_queue_wait_seconds_total Time spent waiting on the zombie queue')
+        lines.append(f'# TYPE {prefix}_queue_wait_seconds_total counter')
+        lines.append(f'{prefix}_queue_wait_seconds_total {self.total("queue_wait")}')
+
+        times = self.zombification_times
+        lines.append(f'# HELP {prefix}_zombification_seconds Time from the start of the fights until a survivor turned')
+        lines.append(f'# TYPE {prefix}_zombification_seconds summary')
+        lines.append(f'{prefix}_zombification_seconds_count {len(times)}')
+        lines.append(f'{prefix}_zombification_seconds_sum {sum(times)}')
+        return '\n'.join(lines) + '\n'
@@ -1,46 +1,88 @@
 import random
-from typing import List
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Dict, List, Literal, NamedTuple, Optional, Tuple
 
-from names import get_first_name, get_last_name
+if TYPE_CHECKING:  # pragma: no cover
+    from rng import RandomSource
 
-__all__ = ['Humanoid']
+__all__ = ['BaseHumanoid', 'Humanoid', 'BattleResult', 'NamePool', 'name_pool', 'bound_chance']
 
 
-class Humanoid:
-    _hit_chance: int
-    _hit_modifier: int
-    _defense_modifier: int
-    _zombie: bool
-    name: str
-    evaded: bool
+class NamePool:
+    """
+    Hands out random full names like `names.get_full_name`, but reads the name files only once
+    and draws the names in batches instead of scanning a file for every single name.
+    """
+    batch_size: int
+    _lists: Optional[Dict[str, Tuple[List[str], List[float]]]]
+    _drawn: List[str]
 
-    def __init__(
-            self,
-            hit_chance: int,
-            is_zombie: bool = False,
-            zombie_variety: int = None,
-            weapon_variety: int = None,
-            armor_variety: int = None,
-            name: str = None
-    ):
-        self.name = name if name else f'{get_first_name()} {get_last_name()}'
-        self.hit_chance = hit_chance
-        self._hit_modifier = 0
-        self._defense_modifier = 0
-        self._zombie = False
-        self.evaded = False
+    def __init__(self, batch_size: int = 1024):
+        self.batch_size = batch_size
+        self._lists = None
+        self._drawn = list()
 
-        if is_zombie:
-            self.zombify(hit_chance=hit_chance, zombie_variety=zombie_variety)
-        else:
-            # Optional: Setup Weapons/Armors
-            self._defense_modifier = random.randint(0, armor_variety) if isinstance(armor_variety, int) else 0
-            self._hit_modifier = random.randint(0, weapon_variety) if isinstance(weapon_variety, int) else 0
+    def get(self) -> str:
+        try:
+            return self._drawn.pop()
+        except IndexError:
+            # Another thread might refill at the same time, which only costs a few extra names
+            self._drawn.extend(self.draw(self.batch_size))
+            return self._drawn.pop()
+
+    def draw(self, count: int) -> List[str]:
+        lists = self._load()
+        full_names = []
+        for _ in range(count):
+            first_names = lists[random.choice(('first:male', 'first:female'))]
+            full_names.append(f'{self._pick(*first_names)} {self._pick(*lists["last"])}')
+        return full_names
+
+    @staticmethod
+    def _pick(names: List[str], cumulative: List[float]) -> str:
+        # Same selection as `names.get_name`: the first name whose cumulative frequency exceeds the draw
+        position = bisect_right(cumulative, random.random() * 90)
+        return names[position] if position < len(names) else ''
+
+    def _load(self) -> Dict[str, Tuple[List[str], List[float]]]:
+        if self._lists is None:
+            # Imported on first use, battles without names never need the package
+            from names import FILES
 
-    def zombify(self, hit_chance: int, zombie_variety: int = None):
+            lists = dict()
+            for key, filename in FILES.items():
+                names, cumulative = [], []
+                with open(filename) as name_file:
+                    for line in name_file:
+                        name, _, cumulative_frequency, _ = line.split()
+                        names.append(name.capitalize())
+                        cumulative.append(float(cumulative_frequency))
+                lists[key] = (names, cumulative)
+            self._lists = lists
+        return self._lists
+
+
+name_pool = NamePool()
+
+
+def bound_chance(value: int) -> int:
+    """ Keeps a base chance between 1 and 99 """
+    if value >= 100:
+        return 99
+    elif value < 1:
+        return 1
+    return value
+
+
+class BaseHumanoid:
+    """ Rules shared by everything that fights, subclasses decide where the state is stored """
+    __slots__ = ()
+
+    def zombify(self, hit_chance: int, zombie_variety: int = None, rng: 'RandomSource' = None):
+        rng = rng or random
         self._zombie = True
         self.hit_chance = hit_chance
-        self._hit_modifier = random.randint(-zombie_variety, zombie_variety) if isinstance(zombie_variety, int) else 0
+        self._hit_modifier = rng.randint(-zombie_variety, zombie_variety) if isinstance(zombie_variety, int) else 0
 
     @property
     def hit_chance(self) -> int:
@@ -51,12 +93,7 @@ class Humanoid:
 
     @hit_chance.setter
     def hit_chance(self, value: int):
-        if value >= 100:
-            self._hit_chance = 99
-        elif value < 1:
-            self._hit_chance = 1
-        else:
-            self._hit_chance = value
+        self._hit_chance = bound_chance(value)
 
     @property
     def defense(self) -> int:
@@ -80,3 +117,58 @@ class Humanoid:
 
     def __repr__(self):
         return f'{self.name}{self.modifier_info}'
+
+
+class Humanoid(BaseHumanoid):
+    __slots__ = ('_hit_chance', '_hit_modifier', '_defense_modifier', '_zombie', '_name', 'evaded')
+
+    _hit_chance: int
+    _hit_modifier: int
+    _defense_modifier: int
+    _zombie: bool
+    _name: Optional[str]
+    evaded: bool
+
+    def __init__(
+            self,
+            hit_chance: int,
+            is_zombie: bool = False,
+            zombie_variety: int = None,
+            weapon_variety: int = None,
+            armor_variety: int = None,
+            name: str = None,
+            rng: 'RandomSource' = None
+    ):
+        rng = rng or random
+        self._name = name if name else None
+        self.hit_chance = hit_chance
+        self._hit_modifier = 0
+        self._defense_modifier = 0
+        self._zombie = False
+        self.evaded = False
+
+        if is_zombie:
+            self.zombify(hit_chance=hit_chance, zombie_variety=zombie_variety, rng=rng)
+        else:
+            # Optional: Setup Weapons/Armors
+            self._defense_modifier = rng.randint(0, armor_variety) if isinstance(armor_variety, int) else 0
+            self._hit_modifier = rng.randint(0, weapon_variety) if isinstance(weapon_variety, int) else 0
+
+    @property
+    def name(self) -> str:
+        """ Random names are only drawn once they are needed """
+        if self._name is None:
+            self._name = name_pool.get()
+        return self._name
+
+    @name.setter
+    def name(self, value: str):
+        self._name = value
+
+
+class BattleResult(NamedTuple):
+    """ Outcome of a single battle """
+    winner: Literal['survivors', 'zombies']
+    survivors_left: int
+    zombies_left: int
+    duration: float  # seconds
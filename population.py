@@ -0,0 +1,217 @@
+from queue import Queue
+from typing import Dict, Iterator, Optional, Union
+
+import numpy as np
+
+from models import BaseHumanoid, bound_chance, name_pool
+
+__all__ = ['Population', 'HumanoidView', 'PopulationQueue']
+
+Index = Union[int, np.ndarray]
+
+
+class Population:
+    """
+    Compact store for large numbers of humanoids, one NumPy column per attribute instead of one object each.
+    `Humanoid` compatible objects are only created on demand via indexing.
+    """
+    base_chance: np.ndarray
+    hit_modifier: np.ndarray
+    defense_modifier: np.ndarray
+    zombie: np.ndarray
+    evaded: np.ndarray
+
+    # Names are only stored once they are set or looked up
+    names: Dict[int, str]
+    # Members from this index on are named by their number, like the zombies of `ZombieSurvival`
+    numbered_from: Optional[int]
+
+    def __init__(self, size: int, numbered_from: Optional[int] = None):
+        self.base_chance = np.ones(size, dtype=np.uint8)
+        self.hit_modifier = np.zeros(size, dtype=np.int32)
+        self.defense_modifier = np.zeros(size, dtype=np.int32)
+        self.zombie = np.zeros(size, dtype=bool)
+        self.evaded = np.zeros(size, dtype=bool)
+        self.names = dict()
+        self.numbered_from = numbered_from
+
+    @classmethod
+    def create(
+            cls,
+            survivor_count: int,
+            zombie_count: int,
+            hit_chance: int,
+            zombify_chance: int,
+            zombie_variety: int = None,
+            weapon_variety: int = None,
+            armor_variety: int = None,
+            rng: Optional[np.random.Generator] = None
+    ) -> 'Population':
+        """ Survivors come first, followed by the zombies numbered from 1 """
+        rng = rng if rng is not None else np.random.default_rng()
+        population = cls(survivor_count + zombie_count, numbered_from=survivor_count)
+
+        survivors = slice(0, survivor_count)
+        population.base_chance[survivors] = bound_chance(hit_chance)
+        if isinstance(weapon_variety, int):
+            population.hit_modifier[survivors] = rng.integers(0, weapon_variety + 1, survivor_count)
+        if isinstance(armor_variety, int):
+            population.defense_modifier[survivors] = rng.integers(0, armor_variety + 1, survivor_count)
+
+        population.zombify(
+            np.arange(survivor_count, survivor_count + zombie_count),
+            hit_chance=zombify_chance,
+            zombie_variety=zombie_variety,
+            rng=rng
+        )
+        return population
+
+    def hit_chance(self, index: Index) -> Union[int, np.ndarray]:
+        """ Vectorized `Humanoid.hit_chance` """
+        evaded_bonus = 3 * (self.evaded[index] & ~self.zombie[index])
+        return self.base_chance[index] + self.hit_modifier[index] + evaded_bonus
+
+    def zombify(
+            self,
+            index: Index,
+            hit_chance: int,
+            zombie_variety: int = None,
+            rng: Optional[np.random.Generator] = None
+    ) -> None:
+        """ Vectorized `Humanoid.zombify` """
+        self.zombie[index] = True
+        self.base_chance[index] = bound_chance(hit_chance)
+        if isinstance(zombie_variety, int):
+            rng = rng if rng is not None else np.random.default_rng()
+            self.hit_modifier[index] = rng.integers(-zombie_variety, zombie_variety + 1, np.size(index))
+        else:
+            self.hit_modifier[index] = 0
+
+    def name(self, index: int) -> str:
+        name = self.names.get(index)
+        if name is None:
+            if self.numbered_from is not None and index >= self.numbered_from:
+                return str(index - self.numbered_from + 1)
+            name = self.names[index] = name_pool.get()
+        return name
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in (
+            self.base_chance, self.hit_modifier, self.defense_modifier, self.zombie, self.evaded
+        ))
+
+    def __len__(self):
+        return self.zombie.size
+
+    def __getitem__(self, index: int) -> 'HumanoidView':
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return HumanoidView(self, index % len(self))
+
+
+class HumanoidView(BaseHumanoid):
+    """ `Humanoid` whose state lives in a row of a `Population` """
+    __slots__ = ('population', 'index')
+
+    population: Population
+    index: int
+
+    def __init__(self, population: Population, index: int):
+        self.population = population
+        self.index = index
+
+    @property
+    def _hit_chance(self) -> int:
+        return int(self.population.base_chance[self.index])
+
+    @_hit_chance.setter
+    def _hit_chance(self, value: int):
+        self.population.base_chance[self.index] = value
+
+    @property
+    def _hit_modifier(self) -> int:
+        return int(self.population.hit_modifier[self.index])
+
+    @_hit_modifier.setter
+    def _hit_modifier(self, value: int):
+        self.population.hit_modifier[self.index] = value
+
+    @property
+    def _defense_modifier(self) -> int:
+        return int(self.population.defense_modifier[self.index])
+
+    @_defense_modifier.setter
+    def _defense_modifier(self, value: int):
+        self.population.defense_modifier[self.index] = value
+
+    @property
+    def _zombie(self) -> bool:
+        return bool(self.population.zombie[self.index])
+
+    @_zombie.setter
+    def _zombie(self, value: bool):
+        self.population.zombie[self.index] = value
+
+    @property
+    def evaded(self) -> bool:
+        return bool(self.population.evaded[self.index])
+
+    @evaded.setter
+    def evaded(self, value: bool):
+        self.population.evaded[self.index] = value
+
+    @property
+    def name(self) -> str:
+        return self.population.name(self.index)
+
+    @name.setter
+    def name(self, value: str):
+        self.population.names[self.index] = value
+
+
+class PopulationDeque:
+    """ FIFO of population members which only keeps their indices, in the ring buffer every member fits once """
+    population: Population
+    ring: np.ndarray
+    head: int
+    size: int
+
+    def __init__(self, population: Population):
+        self.population = population
+        self.ring = np.empty(len(population), dtype=np.int64)
+        self.head = 0
+        self.size = 0
+
+    def append(self, member: HumanoidView) -> None:
+        if self.size == self.ring.size:
+            raise IndexError('append to a full PopulationDeque')
+        self.ring[(self.head + self.size) % self.ring.size] = member.index
+        self.size += 1
+
+    def popleft(self) -> HumanoidView:
+        if not self.size:
+            raise IndexError('pop from an empty PopulationDeque')
+        index = int(self.ring[self.head])
+        self.head = (self.head + 1) % self.ring.size
+        self.size -= 1
+        return HumanoidView(self.population, index)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self) -> Iterator[HumanoidView]:
+        for position in range(self.head, self.head + self.size):
+            yield HumanoidView(self.population, int(self.ring[position % self.ring.size]))
+
+
+class PopulationQueue(Queue):
+    """ Drop-in for the `Queue` of zombies, holding indices into a `Population` instead of objects """
+    population: Population
+
+    def __init__(self, population: Population, maxsize: int = 0):
+        self.population = population
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int) -> None:
+        self.queue = PopulationDeque(self.population)
@@ -0,0 +1,127 @@
+import copy
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from buckets import BucketBattle
+from main import ZombieSurvival
+from simulation import headless_game
+from stats import z_score
+
+__all__ = ['RareEstimate', 'estimate_win_probability']
+
+
+class RareEstimate(NamedTuple):
+    """ Outcome of `estimate_win_probability`, the bounds belong to the requested confidence """
+    probability: float  # might underflow to 0, the logarithm doesn't
+    low: float
+    high: float
+    log10_probability: float
+    relative_error: float  # standard error of the estimate divided by the estimate
+    replications: int
+    levels: int
+    attacks: int  # simulated by all replications together
+
+
+def _clone(battle: BucketBattle) -> BucketBattle:
+    """ Independent copy of the state of a battle, the random generator stays shared """
+    clone = copy.copy(battle)
+    clone.survivors = battle.survivors.copy()
+    clone.zombies = battle.zombies.copy()
+    return clone
+
+
+def _fight_until(battle: BucketBattle, zombies_left: int) -> bool:
+    """ Fights until at most `zombies_left` zombies remain, False if the survivors fall before """
+    while True:
+        if not battle.survivors.any():
+            return False
+        if battle.zombies.sum() <= zombies_left:
+            return True
+        battle._fight_round()
+
+
+def _replicate(
+        game: ZombieSurvival,
+        thresholds: List[int],
+        trajectories: int,
+        rng: np.random.Generator
+) -> Tuple[float, int]:
+    """
+    One run of fixed effort multilevel splitting, returns the logarithm of its estimate and the attacks it took.
+    Every stage starts `trajectories` battles from states drawn at random among those that reached the previous
+    threshold, the fraction reaching the next one estimates the conditional probability of getting there.
+    """
+    log_probability = 0.0
+    attacks = 0
+    entrances: Optional[List[BucketBattle]] = None
+    for zombies_left in thresholds:
+        reached = []
+        for _ in range(trajectories):
+            if entrances is None:
+                battle = BucketBattle.from_game(game, rng=rng)  # the first stage also varies the setup
+            else:
+                battle = _clone(entrances[rng.integers(len(entrances))])
+            attacks_before = battle.attacks
+            if _fight_until(battle, zombies_left):
+                reached.append(battle)
+            attacks += battle.attacks - attacks_before
+        if not reached:
+            return -math.inf, attacks
+        log_probability += math.log(len(reached) / trajectories)
+        entrances = reached
+    return log_probability, attacks
+
+
+def estimate_win_probability(
+        config: Dict[str, Any],
+        levels: int = 20,
+        trajectories: int = 100,
+        replications: int = 10,
+        confidence: float = 0.95,
+        seed: Optional[int] = None
+) -> RareEstimate:
+    """
+    Win probability of the survivors for scenarios where a win is too rare to ever show up in plain repetition,
+    e.g. 5 survivors against 1e6 zombies. Multilevel splitting on the fraction of zombies killed: the way
+    to a win is cut into `levels` stages, battles that get far are cloned and continued, the hopeless ones dropped.
+    Each replication gives an unbiased estimate, the error bars come from their spread.
+    The battles are fought by the `buckets` engine, whose state is cheap to clone.
+    """
+    if levels < 1 or trajectories < 1 or replications < 2:
+        raise ValueError('Splitting needs at least one level, one trajectory and two replications')
+    game = headless_game(config, 'buckets', None)
+    # Zombies left at the end of each stage, the last one is the win
+    thresholds = [math.floor(game.zombie_count * (1 - level / levels)) for level in range(1, levels + 1)]
+
+    seeds = np.random.SeedSequence(seed).spawn(replications)
+    logs = []
+    attacks = 0
+    for replication_seed in seeds:
+        log_probability, replication_attacks = _replicate(
+            game, thresholds, trajectories, np.random.default_rng(replication_seed)
+        )
+        logs.append(log_probability)
+        attacks += replication_attacks
+
+    top = max(logs)
+    if top == -math.inf:
+        return RareEstimate(0.0, 0.0, 0.0, -math.inf, math.inf, replications, levels, attacks)
+    # Scaled by the largest estimate, so probabilities far below the smallest float still average
+    scaled = np.exp(np.array(logs) - top)
+    mean = float(scaled.mean())
+    relative_error = float(scaled.std(ddof=1)) / math.sqrt(replications) / mean
+    log_mean = top + math.log(mean)
+    probability = math.exp(log_mean)
+    margin = z_score(confidence) * relative_error
+    return RareEstimate(
+        probability=probability,
+        low=probability * max(0.0, 1 - margin),
+        high=probability * (1 + margin),
+        log10_probability=log_mean / math.log(10),
+        relative_error=relative_error,
+        replications=replications,
+        levels=levels,
+        attacks=attacks
+    )
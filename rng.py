@@ -0,0 +1,110 @@
+import random
+from typing import Any, Dict, List, Optional, Protocol, Sequence, TypeVar, Union
+
+import numpy as np
+
+__all__ = ['Seed', 'RandomSource', 'RandomStream', 'make_rng', 'spawn_rngs', 'numpy_generator', 'rng_state', 'restore_rng']
+
+T = TypeVar('T')
+Seed = Union[None, int, np.random.SeedSequence]
+
+
+class RandomSource(Protocol):
+    """ Part of the `random` module API the game uses, so the module itself is a valid source """
+
+    def random(self) -> float: ...
+
+    def randint(self, a: int, b: int) -> int: ...
+
+    def choice(self, seq: Sequence[T]) -> T: ...
+
+
+class RandomStream:
+    """
+    Seedable random source which draws its numbers from a NumPy `Generator` in blocks
+    and hands them out one by one, much cheaper than a call into the generator per number.
+    Not thread safe, every thread needs its own stream, see `spawn`.
+    """
+    seed_sequence: np.random.SeedSequence
+    generator: np.random.Generator
+    block_size: int
+    _block: List[float]
+    _position: int
+
+    def __init__(self, seed: Seed = None, block_size: int = 4096):
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.generator = np.random.default_rng(self.seed_sequence)
+        self.block_size = block_size
+        self._block = list()
+        self._position = 0
+
+    def random(self) -> float:
+        if self._position == len(self._block):
+            self._block = self.generator.random(self.block_size).tolist()
+            self._position = 0
+        value = self._block[self._position]
+        self._position += 1
+        return value
+
+    def randint(self, a: int, b: int) -> int:
+        """ Random integer between a and b, both included """
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq: Sequence[T]) -> T:
+        return seq[int(self.random() * len(seq))]
+
+    def spawn(self, count: int) -> List['RandomStream']:
+        """ Independent child streams, e.g. one per worker """
+        return [RandomStream(child, self.block_size) for child in self.seed_sequence.spawn(count)]
+
+    def get_state(self) -> Dict[str, Any]:
+        """ JSON compatible snapshot, the stream continues with exactly the same numbers after `set_state` """
+        return dict(
+            entropy=self.seed_sequence.entropy,
+            spawn_key=list(self.seed_sequence.spawn_key),
+            block_size=self.block_size,
+            generator=self.generator.bit_generator.state,
+            block=self._block[self._position:]
+        )
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'RandomStream':
+        stream = cls(np.random.SeedSequence(state['entropy'], spawn_key=state['spawn_key']), state['block_size'])
+        stream.generator.bit_generator.state = state['generator']
+        stream._block = list(state['block'])
+        stream._position = 0
+        return stream
+
+
+def make_rng(seed: Seed) -> RandomSource:
+    """ Without a seed the shared `random` module is used like before """
+    return random if seed is None else RandomStream(seed)
+
+
+def spawn_rngs(rng: RandomSource, count: int) -> List[RandomSource]:
+    if isinstance(rng, RandomStream):
+        return rng.spawn(count)
+    return [rng] * count
+
+
+def rng_state(rng: RandomSource) -> Dict[str, Any]:
+    """ JSON compatible state of a random source, see `restore_rng` """
+    if isinstance(rng, RandomStream):
+        return dict(kind='stream', stream=rng.get_state())
+    return dict(kind='random', state=rng.getstate())
+
+
+def restore_rng(state: Dict[str, Any]) -> RandomSource:
+    """ Continues a random source where `rng_state` left it, for the `random` module its global state is restored """
+    if state['kind'] == 'stream':
+        return RandomStream.from_state(state['stream'])
+    version, internal_state, gauss_next = state['state']
+    random.setstate((version, tuple(internal_state), gauss_next))
+    return random
+
+
+def numpy_generator(rng: RandomSource) -> Optional[np.random.Generator]:
+    """ Generator for vectorized code that follows the seed of `rng`, if there is one """
+    if isinstance(rng, RandomStream):
+        return rng.generator
+    return None
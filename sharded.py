@@ -0,0 +1,89 @@
+import threading
+from collections import deque
+from itertools import chain, count
+from queue import Empty
+from typing import Any, Deque, List, Optional
+
+__all__ = ['ZOMBIE_POOLS', 'ShardedZombiePool']
+
+# Implementations of `ZombieSurvival.zombies`, the standard `Queue` or the pool below
+ZOMBIE_POOLS = ('queue', 'sharded')
+
+
+class ShardedZombiePool:
+    """
+    Drop-in for the `Queue` of zombies without its single lock: every thread puts into and takes from its own
+    deque, whose appends and pops need no lock of their own, and steals half of another shard once its own
+    runs dry, only stealing takes a lock. Missed zombies and bitten survivors go back into play like with the queue,
+    only the order in which the zombies return is per shard rather than global.
+    """
+    shards: List[Deque[Any]]
+
+    def __init__(self, shards: int = 1):
+        self.shards = [deque() for _ in range(max(1, shards))]
+        self._next_shard = count()
+        self._local = threading.local()
+        self._steal_lock = threading.Lock()
+
+    def _own(self) -> int:
+        """ Shard of the calling thread, the threads are spread round robin """
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = next(self._next_shard) % len(self.shards)
+        return shard
+
+    def put(self, zombie: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        self.shards[self._own()].append(zombie)
+
+    def put_nowait(self, zombie: Any) -> None:
+        self.put(zombie)
+
+    def get_nowait(self) -> Any:
+        """
+        Takes a zombie from the own shard or steals from the others, raises `Empty` if there is none.
+        Zombies only move between shards with the steal lock held, a thread finds no zombie only once it has
+        looked with the lock as well, so none is overlooked while in transit.
+        """
+        own = self._own()
+        shard = self.shards[own]
+        try:
+            return shard.popleft()
+        except IndexError:
+            pass
+
+        with self._steal_lock:
+            for offset in range(len(self.shards)):
+                victim = self.shards[(own + offset) % len(self.shards)]
+                try:
+                    zombie = victim.popleft()
+                except IndexError:
+                    continue
+                if victim is shard:
+                    return zombie
+                # Take over half of what's left in one go, so the next attacks don't have to steal again
+                stolen = []
+                for _ in range(len(victim) // 2):
+                    try:
+                        stolen.append(victim.pop())
+                    except IndexError:
+                        break
+                shard.extend(stolen)
+                return zombie
+        raise Empty
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        return self.get_nowait()
+
+    def task_done(self) -> None:
+        """ Nothing waits for the zombies to be done, it's only there for the `Queue` interface """
+
+    def qsize(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def empty(self) -> bool:
+        return not any(self.shards)
+
+    @property
+    def queue(self) -> List[Any]:
+        """ All zombies in the pool, shard by shard """
+        return list(chain.from_iterable(list(shard) for shard in self.shards))
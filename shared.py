@@ -0,0 +1,228 @@
+import multiprocessing
+import os
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter, sleep
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from models import BattleResult, bound_chance
+from population import Population
+from simulation import battle_settings
+
+__all__ = ['SharedPopulation', 'SharedBattle']
+
+# Columns of the population, then the ring buffer of queued zombie rows
+COLUMNS: Tuple[Tuple[str, np.dtype], ...] = (
+    ('base_chance', np.dtype(np.uint8)),
+    ('hit_modifier', np.dtype(np.int32)),
+    ('defense_modifier', np.dtype(np.int32)),
+    ('zombie', np.dtype(bool)),
+    ('evaded', np.dtype(bool)),
+    ('ring', np.dtype(np.int64)),
+)
+# The ring is preceded by its head, its size and the number of zombies claimed but not given back yet
+HEAD, SIZE, FIGHTING = 0, 1, 2
+
+
+def _layout(size: int) -> Tuple[List[int], int]:
+    """ Offsets of the columns in the block, each aligned to 8 bytes, and the size of the block """
+    offsets = []
+    position = 24  # the state of the ring comes first
+    for _, dtype in COLUMNS:
+        offsets.append(position)
+        position += -(-size * dtype.itemsize // 8) * 8
+    return offsets, position
+
+
+class SharedPopulation(Population):
+    """
+    `Population` whose columns live in one shared memory block, together with a ring buffer of the rows of the
+    queued zombies, so worker processes fight on the same horde. The ring is only touched with the lock held.
+    Passed to a spawned process it attaches to the block of its creator.
+    """
+    memory: SharedMemory
+    ring: np.ndarray
+    _state: np.ndarray  # head, size and zombies out fighting
+    _owner: bool  # created the block, so it removes it in the end
+
+    def __init__(self, size: int, numbered_from: Optional[int] = None, name: Optional[str] = None):
+        offsets, block_size = _layout(size)
+        self.memory = SharedMemory(name=name, create=name is None, size=block_size)
+        self._owner = name is None
+        self._state = np.ndarray(3, dtype=np.int64, buffer=self.memory.buf)
+        for (column, dtype), offset in zip(COLUMNS, offsets):
+            setattr(self, column, np.ndarray(size, dtype=dtype, buffer=self.memory.buf, offset=offset))
+        if self._owner:
+            self.base_chance[:] = 1
+        self.names = dict()
+        self.numbered_from = numbered_from
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return SharedPopulation, (len(self), self.numbered_from, self.memory.name)
+
+    @property
+    def queued(self) -> int:
+        return int(self._state[SIZE])
+
+    @property
+    def fighting(self) -> int:
+        """ Zombies claimed by a worker, which might still come back """
+        return int(self._state[FIGHTING])
+
+    def claim(self, count: int) -> np.ndarray:
+        """ Takes up to `count` zombie rows from the front of the ring """
+        head, size, fighting = self._state.tolist()
+        count = min(count, size)
+        rows = self.ring[(head + np.arange(count)) % self.ring.size]
+        self._state[:] = (head + count) % self.ring.size, size - count, fighting + count
+        return rows
+
+    def give_back(self, rows: np.ndarray, claimed: int = 0) -> None:
+        """ Appends zombie rows to the end of the ring, like `self.zombies.put`, once `claimed` zombies are settled """
+        head, size, fighting = self._state.tolist()
+        self.ring[(head + size + np.arange(rows.size)) % self.ring.size] = rows
+        self._state[:] = head, size + rows.size, fighting - claimed
+
+    def release(self) -> None:
+        """ Detaches from the block, which is removed once its creator releases it """
+        for column, _ in COLUMNS:
+            setattr(self, column, None)
+        self._state = None
+        self.memory.close()
+        if self._owner:
+            self.memory.unlink()
+
+
+def _fight(
+        population: SharedPopulation,
+        lock: Any,
+        rows: np.ndarray,
+        seed: int,
+        zombify_chance: int,
+        zombie_variety: int
+) -> None:
+    """
+    Work of one process: its survivors fight in rounds like `VectorizedBattle`, each round claims a zombie
+    for every one of them and gives back the missed zombies and the bitten survivors, in the order of the fights.
+    Stops once its survivors are gone or the horde is empty with no zombie left fighting elsewhere,
+    a zombie another worker missed comes back after all.
+    """
+    rng = np.random.default_rng(seed)
+    try:
+        while True:
+            alive = rows[~population.zombie[rows]]
+            if not alive.size:
+                return
+            with lock:
+                zombies = population.claim(alive.size)
+                fighting = population.fighting
+            if not zombies.size:
+                if fighting:
+                    sleep(0.0001)
+                    continue
+                return
+            claimed = zombies.size
+            alive = alive[:claimed]
+
+            # Survivors attack zombies
+            missed = rng.integers(1, 101, alive.size) >= population.hit_chance(alive)
+            attackers = alive[missed]
+            zombies = zombies[missed]
+
+            # Zombies attack survivors
+            bites = rng.integers(1, 101, attackers.size) < (
+                population.hit_chance(zombies) - population.defense_modifier[attackers]
+            )
+            population.zombify(attackers[bites], hit_chance=zombify_chance, zombie_variety=zombie_variety, rng=rng)
+            population.evaded[attackers[~bites]] = True
+
+            # Every missed zombie is followed by the survivor it bit, if any
+            returned = np.stack([zombies, np.where(bites, attackers, -1)], axis=1).ravel()
+            with lock:
+                population.give_back(returned[returned >= 0], claimed)
+    finally:
+        if not population._owner:
+            population.release()
+
+
+class SharedBattle:
+    """
+    Fight engine for one huge battle on several cores. The survivors are split between worker processes,
+    which share the population and the zombie queue in shared memory and claim zombies under a lock,
+    a batch per round, so the workers rarely wait for each other. As with the threads engine
+    the interleaving of the workers decides the outcome, a seed doesn't make a battle reproducible.
+    """
+    population: SharedPopulation
+    survivor_count: int
+    zombify_chance: int
+    zombie_variety: Optional[int]
+    workers: int
+    rng: np.random.Generator
+
+    def __init__(
+            self,
+            zombie_count: int,
+            survivor_count: int,
+            hit_chance: int,
+            zombify_chance: int,
+            zombie_variety: int = None,
+            weapon_variety: int = None,
+            armor_variety: int = None,
+            rng: Optional[np.random.Generator] = None,
+            workers: Optional[int] = None
+    ):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.survivor_count = survivor_count
+        self.zombify_chance = bound_chance(zombify_chance)
+        self.zombie_variety = zombie_variety
+        self.workers = max(1, min(workers or os.cpu_count() or 1, survivor_count))
+
+        self.population = SharedPopulation.create(
+            survivor_count=survivor_count,
+            zombie_count=zombie_count,
+            hit_chance=hit_chance,
+            zombify_chance=zombify_chance,
+            zombie_variety=zombie_variety,
+            weapon_variety=weapon_variety,
+            armor_variety=armor_variety,
+            rng=self.rng
+        )
+        self.population.give_back(np.arange(survivor_count, survivor_count + zombie_count))
+
+    @classmethod
+    def from_game(cls, game, rng: Optional[np.random.Generator] = None, workers: Optional[int] = None) -> 'SharedBattle':
+        """ Builds a battle from the settings of a `ZombieSurvival` instance """
+        return cls(**battle_settings(game), rng=rng, workers=workers)
+
+    def run(self) -> BattleResult:
+        """ Fights the battle and frees the shared memory, a battle runs only once """
+        population = self.population
+        start_time = perf_counter()
+        try:
+            context = multiprocessing.get_context()
+            lock = context.Lock()
+            seeds = self.rng.integers(0, 2 ** 63, self.workers).tolist()
+            processes = [
+                context.Process(
+                    target=_fight,
+                    args=(population, lock, rows, seed, self.zombify_chance, self.zombie_variety)
+                )
+                for rows, seed in zip(np.array_split(np.arange(self.survivor_count), self.workers), seeds)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            if any(process.exitcode for process in processes):
+                raise RuntimeError('A fight process failed')
+
+            survivors_left = int(np.count_nonzero(~population.zombie[:self.survivor_count]))
+            return BattleResult(
+                winner='survivors' if survivors_left else 'zombies',
+                survivors_left=survivors_left,
+                zombies_left=population.queued,
+                duration=perf_counter() - start_time
+            )
+        finally:
+            population.release()
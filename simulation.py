@@ -0,0 +1,248 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from itertools import repeat
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Literal
+
+import numpy as np
+
+from events import EventSink, Verbosity
+from main import ZombieSurvival
+from models import BattleResult
+from rng import Seed, make_rng, numpy_generator
+from metrics import BattleMetrics
+from stats import BatchSummary, RunningMean, wilson_interval
+
+__all__ = [
+    'simulate_once', 'simulate_many', 'simulate_stream', 'simulate_adaptive', 'summarize_many', 'spawn_seeds',
+    'headless_game', 'battle_settings', 'AdaptiveEstimate', 'ENGINES', 'HEADLESS_ENGINES', 'ENGINE_VERSION'
+]
+
+ENGINES = ('threads', 'turns', 'pool', 'vectorized', 'buckets', 'shared')
+# Engines that fight without humanoids, so there are neither events nor survivors to keep metrics of
+HEADLESS_ENGINES = ('vectorized', 'buckets', 'shared')
+# Raise whenever a change makes a seeded battle end differently, stored results of older versions are void then
+ENGINE_VERSION = 2
+
+
+class AdaptiveEstimate(NamedTuple):
+    """ Outcome of `simulate_adaptive`, the bounds and errors belong to the requested confidence """
+    win_probability: float
+    low: float  # Wilson score interval of the win probability
+    high: float
+    runs: int
+    converged: bool  # reached the precision, or settled the side of the target, before the run budget was used up
+    survivors_left: float
+    survivors_left_error: float  # half width of the confidence interval of the mean
+    zombies_left: float
+    zombies_left_error: float
+
+
+def simulate_once(
+        config: Dict[str, Any],
+        engine: Literal['threads', 'turns', 'pool', 'vectorized', 'buckets', 'shared'] = 'threads',
+        seed: Seed = None
+) -> BattleResult:
+    """ Runs a single headless battle with the given settings """
+    return _fight(headless_game(config, engine, seed), engine)
+
+
+def headless_game(config: Dict[str, Any], engine: str, seed: Seed) -> ZombieSurvival:
+    """ `ZombieSurvival` with the settings of `config` that runs silently, raises a ValueError for unknown ones """
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown engine: {engine}')
+
+    game = ZombieSurvival()
+    game.events = EventSink(Verbosity.SILENT)
+    game.storymode = False
+    game.seed = seed
+
+    for option_name, option_value in config.items():
+        if not hasattr(game, option_name):
+            raise ValueError(f'Unknown setting: {option_name}')
+        setattr(game, option_name, option_value)
+    return game
+
+
+def battle_settings(game: ZombieSurvival) -> Dict[str, Any]:
+    """ Settings of a game the headless engines take as keyword arguments, for their `from_game` """
+    return dict(
+        zombie_count=game.zombie_count,
+        survivor_count=game.survivor_count,
+        hit_chance=game.hit_chance,
+        zombify_chance=game.zombify_chance,
+        zombie_variety=game.zombie_variety,
+        weapon_variety=game.weapon_variety,
+        armor_variety=game.armor_variety
+    )
+
+
+def _fight(game: ZombieSurvival, engine: str) -> BattleResult:
+    if engine == 'vectorized':
+        from vectorized import VectorizedBattle
+        return VectorizedBattle.from_game(game, rng=numpy_generator(make_rng(game.seed))).run()
+    if engine == 'buckets':
+        from buckets import BucketBattle
+        return BucketBattle.from_game(game, rng=numpy_generator(make_rng(game.seed))).run()
+    if engine == 'shared':
+        from shared import SharedBattle
+        return SharedBattle.from_game(game, rng=numpy_generator(make_rng(game.seed))).run()
+    game.engine = engine
+    return game.simulate()
+
+
+def spawn_seeds(seed: Optional[int], runs: int, first: int = 0) -> Iterable[Seed]:
+    """
+    Independent seeds for the runs `first` to `first + runs - 1` of a batch, or no seeds at all.
+    Run i always gets the i-th child of `SeedSequence(seed)`, however the batch is split.
+    """
+    if seed is None:
+        return repeat(None, runs)
+    return (np.random.SeedSequence(seed, spawn_key=(run,)) for run in range(first, first + runs))
+
+
+def simulate_many(
+        config: Dict[str, Any],
+        runs: int,
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        engine: Literal['threads', 'turns', 'pool', 'vectorized', 'buckets', 'shared'] = 'threads',
+        seed: Optional[int] = None
+) -> List[BattleResult]:
+    """
+    Runs `runs` headless battles with the same settings.
+    With `parallel` the runs are spread over a process pool using all cores unless `max_workers` is given.
+    A `seed` gives every run its own independent seed, so the batch is reproducible no matter how it's spread.
+    """
+    return list(simulate_stream(config, runs, parallel, max_workers, engine, seed))
+
+
+def simulate_stream(
+        config: Dict[str, Any],
+        runs: int,
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        engine: Literal['threads', 'turns', 'pool', 'vectorized', 'buckets', 'shared'] = 'threads',
+        seed: Optional[int] = None
+) -> Iterator[BattleResult]:
+    """ Like `simulate_many`, but hands out the results in order as they come, e.g. into a `storage.ResultWriter` """
+    seeds = spawn_seeds(seed, runs)
+    run_once = partial(simulate_once, config, engine)
+    if not parallel:
+        for run_seed in seeds:
+            yield run_once(run_seed)
+        return
+
+    workers = max_workers or os.cpu_count() or 1
+    # Ship the runs in chunks, otherwise pickling dominates for short battles
+    chunksize = max(1, runs // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(run_once, seeds, chunksize=chunksize)
+
+
+def simulate_adaptive(
+        config: Dict[str, Any],
+        precision: float = 0.005,
+        confidence: float = 0.95,
+        max_runs: int = 100000,
+        min_runs: int = 30,
+        batch_size: int = 100,
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        engine: Literal['threads', 'turns', 'pool', 'vectorized', 'buckets', 'shared'] = 'threads',
+        seed: Optional[int] = None,
+        target: Optional[float] = None
+) -> AdaptiveEstimate:
+    """
+    Estimates the win probability of the survivors with as few runs as the precision needs: battles are run in
+    batches until the confidence interval is at most `precision` wide on each side or `max_runs` are used up.
+    Close scenarios get many runs, clear ones stop early. With a `seed` the first runs equal `simulate_many`.
+    Given a `target` it stops as well once the interval lies on one side of it, which is all a comparison needs.
+    """
+    seed_sequence = np.random.SeedSequence(seed) if seed is not None else None
+    run_once = partial(simulate_once, config, engine)
+    runs = wins = 0
+    survivors_left, zombies_left = RunningMean(), RunningMean()
+    low, high = 0.0, 1.0
+    decided = False
+
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) if parallel else nullcontext() as executor:
+        while runs < max_runs:
+            batch = min(batch_size, max_runs - runs)
+            seeds = seed_sequence.spawn(batch) if seed_sequence is not None else repeat(None, batch)
+            if executor is not None:
+                results = executor.map(run_once, seeds, chunksize=max(1, batch // (workers * 4)))
+            else:
+                results = map(run_once, seeds)
+
+            for result in results:
+                wins += result.winner == 'survivors'
+                survivors_left.add(result.survivors_left)
+                zombies_left.add(result.zombies_left)
+            runs += batch
+
+            low, high = wilson_interval(wins, runs, confidence)
+            decided = runs >= min_runs and (
+                (high - low) / 2 <= precision or (target is not None and not low <= target <= high)
+            )
+            if decided:
+                break
+
+    return AdaptiveEstimate(
+        win_probability=wins / runs if runs else 0.0,
+        low=low,
+        high=high,
+        runs=runs,
+        converged=decided,
+        survivors_left=survivors_left.mean,
+        survivors_left_error=survivors_left.half_width(confidence),
+        zombies_left=zombies_left.mean,
+        zombies_left_error=zombies_left.half_width(confidence)
+    )
+
+
+def _summarize_runs(config: Dict[str, Any], engine: str, seed: Optional[int], first: int, runs: int) -> BatchSummary:
+    """ Aggregates a share of the runs of `summarize_many`, possibly in a worker process """
+    defaults = headless_game(config, engine, None)
+    summary = BatchSummary(defaults.zombie_count, defaults.survivor_count)
+    for run_seed in spawn_seeds(seed, runs, first):
+        game = headless_game(config, engine, run_seed)
+        if engine in HEADLESS_ENGINES:
+            # Has no survivors of its own to count the kills of
+            summary.add(_fight(game, engine))
+            continue
+        game.metrics = BattleMetrics()
+        result = _fight(game, engine)
+        stats = game.metrics.survivors
+        summary.add(result, kills=[stats[survivor].kills if survivor in stats else 0 for survivor in game.survivors])
+    return summary
+
+
+def summarize_many(
+        config: Dict[str, Any],
+        runs: int,
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        engine: Literal['threads', 'turns', 'pool', 'vectorized', 'buckets', 'shared'] = 'threads',
+        seed: Optional[int] = None
+) -> BatchSummary:
+    """
+    Like `simulate_many`, but aggregates the results on the fly instead of keeping them, including the kills of
+    every survivor. In parallel every worker summarizes its share of the runs and only the summaries are merged.
+    """
+    if not parallel:
+        return _summarize_runs(config, engine, seed, 0, runs)
+
+    workers = max_workers or os.cpu_count() or 1
+    shares = min(runs, workers * 4) or 1
+    bounds = [runs * share // shares for share in range(shares + 1)]
+    firsts = bounds[:-1]
+    counts = [stop - start for start, stop in zip(bounds, bounds[1:])]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        summaries = executor.map(_summarize_runs, repeat(config), repeat(engine), repeat(seed), firsts, counts)
+        summary = next(summaries)
+        for share in summaries:
+            summary.merge(share)
+    return summary
@@ -0,0 +1,97 @@
+from collections import defaultdict
+from typing import Dict, Literal, NamedTuple, Tuple
+
+import numpy as np
+
+from models import bound_chance
+
+__all__ = ['OutcomeDistribution', 'solve', 'solve_game']
+
+Outcome = Tuple[Literal['survivors', 'zombies'], int]
+
+
+class OutcomeDistribution(NamedTuple):
+    """ Exact distribution of how a battle ends """
+    win_probability: float
+    expected_survivors: float  # survivors left on average, counting lost battles as 0
+    expected_zombies: float  # zombies left on average, counting won battles as 0
+    outcomes: Dict[Outcome, float]  # e.g. ('survivors', 3) -> probability that exactly 3 survive
+
+
+def _success(chance: int) -> float:
+    """ Probability of `random.randint(1, 100) < chance` """
+    return min(max(chance - 1, 0), 100) / 100
+
+
+def solve(zombie_count: int, survivor_count: int, hit_chance: int, zombify_chance: int) -> OutcomeDistribution:
+    """
+    Computes the outcome of a battle without zombie, weapon and armor variety exactly.
+    The battle is a Markov chain over (survivors, of which haven't evaded yet, zombies), each step one
+    random survivor attacks one zombie. States with the same survivors form a layer over the zombie count,
+    every transition leads to a state with less zombies in the same layer or to a later layer,
+    so each layer is final once the earlier ones pushed their probability mass into it.
+    """
+    kill = _success(bound_chance(hit_chance))
+    kill_evaded = _success(bound_chance(hit_chance) + 3)
+    bite = _success(bound_chance(zombify_chance))
+
+    # Bitten survivors join the horde, so there are never more zombies than everyone together
+    size = zombie_count + survivor_count + 1
+    layers: Dict[Tuple[int, int], np.ndarray] = dict()
+    outcomes: Dict[Outcome, float] = defaultdict(float)
+
+    def layer(survivors: int, fresh: int) -> np.ndarray:
+        if (survivors, fresh) not in layers:
+            layers[(survivors, fresh)] = np.zeros(size)
+        return layers[(survivors, fresh)]
+
+    layer(survivor_count, survivor_count)[zombie_count] = 1.0
+    for survivors in range(survivor_count, 0, -1):
+        for fresh in range(survivors, -1, -1):
+            inflow = layers.pop((survivors, fresh), None)
+            occupied = np.flatnonzero(inflow) if inflow is not None else []
+            if not len(occupied):
+                continue
+
+            fresh_attacks = fresh / survivors
+            evaded_attacks = (survivors - fresh) / survivors
+            # An evaded survivor evading again doesn't change anything, so only the other transitions count
+            scale = 1 / (1 - evaded_attacks * (1 - kill_evaded) * (1 - bite))
+            kills = scale * (fresh_attacks * kill + evaded_attacks * kill_evaded)
+
+            # Kills move the mass down within the layer, one zombie after the other
+            mass = inflow.tolist()
+            for zombies in range(int(occupied[-1]), 0, -1):
+                mass[zombies - 1] += mass[zombies] * kills
+            outcomes[('survivors', survivors)] += mass[0]
+
+            fighting = np.array(mass[1:-1])  # no zombie left ends the battle, a full horde can't have survivors
+            if fresh:
+                fresh_misses = scale * fresh_attacks * (1 - kill)
+                layer(survivors - 1, fresh - 1)[2:] += fighting * fresh_misses * bite
+                layer(survivors, fresh - 1)[1:-1] += fighting * fresh_misses * (1 - bite)
+            if survivors > fresh:
+                layer(survivors - 1, fresh)[2:] += fighting * scale * evaded_attacks * (1 - kill_evaded) * bite
+
+    for zombies in np.flatnonzero(layers.get((0, 0), [])):
+        outcomes[('zombies', int(zombies))] += float(layers[(0, 0)][zombies])
+
+    outcomes = {outcome: probability for outcome, probability in outcomes.items() if probability}
+    return OutcomeDistribution(
+        win_probability=sum(p for (winner, _), p in outcomes.items() if winner == 'survivors'),
+        expected_survivors=sum(p * count for (winner, count), p in outcomes.items() if winner == 'survivors'),
+        expected_zombies=sum(p * count for (winner, count), p in outcomes.items() if winner == 'zombies'),
+        outcomes=outcomes
+    )
+
+
+def solve_game(game) -> OutcomeDistribution:
+    """ Solves the settings of a `ZombieSurvival` instance, which must not use any variety """
+    if game.zombie_variety or game.weapon_variety or game.armor_variety:
+        raise ValueError('Only battles without zombie, weapon and armor variety can be solved exactly')
+    return solve(
+        zombie_count=game.zombie_count,
+        survivor_count=game.survivor_count,
+        hit_chance=game.hit_chance,
+        zombify_chance=game.zombify_chance
+    )
@@ -0,0 +1,201 @@
+import math
+from bisect import bisect_right
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models import BattleResult
+
+__all__ = [
+    'z_score', 'wilson_interval', 'linear_edges', 'log_edges', 'RunningMean', 'StreamingStats', 'BatchSummary'
+]
+
+
+def z_score(confidence: float) -> float:
+    """ Two-sided quantile of the standard normal distribution, e.g. 1.96 for 0.95 """
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """ Wilson score interval of a probability, unlike the normal approximation it stays sane close to 0 and 1 """
+    if not trials:
+        return 0.0, 1.0
+    z = z_score(confidence)
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (rate + z * z / (2 * trials)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+class RunningMean:
+    """ Mean and variance updated value by value with Welford's algorithm, without keeping the values """
+    count: int
+    mean: float
+    _m2: float  # sum of squared differences from the mean
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'RunningMean') -> None:
+        """ Takes in the values of `other` (Chan et al.), as if they had been added here """
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        """ Sample variance """
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        """ Half width of the confidence interval of the mean """
+        if self.count < 2:
+            return math.inf
+        return z_score(confidence) * self.stdev / math.sqrt(self.count)
+
+
+def linear_edges(low: float, high: float, bins: int) -> List[float]:
+    return [low + (high - low) * position / bins for position in range(bins + 1)]
+
+
+def log_edges(low: float, high: float, bins: int) -> List[float]:
+    """ Bins growing by a constant factor, for values spanning orders of magnitude like durations """
+    return [low * (high / low) ** (position / bins) for position in range(bins + 1)]
+
+
+def _count_edges(maximum: int, bins: int) -> List[float]:
+    """ Bins for the counts 0 to `maximum`, each count gets its own bin as long as there are few of them """
+    return linear_edges(0, maximum + 1, min(maximum + 1, bins))
+
+
+class StreamingStats(RunningMean):
+    """
+    Running mean and variance plus minimum, maximum and a histogram over fixed bins, which approximates quantiles.
+    Instances with the same bins merge into one describing all values, so workers can aggregate on their own
+    and only ship their stats, whose size doesn't depend on the number of values.
+    """
+    edges: List[float]  # bin i counts the values in [edges[i], edges[i + 1]), values outside count to the outer bins
+    counts: List[int]
+    minimum: float
+    maximum: float
+    integer: bool  # only whole numbers are added, so are the quantiles
+
+    def __init__(self, edges: Sequence[float], integer: bool = False):
+        super().__init__()
+        if len(edges) < 2:
+            raise ValueError('A histogram needs at least two edges')
+        self.edges = list(edges)
+        self.integer = integer
+        self.counts = [0] * (len(self.edges) - 1)
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float) -> None:
+        super().add(value)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.counts[min(max(bisect_right(self.edges, value) - 1, 0), len(self.counts) - 1)] += 1
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: 'StreamingStats') -> None:
+        if other.edges != self.edges:
+            raise ValueError('Only stats with the same histogram bins can be merged')
+        super().merge(other)
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+
+    def quantile(self, q: float) -> float:
+        """ Approximation which assumes the values to be spread evenly within their bin """
+        if not self.count:
+            return math.nan
+        target = q * self.count
+        below = 0
+        for position, count in enumerate(self.counts):
+            if count and below + count >= target:
+                # The outer bins reach out to the extremes, which might lie outside the edges
+                low = max(self.edges[position], self.minimum) if position else self.minimum
+                high = min(self.edges[position + 1], self.maximum) if position < len(self.counts) - 1 else self.maximum
+                value = low + (high - low) * max(target - below, 0) / count
+                return math.floor(value) if self.integer else value
+            below += count
+        return self.maximum
+
+    def to_dict(self) -> Dict[str, float]:
+        return dict(
+            count=self.count,
+            mean=self.mean,
+            stdev=self.stdev,
+            min=self.minimum if self.count else math.nan,
+            max=self.maximum if self.count else math.nan,
+            p50=self.quantile(0.5),
+            p90=self.quantile(0.9),
+            p99=self.quantile(0.99),
+        )
+
+
+class BatchSummary:
+    """ Everything worth knowing about a batch of battles with the same settings, in constant memory """
+    runs: int
+    survivor_wins: int
+    survivors_left: StreamingStats
+    zombies_left: StreamingStats
+    duration: StreamingStats  # seconds
+    kills: StreamingStats  # per survivor and battle
+
+    def __init__(self, zombie_count: int, survivor_count: int, bins: int = 100):
+        self.runs = 0
+        self.survivor_wins = 0
+        self.survivors_left = StreamingStats(_count_edges(survivor_count, bins), integer=True)
+        self.zombies_left = StreamingStats(_count_edges(zombie_count + survivor_count, bins), integer=True)
+        self.duration = StreamingStats(log_edges(1e-6, 1e5, bins))
+        self.kills = StreamingStats(_count_edges(zombie_count, bins), integer=True)
+
+    def add(self, result: BattleResult, kills: Optional[Iterable[int]] = None) -> None:
+        self.runs += 1
+        self.survivor_wins += result.winner == 'survivors'
+        self.survivors_left.add(result.survivors_left)
+        self.zombies_left.add(result.zombies_left)
+        self.duration.add(result.duration)
+        if kills is not None:
+            self.kills.extend(kills)
+
+    def merge(self, other: 'BatchSummary') -> None:
+        self.runs += other.runs
+        self.survivor_wins += other.survivor_wins
+        for name in ('survivors_left', 'zombies_left', 'duration', 'kills'):
+            getattr(self, name).merge(getattr(other, name))
+
+    @property
+    def win_rate(self) -> float:
+        return self.survivor_wins / self.runs if self.runs else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            runs=self.runs,
+            survivor_wins=self.survivor_wins,
+            win_rate=self.win_rate,
+            survivors_left=self.survivors_left.to_dict(),
+            zombies_left=self.zombies_left.to_dict(),
+            duration=self.duration.to_dict(),
+            kills=self.kills.to_dict(),
+        )
@@ -0,0 +1,169 @@
+import os
+import struct
+from typing import Any, BinaryIO, Dict, Iterable, Iterator
+
+import numpy as np
+
+from models import BattleResult
+
+__all__ = ['COLUMNS', 'ResultWriter', 'ResultStore']
+
+# One .npy file per field of `BattleResult`, the winner is stored as index into WINNERS
+COLUMNS: Dict[str, np.dtype] = {
+    'winner': np.dtype('<u1'),
+    'survivors_left': np.dtype('<i8'),
+    'zombies_left': np.dtype('<i8'),
+    'duration': np.dtype('<f8'),
+}
+WINNERS = ('survivors', 'zombies')
+
+# The header has a fixed size, so the row count can be rewritten in place while the data grows behind it
+HEADER_SIZE = 128
+MAGIC = b'\x93NUMPY\x01\x00'
+
+
+def _header(dtype: np.dtype, count: int) -> bytes:
+    """ Version 1.0 .npy header of a one dimensional array, padded to HEADER_SIZE """
+    description = f"{{'descr': '{dtype.str}', 'fortran_order': False, 'shape': ({count},), }}"
+    header_length = HEADER_SIZE - len(MAGIC) - 2
+    return MAGIC + struct.pack('<H', header_length) + description.ljust(header_length - 1).encode('latin1') + b'\n'
+
+
+def _count(path: str, dtype: np.dtype) -> int:
+    """ Complete rows of a column file, found by its size rather than the header, which might lag behind after a crash """
+    with open(path, 'rb') as column_file:
+        if column_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is no result column')
+    return (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+
+
+class ResultWriter:
+    """
+    Appends results to the columns of a store, buffering `buffer_size` rows in memory.
+    The headers are updated with every flush, so readers see all flushed rows even while the writer keeps going.
+    """
+    directory: str
+    buffer_size: int
+    count: int  # rows in the files, not counting the buffer
+
+    def __init__(self, directory: str, buffer_size: int = 65536):
+        self.directory = directory
+        self.buffer_size = buffer_size
+        os.makedirs(directory, exist_ok=True)
+
+        self._files: Dict[str, BinaryIO] = dict()
+        counts = []
+        for name, dtype in COLUMNS.items():
+            path = os.path.join(directory, f'{name}.npy')
+            if os.path.exists(path):
+                counts.append(_count(path, dtype))
+                self._files[name] = open(path, 'r+b')
+            else:
+                counts.append(0)
+                self._files[name] = open(path, 'w+b')
+                self._files[name].write(_header(dtype, 0))
+        # Columns of different length can only come from a crash in the middle of a flush
+        self.count = min(counts)
+        for name, column_file in self._files.items():
+            column_file.truncate(HEADER_SIZE + self.count * COLUMNS[name].itemsize)
+
+        self._buffer = {name: np.empty(buffer_size, dtype) for name, dtype in COLUMNS.items()}
+        self._buffered = 0
+
+    def append(self, result: BattleResult) -> None:
+        position = self._buffered
+        self._buffer['winner'][position] = WINNERS.index(result.winner)
+        self._buffer['survivors_left'][position] = result.survivors_left
+        self._buffer['zombies_left'][position] = result.zombies_left
+        self._buffer['duration'][position] = result.duration
+        self._buffered += 1
+        if self._buffered == self.buffer_size:
+            self.flush()
+
+    def extend(self, results: Iterable[BattleResult]) -> int:
+        """ Appends everything, e.g. straight from `simulation.simulate_stream`, and returns how many """
+        appended = 0
+        for result in results:
+            self.append(result)
+            appended += 1
+        return appended
+
+    def flush(self) -> None:
+        if not self._buffered:
+            return
+        for name, column_file in self._files.items():
+            column_file.seek(0, os.SEEK_END)
+            column_file.write(self._buffer[name][:self._buffered].tobytes())
+        self.count += self._buffered
+        self._buffered = 0
+
+        for name, column_file in self._files.items():
+            column_file.seek(0)
+            column_file.write(_header(COLUMNS[name], self.count))
+            column_file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        for column_file in self._files.values():
+            column_file.close()
+
+    def __enter__(self) -> 'ResultWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class ResultStore:
+    """
+    Read access to the results in a directory. The columns are memory mapped, nothing is read before it's used,
+    and the aggregates walk through them in chunks, so stores larger than the RAM work as well.
+    """
+    directory: str
+    columns: Dict[str, np.ndarray]
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.columns = {
+            name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+            for name in COLUMNS
+        }
+
+    @classmethod
+    def writer(cls, directory: str, buffer_size: int = 65536) -> ResultWriter:
+        return ResultWriter(directory, buffer_size)
+
+    def __len__(self) -> int:
+        return min(len(column) for column in self.columns.values())
+
+    def __getitem__(self, index: int) -> BattleResult:
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return BattleResult(
+            winner=WINNERS[self.columns['winner'][index]],
+            survivors_left=int(self.columns['survivors_left'][index]),
+            zombies_left=int(self.columns['zombies_left'][index]),
+            duration=float(self.columns['duration'][index])
+        )
+
+    def __iter__(self) -> Iterator[BattleResult]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def summary(self, chunk_size: int = 1 << 20) -> Dict[str, Any]:
+        """ Same aggregates the CLI prints, computed chunk by chunk """
+        runs = len(self)
+        survivor_wins = 0
+        totals = dict(survivors_left=0, zombies_left=0, duration=0.0)
+        for start in range(0, runs, chunk_size):
+            survivor_wins += int(np.count_nonzero(self.columns['winner'][start:start + chunk_size] == 0))
+            for name in totals:
+                totals[name] += self.columns[name][start:start + chunk_size].sum()
+        return dict(
+            runs=runs,
+            survivor_wins=survivor_wins,
+            win_rate=survivor_wins / runs if runs else 0.0,
+            mean_survivors_left=float(totals['survivors_left']) / runs if runs else 0.0,
+            mean_zombies_left=float(totals['zombies_left']) / runs if runs else 0.0,
+            mean_duration=float(totals['duration']) / runs if runs else 0.0,
+        )
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product, repeat
+from typing import Any, Dict, List, Literal, NamedTuple, Optional, Sequence
+
+from models import BattleResult
+from simulation import ENGINE_VERSION, ENGINES, simulate_once, spawn_seeds
+
+__all__ = ['SweepPoint', 'ResultCache', 'expand_grid', 'sweep']
+
+Settings = Dict[str, Any]
+
+
+class SweepPoint(NamedTuple):
+    settings: Settings
+    results: List[BattleResult]
+    cached: bool  # loaded from the cache instead of simulated
+
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[Settings]:
+    """ Every combination of the values, e.g. `{'hit_chance': [40, 60], 'zombie_count': [10]}` gives two points """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in product(*(grid[name] for name in names))]
+
+
+class ResultCache:
+    """
+    Results on disk, one JSON file per point named by the hash of everything that decides the outcome.
+    Once the files take more than `max_bytes`, the least recently used ones are removed.
+    """
+    directory: str
+    max_bytes: int
+
+    def __init__(self, directory: str = '.sweep-cache', max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(settings: Settings, engine: str, seed: Optional[int], runs: int) -> str:
+        content = dict(settings=settings, engine=engine, seed=seed, runs=runs, version=ENGINE_VERSION)
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[BattleResult]]:
+        path = self._path(key)
+        try:
+            with open(path) as cache_file:
+                results = [BattleResult(**result) for result in json.load(cache_file)]
+        except (OSError, ValueError, TypeError):
+            return None  # missing, or left broken by an interrupted job
+        os.utime(path)  # the modification time tracks the last use for the eviction
+        return results
+
+    def put(self, key: str, results: List[BattleResult]) -> None:
+        path = self._path(key)
+        # Write aside and rename, so concurrent jobs never read half a file
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'w') as cache_file:
+            json.dump([result._asdict() for result in results], cache_file)
+        os.replace(temporary_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # another job evicted it already
+                pass
+            size -= entry_size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith('.json'))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+
+def sweep(
+        grid: Dict[str, Sequence[Any]],
+        runs: int = 1,
+        engine: Literal['threads', 'turns', 'pool', 'vectorized', 'buckets', 'shared'] = 'threads',
+        seed: Optional[int] = None,
+        cache: Optional[ResultCache] = None,
+        parallel: bool = True,
+        max_workers: Optional[int] = None
+) -> List[SweepPoint]:
+    """
+    Runs `runs` battles for every point of the grid, the runs of a point equal `simulate_many` with the same seed.
+    Points found in the cache are skipped, the runs of all missing points are spread over one process pool.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown engine: {engine}')
+
+    points = expand_grid(grid)
+    keys = [ResultCache.key(settings, engine, seed, runs) for settings in points]
+    cached = [cache.get(key) if cache is not None else None for key in keys]
+    missing = [index for index, results in enumerate(cached) if results is None]
+
+    configs = [points[index] for index in missing for _ in range(runs)]
+    seeds = [run_seed for _ in missing for run_seed in spawn_seeds(seed, runs)]
+    if parallel and configs:
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(configs) // (workers * 4))
+            simulated = list(executor.map(simulate_once, configs, repeat(engine), seeds, chunksize=chunksize))
+    else:
+        simulated = [simulate_once(config, engine, run_seed) for config, run_seed in zip(configs, seeds)]
+
+    for position, index in enumerate(missing):
+        results = simulated[position * runs:(position + 1) * runs]
+        if cache is not None:
+            cache.put(keys[index], results)
+        cached[index] = results
+
+    missing_points = set(missing)
+    return [
+        SweepPoint(settings=settings, results=results, cached=index not in missing_points)
+        for index, (settings, results) in enumerate(zip(points, cached))
+    ]
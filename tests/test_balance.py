@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+from balance import TargetNotBracketed, find_setting
+from solver import solve
+
+
+class BalanceTest(TestCase):
+
+    def test_find_setting__increasing(self):
+        result = find_setting(dict(zombie_count=5, survivor_count=3, zombify_chance=50), 'hit_chance', 1, 99,
+                              target=0.9, precision=0.03, engine='turns', seed=1)
+
+        self.assertEqual((result.low, result.high), (result.value, result.value))
+        # Right up to the precision, which the exact solution tells
+        self.assertGreaterEqual(solve(5, 3, result.value, 50).win_probability, 0.9 - 0.03)
+        self.assertLessEqual(solve(5, 3, result.value - 1, 50).win_probability, 0.9 + 0.03)
+        self.assertLessEqual(result.evaluations, 9)  # instead of 99 values of a sweep
+
+    def test_find_setting__decreasing(self):
+        result = find_setting(dict(survivor_count=3, hit_chance=60, zombify_chance=50), 'zombie_count', 1, 100,
+                              target=0.5, precision=0.03, engine='turns', seed=1)
+
+        self.assertGreaterEqual(solve(result.value, 3, 60, 50).win_probability, 0.5 - 0.03)
+        self.assertLessEqual(solve(result.value + 1, 3, 60, 50).win_probability, 0.5 + 0.03)
+        self.assertGreaterEqual(result.win_probability, 0.5)
+
+    def test_find_setting__resolution(self):
+        result = find_setting(dict(survivor_count=3, hit_chance=60, zombify_chance=50), 'zombie_count', 1, 100,
+                              target=0.5, resolution=20, precision=0.05, engine='turns', seed=1)
+
+        self.assertLessEqual(result.high - result.low, 19)
+        self.assertIn(result.value, (result.low, result.high))
+        self.assertLessEqual(result.evaluations, 5)
+
+    def test_find_setting__not_bracketed(self):
+        with self.assertRaises(TargetNotBracketed) as context:
+            find_setting(dict(zombie_count=5), 'hit_chance', 90, 99, target=0.01, precision=0.05, engine='turns', seed=1)
+
+        self.assertTrue(context.exception.reached)
+
+    def test_find_setting__invalid(self):
+        with self.assertRaises(ValueError):
+            find_setting(dict(), 'runs', 1, 10)
+        with self.assertRaises(ValueError):
+            find_setting(dict(), 'hit_chance', 50, 10)
+        with self.assertRaises(ValueError):
+            find_setting(dict(), 'hit_chance', 1, 99, target=1.5)
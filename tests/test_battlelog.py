@@ -0,0 +1,98 @@
+import io
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import battlelog
+from events import StreamSink
+from main import ZombieSurvival
+
+setup_game = ZombieSurvival._setup_game
+
+
+def named_setup(game: ZombieSurvival) -> None:
+    """ Survivors with fixed names, so two battles don't differ by their random names """
+    setup_game(game)
+    for number, survivor in enumerate(game.survivors):
+        survivor.name = f'Survivor {number}'
+
+
+class BattleLogTest(TestCase):
+
+    def battle(self, events, **settings) -> ZombieSurvival:
+        game = ZombieSurvival()
+        game.events = events
+        game.engine = 'turns'
+        game.seed = 4
+        game.zombie_count = 40
+        game.survivor_count = 5
+        game.zombie_variety = 5
+        game.weapon_variety = 5
+        game.armor_variety = 3
+        for name, value in settings.items():
+            setattr(game, name, value)
+        with patch.object(ZombieSurvival, '_setup_game', autospec=True, side_effect=named_setup):
+            game.start()
+        return game
+
+    def test_render_log__same_text(self):
+        for compact in (False, True):
+            for story in (True, False):
+                with self.subTest(compact=compact, story=story):
+                    stream = io.StringIO()
+                    self.battle(StreamSink(stream), compact=compact, storymode=story)
+                    sink = battlelog.BattleLogSink(chunk_size=16)
+                    self.battle(sink, compact=compact, storymode=story)
+
+                    # Only the measured duration differs between the two battles
+                    printed = [line for line in stream.getvalue().splitlines() if not line.startswith('Dauer')]
+                    lines = [line for line in battlelog.render_log(sink.log(), story) if not line.startswith('Dauer')]
+                    self.assertEqual(printed, lines)
+
+    def test_log__fixed_size_records(self):
+        sink = battlelog.BattleLogSink()
+        self.battle(sink)
+        log = sink.log()
+
+        self.assertEqual(battlelog.EVENT_DTYPE, log.events.dtype)
+        # The zombies spawn first and take the first rows of the humanoid table, the survivors follow
+        self.assertEqual(40, int((log.events['kind'] == battlelog.KINDS.index('spawn')).sum()))
+        self.assertEqual(sorted(set(log.events['survivor'].tolist()) - {battlelog.NOBODY}), list(range(40, 45)))
+        self.assertEqual(45, len(log.names))
+
+    def test_save_load(self):
+        sink = battlelog.BattleLogSink()
+        self.battle(sink)
+        log = sink.log()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'battle.npz')
+            log.save(path)
+            loaded = battlelog.BattleLog.load(path)
+
+        self.assertEqual(log.names, loaded.names)
+        self.assertEqual(log.summaries, loaded.summaries)
+        self.assertEqual(list(battlelog.render_log(log)), list(battlelog.render_log(loaded)))
+
+    def test_log_stats(self):
+        sink = battlelog.BattleLogSink()
+        self.battle(sink)
+        stats = battlelog.log_stats(sink.log())
+
+        events = stats['events']
+        self.assertEqual(events['attack'], events['kill'] + events['miss'])
+        self.assertEqual(events['miss'], events['bite'] + events['evade'])
+        self.assertEqual(events['attack'], stats['ticks'])
+        self.assertEqual(events['kill'], sum(stats['kills'].values()))
+        self.assertEqual([f'Survivor {number}' for number in range(5)], sorted(stats['kills']))
+
+    def test_record(self):
+        result, log = battlelog.record(dict(zombie_count=30, survivor_count=4), engine='turns', seed=2)
+
+        events = battlelog.log_stats(log)['events']
+        self.assertEqual(30, events['spawn'])
+        # Every bitten survivor joins the zombies, every kill removes one
+        self.assertEqual(result.zombies_left, 30 + events['bite'] - events['kill'])
+        self.assertEqual(result.survivors_left, 4 - events['bite'])
+        with self.assertRaises(ValueError):
+            battlelog.record(dict(), engine='vectorized')
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from benchmark import compare, run_benchmarks, main
+
+
+class BenchmarkTest(TestCase):
+
+    def test_compare(self):
+        baseline = {
+            'fight': {'attacks/s': 1000, 'peak_memory': 100},
+            'setup': {'setups/s': 10, 'peak_memory': 100},
+        }
+        results = {
+            'fight': {'attacks/s': 700, 'peak_memory': 100},
+            'setup': {'setups/s': 9, 'peak_memory': 200},
+            'new': {'setups/s': 1, 'peak_memory': 1},
+        }
+
+        regressions = compare(results, baseline, tolerance=0.2)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('fight: attacks/s'))
+        self.assertTrue(regressions[1].startswith('setup: peak_memory'))
+
+    @patch('builtins.print')
+    def test_run_benchmarks(self, mock_print: MagicMock):
+        results = run_benchmarks(zombie_counts=(10,), survivor_counts=(2,), engines=('turns',), repeat=1)
+
+        self.assertEqual(set(results), {
+            'humanoid zombies=10',
+            'setup zombies=10 survivors=2 storymode=False',
+            'setup zombies=10 survivors=2 storymode=True',
+            'fight turns zombies=10 survivors=2 storymode=False',
+            'fight turns zombies=10 survivors=2 storymode=True',
+            'fight turns sharded zombies=10 survivors=2 storymode=False',
+            'fight turns sharded zombies=10 survivors=2 storymode=True',
+        })
+        self.assertGreater(results['fight turns zombies=10 survivors=2 storymode=False']['attacks/s'], 0)
+        self.assertGreater(results['setup zombies=10 survivors=2 storymode=True']['peak_memory'], 0)
+
+    @patch('builtins.print')
+    @patch('benchmark.run_benchmarks')
+    def test_main__save_and_compare(self, mock_run: MagicMock, mock_print: MagicMock):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, 'baseline.json')
+
+            mock_run.return_value = {'fight': {'attacks/s': 100}}
+            self.assertEqual(main(['--quick', '--save', '--baseline', baseline]), 0)
+            with open(baseline) as baseline_file:
+                self.assertEqual(json.load(baseline_file), {'fight': {'attacks/s': 100}})
+
+            self.assertEqual(main(['--quick', '--baseline', baseline]), 0)
+            mock_run.return_value = {'fight': {'attacks/s': 10}}
+            self.assertEqual(main(['--quick', '--baseline', baseline]), 1)
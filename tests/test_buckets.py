@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+import numpy as np
+
+from buckets import BucketBattle
+from main import ZombieSurvival
+from models import BattleResult
+
+
+class BucketBattleTest(TestCase):
+
+    def test___init__(self):
+        battle = BucketBattle(zombie_count=4, survivor_count=3, hit_chance=150, zombify_chance=-5)
+
+        self.assertEqual(battle.zombies.tolist(), [4])
+        self.assertEqual(battle.zombie_hit_chance.tolist(), [1])  # clipped like Humanoid.hit_chance
+        self.assertEqual(battle.survivors.shape, (1, 1, 2))
+        self.assertEqual(battle.survivors[0, 0].tolist(), [3, 0])
+        self.assertEqual(battle.survivor_hit_chance[0, 0].tolist(), [99, 102])
+
+    def test___init____varieties(self):
+        battle = BucketBattle(
+            zombie_count=10 ** 12, survivor_count=500, hit_chance=50, zombify_chance=50,
+            zombie_variety=5, weapon_variety=10, armor_variety=7
+        )
+
+        # Memory depends on the varieties only, not on the number of humanoids
+        self.assertEqual(battle.zombies.shape, (11,))
+        self.assertEqual(int(battle.zombies.sum()), 10 ** 12)
+        self.assertEqual(battle.zombie_hit_chance.tolist(), list(range(45, 56)))
+        self.assertEqual(battle.survivors.shape, (11, 8, 2))
+        self.assertEqual(int(battle.survivors.sum()), 500)
+        self.assertFalse(battle.survivors[..., 1].any())
+        self.assertEqual(battle.survivor_hit_chance[10, 0, 0], 60)
+        self.assertEqual(battle.survivor_defense[0, 7, 0], 7)
+
+    def test_from_game(self):
+        game = ZombieSurvival()
+        game.zombie_count = 7
+        game.survivor_count = 2
+
+        battle = BucketBattle.from_game(game)
+
+        self.assertEqual(int(battle.zombies.sum()), 7)
+        self.assertEqual(int(battle.survivors.sum()), 2)
+
+    def test_run__survivors_always_hit(self):
+        battle = BucketBattle(zombie_count=10, survivor_count=3, hit_chance=99, zombify_chance=1)
+        battle.survivor_hit_chance[:] = 101  # every roll hits
+
+        result = battle.run()
+
+        self.assertEqual(result, BattleResult('survivors', 3, 0, result.duration))
+        self.assertEqual(battle.attacks, 10)
+        self.assertEqual(battle.rounds, 4)
+
+    def test_run__zombies_always_bite(self):
+        battle = BucketBattle(zombie_count=2, survivor_count=5, hit_chance=1, zombify_chance=99)
+        battle.zombie_hit_chance[:] = 101  # always bites
+
+        result = battle.run()
+
+        self.assertEqual(result, BattleResult('zombies', 0, 2 + 5, result.duration))
+
+    def test_run__evade_bonus(self):
+        battle = BucketBattle(zombie_count=1, survivor_count=1, hit_chance=98, zombify_chance=1)
+        battle.survivor_hit_chance[..., 0] = 1  # never hits before evading
+        battle.zombie_hit_chance[:] = 0  # never bites, so the survivor evades
+
+        battle._fight_round()
+        self.assertEqual(battle.survivors[0, 0].tolist(), [0, 1])
+        self.assertEqual(battle.zombies.tolist(), [1])
+
+        result = battle.run()  # 98 + 3 always hits
+        self.assertEqual(result.winner, 'survivors')
+
+    def test_run__consistent_counts(self):
+        for seed in range(20):
+            battle = BucketBattle(
+                zombie_count=50, survivor_count=10, hit_chance=60, zombify_chance=30,
+                zombie_variety=3, weapon_variety=3, armor_variety=2, rng=np.random.default_rng(seed)
+            )
+            result = battle.run()
+            if result.winner == 'survivors':
+                self.assertEqual(result.zombies_left, 0)
+            else:
+                self.assertEqual(result.survivors_left, 0)
+            self.assertTrue((battle.zombies >= 0).all() and (battle.survivors >= 0).all())
@@ -0,0 +1,152 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+import checkpoint
+from events import EventSink
+from main import ZombieSurvival
+from models import Humanoid
+from sharded import ShardedZombiePool
+
+
+class Interrupted(Exception):
+    pass
+
+
+class CheckpointTest(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'battle.npz')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def game(self, **settings) -> ZombieSurvival:
+        game = ZombieSurvival()
+        game.events = EventSink()
+        game.engine = 'turns'
+        game.seed = 9
+        game.zombie_count = 300
+        game.survivor_count = 6
+        game.zombie_variety = 5
+        game.weapon_variety = 5
+        game.armor_variety = 3
+        for name, value in settings.items():
+            setattr(game, name, value)
+        return game
+
+    def interrupt(self, game: ZombieSurvival, after: int) -> None:
+        """ Runs the battle until `after` checkpoints are written, like a process that dies """
+        saved = []
+
+        def save(battle: ZombieSurvival, path: str) -> None:
+            checkpoint.save_checkpoint(battle, path)
+            saved.append(path)
+            if len(saved) == after:
+                raise Interrupted()
+
+        game.checkpoint_path = self.path
+        game.checkpoint_interval = 0
+        with patch('main.save_checkpoint', side_effect=save), self.assertRaises(Interrupted):
+            game.simulate()
+
+    def test_resume__same_result(self):
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                expected = self.game(compact=compact).simulate()
+                self.interrupt(self.game(compact=compact), after=5)
+
+                result = checkpoint.resume(self.path, events=EventSink(), checkpoint_path=None)
+
+                self.assertEqual(result[:3], expected[:3])
+
+    def test_load_checkpoint(self):
+        game = self.game()
+        self.interrupt(game, after=2)
+
+        restored = checkpoint.load_checkpoint(self.path, events=EventSink())
+
+        self.assertEqual(restored.zombie_count, 300)
+        self.assertEqual(restored.engine, 'turns')
+        self.assertEqual(restored.checkpoint_path, self.path)
+        self.assertGreater(restored.resumed_elapsed.total_seconds(), 0)
+        # Names nobody looked at are not part of the battle
+        self.assertEqual([s.modifier_info for s in restored.survivors], [s.modifier_info for s in game.survivors])
+        self.assertEqual([s.evaded for s in restored.survivors], [s.evaded for s in game.survivors])
+        self.assertEqual(
+            [(z.modifier_info, z.hit_chance) for z in restored.zombies.queue],
+            [(z.modifier_info, z.hit_chance) for z in game.zombies.queue]
+        )
+
+    def test_resume__elapsed_only_counts_once(self):
+        self.interrupt(self.game(), after=1)
+        game = checkpoint.load_checkpoint(self.path, events=EventSink(), checkpoint_path=None)
+        game.resumed_elapsed = timedelta(hours=1)
+
+        resumed = game._result(game._start_fights())
+        again = game.simulate()
+
+        self.assertGreaterEqual(resumed.duration, 3600)
+        self.assertLess(again.duration, 3600)
+        self.assertEqual(game.resumed_elapsed, timedelta(0))
+
+    def test_save_checkpoint__compact_format(self):
+        game = self.game(zombie_count=1000, survivor_count=3)
+        game._setup_game()
+        game.survivors[0].name = 'Rick'
+        game._fights_started = datetime.now()
+        checkpoint.save_checkpoint(game, self.path)
+
+        with np.load(self.path) as saved:
+            # The numbered zombies are named by their rows, only real names are stored
+            self.assertEqual(saved['names'].tolist(), ['Rick'])
+            self.assertEqual(saved['rng_block'].dtype, np.float64)
+            self.assertLess(saved['state'].nbytes, 2000)
+        restored = checkpoint.load_checkpoint(self.path)
+        self.assertEqual([zombie.name for zombie in restored.zombies.queue], [str(number) for number in range(1, 1001)])
+        self.assertEqual(restored.survivors[0].name, 'Rick')
+
+    def test_load_checkpoint__bitten_survivor_stays_one_object(self):
+        game = self.game(zombie_count=1, survivor_count=2)
+        game._setup_game()
+        bitten = game.survivors[0]
+        bitten.zombify(hit_chance=30)
+        game.zombies.put(bitten)
+        game._fights_started = game.resumed_elapsed = datetime.now()
+        checkpoint.save_checkpoint(game, self.path)
+
+        restored = checkpoint.load_checkpoint(self.path)
+
+        self.assertIs(list(restored.zombies.queue)[-1], restored.survivors[0])
+        self.assertFalse(restored.survivors[0])
+
+    def test_resume__sharded_pool(self):
+        expected = self.game(zombie_pool='sharded').simulate()
+        self.interrupt(self.game(zombie_pool='sharded'), after=3)
+
+        restored = checkpoint.load_checkpoint(self.path, events=EventSink())
+        self.assertIsInstance(restored.zombies, ShardedZombiePool)
+        result = checkpoint.resume(self.path, events=EventSink(), checkpoint_path=None)
+        self.assertEqual(result[:3], expected[:3])
+
+    def test_load_checkpoint__unknown_option(self):
+        self.interrupt(self.game(), after=1)
+
+        with self.assertRaises(ValueError):
+            checkpoint.load_checkpoint(self.path, foo=1)
+
+    def test_save_checkpoint__unseeded(self):
+        game = self.game(seed=None, zombie_count=2, survivor_count=1)
+        game.survivors = [Humanoid(hit_chance=50)]
+        game._fights_started = datetime.now()
+        checkpoint.save_checkpoint(game, self.path)
+
+        restored = checkpoint.load_checkpoint(self.path)
+
+        self.assertIsNone(restored.seed)
+        self.assertEqual(len(restored.survivors), 1)
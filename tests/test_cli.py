@@ -0,0 +1,229 @@
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+import cli
+from models import BattleResult
+from storage import ResultStore
+
+
+class CliTest(TestCase):
+
+    def test_parse_number(self):
+        self.assertEqual(cli.parse_number('1e6'), '1000000')
+        self.assertEqual(cli.parse_number(' 42 '), '42')
+        self.assertEqual(cli.parse_number('1.5'), '1.5')
+        self.assertEqual(cli.parse_number('foo'), 'foo')
+
+    def test_validate_settings(self):
+        settings = cli.validate_settings(dict(zombie_count='2e3', hit_chance=40, engine='turns', parallel=True))
+
+        self.assertEqual(settings, dict(zombie_count=2000, hit_chance=40, engine='turns', parallel=True))
+
+    def test_validate_settings__invalid(self):
+        for settings in (
+                dict(hit_chance=100),
+                dict(survivor_count=0),
+                dict(zombie_count='1.5'),
+                dict(engine='foo'),
+                dict(parallel='yes'),
+                dict(precision=1),
+                dict(confidence='foo'),
+                dict(foo=1),
+        ):
+            with self.subTest(settings=settings), self.assertRaises(ValueError):
+                cli.validate_settings(settings)
+
+    def test_load_scenario__json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'scenario.json')
+            with open(path, 'w') as scenario_file:
+                json.dump(dict(zombie_count=1e6, survivor_count=500, runs=10), scenario_file)
+
+            scenario = cli.load_scenario(path)
+
+        self.assertEqual(scenario, dict(zombie_count=1000000, survivor_count=500, runs=10))
+
+    def test_write_results(self):
+        results = [
+            BattleResult(winner='survivors', survivors_left=2, zombies_left=0, duration=0.5),
+            BattleResult(winner='zombies', survivors_left=0, zombies_left=7, duration=1.5),
+        ]
+        outputs = dict()
+        for output_format in cli.FORMATS:
+            stream = io.StringIO()
+            cli.write_results(results, output_format, stream)
+            outputs[output_format] = stream.getvalue()
+
+        self.assertIn('Gewinner Überlebende: 1 (50.0%)', outputs['text'])
+        self.assertEqual(json.loads(outputs['json'])['summary']['mean_zombies_left'], 3.5)
+        self.assertEqual(
+            [json.loads(line)['winner'] for line in outputs['jsonl'].splitlines()],
+            ['survivors', 'zombies']
+        )
+        self.assertEqual(outputs['csv'].splitlines(), [
+            'run,winner,survivors_left,zombies_left,duration',
+            '1,survivors,2,0,0.5',
+            '2,zombies,0,7,1.5',
+        ])
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    def test_main__simulate(self, mock_stdout: io.StringIO):
+        argv = ['simulate', '--zombies', '1e1', '--survivors', '2', '--runs', '3', '--seed', '4', '--engine', 'turns',
+                '--format', 'jsonl']
+
+        self.assertEqual(cli.main(argv), 0)
+        first = mock_stdout.getvalue()
+        mock_stdout.seek(0)
+        mock_stdout.truncate()
+        cli.main(argv)
+
+        def outcomes(output: str):
+            return [json.loads(line)['zombies_left'] for line in output.splitlines()]
+        self.assertEqual(len(outcomes(first)), 3)
+        self.assertEqual(outcomes(first), outcomes(mock_stdout.getvalue()))
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    def test_main__store(self, mock_stdout: io.StringIO):
+        with tempfile.TemporaryDirectory() as directory:
+            argv = ['simulate', '--zombies', '10', '--runs', '3', '--engine', 'turns', '--store', directory]
+            cli.main(argv)
+            cli.main(argv + ['--format', 'csv'])
+
+            self.assertEqual(len(ResultStore(directory)), 6)
+        self.assertIn('Läufe: 3', mock_stdout.getvalue())
+        self.assertIn('\n6,', mock_stdout.getvalue())
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    def test_main__checkpoint_resume(self, mock_stdout: io.StringIO):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'battle.npz')
+            cli.main(['simulate', '--zombies', '50', '--seed', '1', '--checkpoint', path, '--checkpoint-interval', '0',
+                      '--format', 'jsonl'])
+            cli.main(['resume', path, '--format', 'jsonl'])
+
+        simulated, resumed = [json.loads(line) for line in mock_stdout.getvalue().splitlines()]
+        self.assertEqual(simulated['zombies_left'], resumed['zombies_left'])
+        self.assertEqual(simulated['survivors_left'], resumed['survivors_left'])
+
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_main__checkpoint_needs_turns(self, mock_stderr: io.StringIO):
+        with self.assertRaises(SystemExit):
+            cli.main(['simulate', '--runs', '2', '--checkpoint', 'battle.npz'])
+
+        self.assertIn('--checkpoint', mock_stderr.getvalue())
+
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_main__checkpoint_needs_single_battle(self, mock_stderr: io.StringIO):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'battle.npz')
+            with self.assertRaises(SystemExit):
+                cli.main(['simulate', '--checkpoint', path, '--precision', '0.05'])
+
+            self.assertFalse(os.path.exists(path))
+        self.assertIn('--checkpoint geht nur mit einer einzelnen Schlacht', mock_stderr.getvalue())
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    def test_main__log_narrate(self, mock_stdout: io.StringIO):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'battle.npz')
+            cli.main(['simulate', '--zombies', '20', '--seed', '1', '--engine', 'turns', '--log', path, '--format', 'jsonl'])
+            cli.main(['narrate', path, '--limit', '3'])
+
+        result, *story = mock_stdout.getvalue().splitlines()
+        self.assertEqual(json.loads(result)['run'], 1)
+        self.assertEqual(['Zombie 1: "Grrrrr"', 'Zombie 2: "Grrrrr"', 'Zombie 3: "Grrrrr"'], story)
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    def test_main__submit_worker(self, mock_stdout: io.StringIO):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'jobs.db')
+            cli.main(['submit', path, '--vary', 'hit_chance=40,60', '--vary', 'zombie_count=10,1e2', '--runs', '2',
+                      '--engine', 'turns'])
+            cli.main(['worker', path, '--max-jobs', '1'])
+            cli.main(['worker', path])
+
+        self.assertEqual(mock_stdout.getvalue().splitlines(), [
+            'Aufträge hinzugefügt: 4, offen: 4',
+            'Aufträge erledigt: 1, insgesamt fertig: 1, fehlgeschlagen: 0',
+            'Aufträge erledigt: 3, insgesamt fertig: 4, fehlgeschlagen: 0',
+        ])
+
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_main__submit_invalid(self, mock_stderr: io.StringIO):
+        with self.assertRaises(SystemExit):
+            cli.main(['submit', 'jobs.db', '--vary', 'hit_chance=40,100'])
+
+        self.assertIn('hit_chance', mock_stderr.getvalue())
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    def test_main__adaptive(self, mock_stdout: io.StringIO):
+        cli.main(['simulate', '--zombies', '2', '--hit-chance', '95', '--precision', '0.05', '--seed', '1',
+                  '--engine', 'turns', '--format', 'json'])
+
+        estimate = json.loads(mock_stdout.getvalue())['estimate']
+        self.assertTrue(estimate['converged'])
+        self.assertLessEqual(estimate['high'] - estimate['low'], 0.1)
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    def test_main__balance(self, mock_stdout: io.StringIO):
+        cli.main(['balance', 'zombie_count', '1', '1e2', '--target', '0.5', '--resolution', '30', '--precision', '0.05',
+                  '--seed', '1', '--engine', 'turns', '--format', 'json'])
+
+        result = json.loads(mock_stdout.getvalue())['result']
+        self.assertEqual(result['setting'], 'zombie_count')
+        self.assertLessEqual(result['low'], result['value'])
+        self.assertLessEqual(result['value'], result['high'])
+
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_main__balance_invalid(self, mock_stderr: io.StringIO):
+        with self.assertRaises(SystemExit):
+            cli.main(['balance', 'hit_chance', '1', '100'])
+
+        self.assertIn('hit_chance', mock_stderr.getvalue())
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    def test_main__events_jsonl(self, mock_stdout: io.StringIO):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'events.jsonl')
+            cli.main(['simulate', '--zombies', '3', '--survivors', '2', '--seed', '1', '--engine', 'turns',
+                      '--events-jsonl', path])
+
+            with open(path) as events_file:
+                events = [json.loads(line) for line in events_file]
+
+        self.assertEqual(events[:3], [dict(event='spawn', zombie=str(zombie)) for zombie in (1, 2, 3)])
+        self.assertTrue({'attack', 'kill'} <= {event['event'] for event in events})
+        self.assertIn('Läufe: 1', mock_stdout.getvalue())
+
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_main__events_jsonl_needs_humanoids(self, mock_stderr: io.StringIO):
+        with self.assertRaises(SystemExit):
+            cli.main(['simulate', '--engine', 'buckets', '--events-jsonl', 'events.jsonl'])
+
+        self.assertIn('--events-jsonl braucht eine Engine mit Humanoiden', mock_stderr.getvalue())
+
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_main__balance_not_bracketed(self, mock_stderr: io.StringIO):
+        with self.assertRaises(SystemExit):
+            cli.main(['balance', 'hit_chance', '90', '99', '--target', '0.01', '--precision', '0.05', '--seed', '1',
+                      '--engine', 'turns'])
+
+        self.assertIn('hit_chance: Die Siegchance 1% wird an beiden Enden von 90 bis 99 erreicht', mock_stderr.getvalue())
+
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_main__invalid(self, mock_stderr: io.StringIO):
+        with self.assertRaises(SystemExit) as e:
+            cli.main(['simulate', '--hit-chance', '100'])
+
+        self.assertEqual(e.exception.code, 2)
+        self.assertIn('hit_chance', mock_stderr.getvalue())
+
+    @patch('main.ZombieSurvival.run')
+    def test_main__interactive(self, mock_run: MagicMock):
+        cli.main([])
+
+        mock_run.assert_called_once_with()
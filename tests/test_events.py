@@ -0,0 +1,88 @@
+import io
+import json
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from events import Verbosity, EventSink, PrintSink, StreamSink, JsonlSink, render_event
+from models import Humanoid
+
+
+class RenderEventTest(TestCase):
+
+    def setUp(self) -> None:
+        self.survivor = Humanoid(hit_chance=1, name='Foo Bar')
+        self.zombie = Humanoid(hit_chance=1, is_zombie=True, name='3')
+
+    def test_render_event__story(self):
+        self.assertEqual(render_event('bite', True, dict(survivor=self.survivor, zombie=self.zombie)), [
+            'Foo Bar wird von Zombie 3 gebissen und verwandelt sich.',
+            'Zombie Foo Bar: "Grrrrr"',
+        ])
+
+    def test_render_event__short(self):
+        self.assertEqual(render_event('kill', False, dict(survivor=self.survivor, zombie=self.zombie)), ['Klatsch'])
+        self.assertEqual(render_event('attack', False, dict(survivor=self.survivor, zombie=self.zombie)), [])
+
+
+class EventSinkTest(TestCase):
+
+    def test_silent(self):
+        sink = EventSink()
+
+        with patch('events.render_event') as mock_render:
+            sink.event('kill', True, survivor=None, zombie=None)
+            sink.summary('foo')
+            sink.flush()
+
+        mock_render.assert_not_called()
+
+    @patch('builtins.print')
+    def test_print_sink(self, mock_print: MagicMock):
+        sink = PrintSink()
+
+        sink.event('miss', False, survivor=None, zombie=None)
+        sink.summary('Dauer: 1')
+
+        self.assertEqual(mock_print.call_count, 2)
+        mock_print.assert_any_call('Mist!')
+        mock_print.assert_any_call('Dauer: 1')
+
+    @patch('builtins.print')
+    def test_print_sink__summary_only(self, mock_print: MagicMock):
+        sink = PrintSink(Verbosity.SUMMARY)
+
+        sink.event('miss', False, survivor=None, zombie=None)
+        sink.summary('Dauer: 1')
+
+        mock_print.assert_called_once_with('Dauer: 1')
+
+    def test_stream_sink__buffers(self):
+        stream = io.StringIO()
+        sink = StreamSink(stream, buffer_size=3)
+
+        sink.event('kill', False)
+        sink.event('miss', False)
+        self.assertEqual(stream.getvalue(), '')
+
+        sink.event('evade', False)
+        self.assertEqual(stream.getvalue(), 'Klatsch\nMist!\nJuhu\n')
+
+        sink.summary('Gewinner: Zombies')
+        sink.flush()
+        self.assertEqual(stream.getvalue(), 'Klatsch\nMist!\nJuhu\nGewinner: Zombies\n')
+
+    def test_jsonl_sink(self):
+        stream = io.StringIO()
+        sink = JsonlSink(stream)
+        survivor = Humanoid(hit_chance=1, name='Foo Bär')
+        zombie = Humanoid(hit_chance=1, is_zombie=True, name='1')
+
+        sink.event('kill', True, survivor=survivor, zombie=zombie)
+        sink.summary('Anzahl: 1')
+        sink.flush()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(lines, [
+            dict(event='kill', survivor='Foo Bär', zombie='1'),
+            dict(event='summary', message='Anzahl: 1'),
+        ])
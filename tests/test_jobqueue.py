@@ -0,0 +1,109 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from jobqueue import JobQueue, work
+from models import BattleResult
+from sweep import sweep
+
+RESULT = BattleResult('survivors', 1, 0, 0.5)
+
+
+class JobQueueTest(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'jobs.db')
+        self.queue = JobQueue(self.path, lease_seconds=60)
+
+    def tearDown(self) -> None:
+        self.queue.close()
+        self.directory.cleanup()
+
+    def test_submit_claim(self):
+        ids = self.queue.submit({'hit_chance': [40, 60], 'zombie_count': [10]}, runs=2, engine='turns', seed=3)
+
+        job = self.queue.claim('a')
+        self.assertEqual(job.id, ids[0])
+        self.assertEqual(job.settings, {'hit_chance': 40, 'zombie_count': 10})
+        self.assertEqual((job.engine, job.seed, job.runs, job.attempts), ('turns', 3, 2, 1))
+        # Another connection, like another worker, gets the next job
+        with JobQueue(self.path) as other:
+            self.assertEqual(other.claim('b').id, ids[1])
+            self.assertIsNone(other.claim('b'))
+        self.assertEqual(self.queue.counts(), dict(pending=0, running=2, done=0, failed=0))
+
+    def test_submit__unknown_engine(self):
+        with self.assertRaises(ValueError):
+            self.queue.submit({'hit_chance': [40]}, engine='foo')
+
+    def test_claim__expired_lease(self):
+        self.queue.submit({'hit_chance': [40]})
+        job = self.queue.claim('dead')
+
+        with patch('jobqueue.time.time', return_value=10 ** 12):
+            retried = self.queue.claim('alive')
+
+        self.assertEqual((retried.id, retried.attempts), (job.id, 2))
+        # The worker which lost its lease can't overwrite the results anymore
+        self.assertFalse(self.queue.complete(job.id, 'dead', [RESULT]))
+        self.assertFalse(self.queue.renew(job.id, 'dead'))
+        self.assertTrue(self.queue.complete(job.id, 'alive', [RESULT]))
+        self.assertEqual([point.results for point in self.queue.results()], [[RESULT]])
+
+    def test_claim__gives_up_after_max_attempts(self):
+        self.queue.max_attempts = 2
+        self.queue.submit({'hit_chance': [40]})
+        self.queue.claim('a')
+        with patch('jobqueue.time.time', return_value=10 ** 12):
+            self.queue.claim('b')
+        with patch('jobqueue.time.time', return_value=10 ** 13):
+            self.assertIsNone(self.queue.claim('c'))
+
+        self.assertEqual(self.queue.counts()['failed'], 1)
+
+    def test_fail__retried(self):
+        self.queue.max_attempts = 2
+        self.queue.submit({'hit_chance': [40]})
+
+        self.queue.fail(self.queue.claim('a').id, 'a', 'ValueError: boom')
+        self.assertEqual(self.queue.counts()['pending'], 1)
+        self.queue.fail(self.queue.claim('a').id, 'a', 'ValueError: boom')
+        self.assertEqual(self.queue.counts()['failed'], 1)
+
+    def test_work__like_sweep(self):
+        grid = {'hit_chance': [40, 60], 'zombie_count': [10, 30]}
+        self.queue.submit(grid, runs=3, engine='turns', seed=5)
+
+        self.assertEqual(work(self.queue, worker='a', max_jobs=1), 1)
+        with JobQueue(self.path) as other:
+            self.assertEqual(work(other, worker='b'), 3)
+
+        expected = sweep(grid, runs=3, engine='turns', seed=5, parallel=False)
+        points = list(self.queue.results())
+        self.assertEqual([point.settings for point in points], [point.settings for point in expected])
+        self.assertEqual(
+            [[result[:3] for result in point.results] for point in points],
+            [[result[:3] for result in point.results] for point in expected]
+        )
+
+    def test_work__failing_job(self):
+        self.queue.submit({'foo': [1]})
+
+        self.assertEqual(work(self.queue, worker='a'), 0)
+        self.assertEqual(self.queue.counts()['failed'], 1)
+
+    @patch('jobqueue.time.sleep')
+    def test_work__waits_for_leases(self, mock_sleep):
+        self.queue.submit({'zombie_count': [5]}, engine='turns')
+        self.queue.claim('other')
+
+        def expire(seconds):
+            self.assertEqual(seconds, 0.5)
+            self.queue.lease_seconds = -1
+            self.queue.renew(1, 'other')
+        mock_sleep.side_effect = expire
+
+        self.assertEqual(work(self.queue, worker='a', poll_interval=0.5), 1)
+        self.assertEqual(self.queue.counts()['done'], 1)
@@ -1,8 +1,11 @@
+import random
 from datetime import timedelta, datetime
 from unittest import mock, TestCase
 from unittest.mock import patch, MagicMock, Mock
 
 import main
+from events import EventSink, Verbosity
+from metrics import BattleMetrics
 from models import Humanoid
 
 
@@ -84,6 +87,26 @@ class ZombieSurvivalTest(TestCase):
             mock.call('Anzahl: 1')
         ])
 
+    @patch('main.ZombieSurvival._setup_game')
+    @patch('main.ZombieSurvival._start_fights', return_value=timedelta(seconds=1))
+    @patch('builtins.print')
+    def test_start__history(self, mock_print: MagicMock, mock_fights: MagicMock, mock_setup: MagicMock):
+        # setup
+        self.game.storymode = False
+        self.game.survivors = [Humanoid(hit_chance=1), Humanoid(hit_chance=1)]
+
+        # do it
+        self.game.start()
+        self.game.survivors[0].zombify(hit_chance=1)
+        self.game.start()
+
+        # postcondition
+        self.assertEqual(self.game.history.runs, 2)
+        mock_print.assert_called_with(
+            'Schlachten: 2, Siegquote Überlebende: 100.0%, Überlebende im Schnitt: 1.50, Zombies im Schnitt: 0.00'
+        )
+        self.assertNotIn(mock.call(mock_print.call_args.args[0]), mock_print.call_args_list[:4])
+
     @patch('main.ZombieSurvival._setup_game')
     @patch('main.ZombieSurvival._start_fights', return_value=timedelta(seconds=2))
     @patch('builtins.print')
@@ -243,11 +266,11 @@ class ZombieSurvivalTest(TestCase):
 
         # postcondition
         mock_thread.assert_has_calls([
-            mock.call(target=mock_fight, kwargs=dict(survivor=survivor)),
+            mock.call(target=mock_fight, kwargs=dict(survivor=survivor, rng=random)),
             mock.call().start(),
-            mock.call(target=mock_fight, kwargs=dict(survivor=survivor2)),
+            mock.call(target=mock_fight, kwargs=dict(survivor=survivor2, rng=random)),
             mock.call().start(),
-            mock.call(target=mock_fight, kwargs=dict(survivor=survivor3)),
+            mock.call(target=mock_fight, kwargs=dict(survivor=survivor3, rng=random)),
             mock.call().start(),
             mock.call().join(),
             mock.call().join(),
@@ -450,6 +473,18 @@ class ZombieSurvivalTest(TestCase):
         mock_prompt.assert_called_once()
         self.assertFalse(result)
 
+    @patch.dict('sys.modules', PyInquirer=None)  # any direct import fails
+    @patch('main.separator', return_value='---')
+    @patch('main.prompt', return_value=dict())
+    def test__ask_settings__menu_only_through_wrappers(self, mock_prompt: MagicMock, mock_separator: MagicMock):
+        # do it
+        result = self.game._ask_settings()
+
+        # postcondition
+        mock_separator.assert_called_once()
+        self.assertIn('---', mock_prompt.call_args.args[0]['choices'])
+        self.assertFalse(result)
+
     @patch('main.prompt', side_effect=[dict(option={'name': 'foo'}), dict(foo=None)])
     def test__ask_settings__selection_with_no_change(self, mock_prompt: MagicMock):
         # do it
@@ -461,6 +496,9 @@ class ZombieSurvivalTest(TestCase):
 
     @patch('main.prompt', side_effect=[dict(option={'name': 'foo'}), dict(foo='bar')])
     def test__ask_settings__selection_with_change(self, mock_prompt: MagicMock):
+        # setup
+        self.game.history = MagicMock()
+
         # do it
         result = self.game._ask_settings()
 
@@ -468,3 +506,237 @@ class ZombieSurvivalTest(TestCase):
         mock_prompt.assert_called_with(dict(name='foo'))
         self.assertTrue(result)
         self.assertEqual(getattr(self.game, 'foo'), 'bar')
+        self.assertIsNone(self.game.history)
+
+    @patch('builtins.print')
+    def test_simulate(self, mock_print: MagicMock):
+        # setup
+        self.game.events = EventSink(Verbosity.SILENT)
+        self.game.survivor_count = 2
+        self.game.zombie_count = 4
+
+        # do it
+        result = self.game.simulate()
+
+        # postcondition
+        self.assertIn(result.winner, ('survivors', 'zombies'))
+        self.assertEqual(result.survivors_left, len([s for s in self.game.survivors if s]))
+        self.assertEqual(result.zombies_left, len(list(self.game.zombies.queue)))
+        mock_print.assert_not_called()
+
+    @patch('builtins.print')
+    def test__setup_game__compact(self, mock_print: MagicMock):
+        # setup
+        self.game.storymode = True
+        self.game.compact = True
+        self.game.survivor_count = 2
+        self.game.zombie_count = 3
+
+        # do it
+        self.game._setup_game()
+
+        # postcondition
+        self.assertEqual(len(self.game.survivors), 2)
+        self.assertEqual(len(list(self.game.zombies.queue)), 3)
+        self.assertTrue(all(self.game.survivors))
+        self.assertFalse(any(self.game.zombies.queue))
+        mock_print.assert_has_calls([
+            mock.call('Zombie 1: "Grrrrr"'),
+            mock.call('Zombie 2: "Grrrrr"'),
+            mock.call('Zombie 3: "Grrrrr"'),
+        ])
+
+    @patch('population.PopulationDeque.__iter__', side_effect=AssertionError('zombies listed'))
+    @patch('builtins.print')
+    def test__report__compact_lose_counts_zombies(self, mock_print: MagicMock, mock_iter: MagicMock):
+        # setup
+        self.game.storymode = False
+        self.game.compact = True
+        self.game.survivor_count = 1
+        self.game.zombie_count = 3
+        self.game._setup_game()
+        self.game.survivors[0].zombify(hit_chance=1)
+
+        # do it
+        self.game._report(timedelta(seconds=1))
+
+        # postcondition
+        mock_iter.assert_not_called()
+        mock_print.assert_has_calls([mock.call('Gewinner: Zombies'), mock.call('Anzahl: 3')])
+
+    @patch('random.randint', Mock(return_value=0))
+    def test__fight_execution__silent(self):
+        # setup
+        self.game.events = MagicMock(verbosity=Verbosity.SILENT)
+        survivor = Humanoid(hit_chance=1)
+        self.game.survivors = [survivor]
+        self.game.zombies.put(Humanoid(hit_chance=1, is_zombie=True, name='Foo'))
+
+        # do it
+        self.game._fight_execution(survivor=survivor)
+
+        # postcondition
+        self.assertTrue(self.game.zombies.empty())
+        self.game.events.event.assert_not_called()
+
+    @patch('builtins.print')
+    def test__setup_game__seeded(self, mock_print: MagicMock):
+        # setup
+        self.game.seed = 42
+        self.game.weapon_variety = 50
+        self.game.armor_variety = 50
+
+        # do it
+        self.game._setup_game()
+        first = [(s.hit_chance, s.defense) for s in self.game.survivors]
+        self.game._setup_game()
+        second = [(s.hit_chance, s.defense) for s in self.game.survivors]
+
+        # postcondition
+        self.assertEqual(first, second)
+
+    @patch('main.ZombieSurvival._fight_threads')
+    @patch('main.ZombieSurvival._fight_turns')
+    def test__start_fights__turns(self, mock_turns: MagicMock, mock_threads: MagicMock):
+        # setup
+        self.game.engine = 'turns'
+
+        # do it
+        result = self.game._start_fights()
+
+        # postcondition
+        mock_turns.assert_called_once_with()
+        mock_threads.assert_not_called()
+        self.assertIsInstance(result, timedelta)
+
+    @patch('random.randint', side_effect=[100, 100, 0, 0])
+    @patch('builtins.print')
+    def test__fight_turns(self, mock_print: MagicMock, mock_randint: MagicMock):
+        # setup
+        self.game.storymode = False
+        survivor = Humanoid(hit_chance=1, name='A')
+        survivor2 = Humanoid(hit_chance=1, name='B')
+        self.game.survivors = [survivor, survivor2]
+        self.game.zombies.put(Humanoid(hit_chance=1, is_zombie=True, name='1'))
+        self.game.zombies.put(Humanoid(hit_chance=1, is_zombie=True, name='2'))
+
+        # do it
+        self.game._fight_turns()
+
+        # postcondition: A misses and evades, B kills zombie 2, A kills zombie 1
+        self.assertTrue(self.game.zombies.empty())
+        self.assertTrue(survivor.evaded)
+        self.assertFalse(survivor2.evaded)
+        mock_print.assert_has_calls([
+            mock.call('Mist!'),
+            mock.call('Juhu'),
+            mock.call('Klatsch'),
+            mock.call('Klatsch'),
+        ])
+
+    def test__fight_turns__reproducible(self):
+        # setup
+        self.game.events = EventSink(Verbosity.SILENT)
+        self.game.engine = 'turns'
+        self.game.seed = 1234
+        self.game.zombie_count = 200
+        self.game.survivor_count = 20
+        self.game.zombie_variety = 10
+
+        # do it
+        results = [self.game.simulate()[:3] for _ in range(3)]
+
+        # postcondition
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
+    def test__fight_execution__last_zombie_taken(self):
+        # setup
+        self.game.zombies = MagicMock()
+        self.game.zombies.get_nowait.side_effect = main.Empty
+        survivor = Humanoid(hit_chance=1)
+
+        # do it, must not block
+        self.game._fight_execution(survivor=survivor)
+
+        # postcondition
+        self.game.zombies.get.assert_not_called()
+        self.assertTrue(survivor)
+
+    @patch('main.ZombieSurvival._fight_pool')
+    def test__start_fights__pool(self, mock_pool: MagicMock):
+        # setup
+        self.game.engine = 'pool'
+
+        # do it
+        self.game._start_fights()
+
+        # postcondition
+        mock_pool.assert_called_once_with()
+
+    def test__fight_pool(self):
+        # setup
+        self.game.events = EventSink(Verbosity.SILENT)
+        self.game.engine = 'pool'
+        self.game.workers = 3
+        self.game.survivor_count = 300
+        self.game.zombie_count = 3000
+
+        # do it
+        with patch('threading.Thread', wraps=main.threading.Thread) as mock_thread:
+            result = self.game.simulate()
+
+        # postcondition
+        self.assertEqual(mock_thread.call_count, 3)
+        self.assertEqual(result.survivors_left, len([s for s in self.game.survivors if s]))
+        self.assertEqual(result.zombies_left, self.game.zombies.qsize())
+        if result.winner == 'survivors':
+            self.assertEqual(result.zombies_left, 0)
+        else:
+            self.assertEqual(result.survivors_left, 0)
+
+    @patch('random.randint', side_effect=[100, 100, 0])
+    @patch('builtins.print')
+    def test__fight_pool__zombie_returns(self, mock_print: MagicMock, mock_randint: MagicMock):
+        # setup
+        self.game.storymode = False
+        self.game.workers = 1
+        survivor = Humanoid(hit_chance=1)
+        self.game.survivors = [survivor]
+        self.game.zombies.put(Humanoid(hit_chance=1, is_zombie=True, name='Foo'))
+
+        # do it
+        self.game._fight_pool()
+
+        # postcondition
+        self.assertTrue(self.game.zombies.empty())
+        self.assertTrue(survivor.evaded)
+        mock_print.assert_has_calls([
+            mock.call('Mist!'),
+            mock.call('Juhu'),
+            mock.call('Klatsch'),
+        ])
+
+    @patch('random.randint', side_effect=[100, 100, 0, 100, 0, 0])
+    def test_simulate__metrics(self, mock_randint: MagicMock):
+        # setup
+        def setup_game():
+            self.game.survivors = [Humanoid(hit_chance=50, name='Bar')]
+            for name in ('Foo', 'Baz'):
+                self.game.zombies.put(Humanoid(hit_chance=50, is_zombie=True, name=name))
+
+        self.game.events = EventSink(Verbosity.SILENT)
+        self.game.engine = 'turns'
+        self.game.metrics = BattleMetrics()
+
+        # do it
+        with patch.object(self.game, '_setup_game', side_effect=setup_game):
+            result = self.game.simulate()
+
+        # postcondition
+        self.assertEqual(result.winner, 'zombies')
+        self.assertEqual(set(self.game.metrics.phases), {'setup', 'fights'})
+        stats = self.game.metrics.survivor(self.game.survivors[0])
+        self.assertEqual((stats.attacks, stats.kills, stats.misses, stats.evasions), (3, 1, 2, 1))
+        self.assertIsNotNone(stats.zombified_after)
+        self.assertGreater(stats.queue_wait, 0)
@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+from metrics import BattleMetrics
+
+
+class BattleMetricsTest(TestCase):
+
+    def test_phase(self):
+        metrics = BattleMetrics()
+
+        with metrics.phase('setup'):
+            pass
+        with metrics.phase('setup'):
+            pass
+
+        self.assertEqual(list(metrics.phases), ['setup'])
+        self.assertGreaterEqual(metrics.phases['setup'], 0)
+
+    def test_survivor__by_identity(self):
+        metrics = BattleMetrics()
+        first, second = object(), object()
+
+        metrics.survivor(first).kills += 2
+        metrics.survivor(first).kills += 1
+        metrics.survivor(second).kills += 4
+
+        self.assertEqual(metrics.survivor(first).kills, 3)
+        self.assertEqual(metrics.total('kills'), 7)
+
+    def test_reset(self):
+        metrics = BattleMetrics()
+        metrics.survivor(object()).attacks = 1
+        with metrics.phase('fights'):
+            pass
+
+        metrics.reset()
+
+        self.assertEqual(metrics.phases, {})
+        self.assertEqual(metrics.survivors, {})
+
+    def test_to_prometheus(self):
+        metrics = BattleMetrics()
+        metrics.phases['setup'] = 0.5
+        bitten = metrics.survivor(object())
+        bitten.attacks, bitten.misses, bitten.zombified_after = 2, 2, 1.5
+        metrics.survivor(object()).kills = 3
+
+        text = metrics.to_prometheus()
+
+        self.assertIn('zombie_survival_phase_seconds{phase="setup"} 0.5\n', text)
+        self.assertIn('zombie_survival_attacks_total 2\n', text)
+        self.assertIn('zombie_survival_kills_total 3\n', text)
+        self.assertIn('zombie_survival_zombification_seconds_count 1\n', text)
+        self.assertIn('zombie_survival_zombification_seconds_sum 1.5\n', text)
+        self.assertIn('# TYPE zombie_survival_misses_total counter\n', text)
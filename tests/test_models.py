@@ -1,6 +1,6 @@
 from unittest import TestCase, mock
 
-from models import Humanoid
+from models import Humanoid, NamePool
 
 
 class ValidatorTest(TestCase):
@@ -131,3 +131,53 @@ class ValidatorTest(TestCase):
         survivor = Humanoid(hit_chance=1)
 
         self.assertEqual(str(survivor), f'{survivor.name}{survivor.modifier_info}')
+
+    def test_name__lazy(self):
+        with mock.patch('models.name_pool') as mock_pool:
+            mock_pool.get.return_value = 'Foo Bar'
+            survivor = Humanoid(hit_chance=1)
+
+            mock_pool.get.assert_not_called()
+            self.assertEqual(survivor.name, 'Foo Bar')
+            self.assertEqual(survivor.name, 'Foo Bar')
+            mock_pool.get.assert_called_once()
+
+    def test_name__given(self):
+        with mock.patch('models.name_pool') as mock_pool:
+            zombie = Humanoid(hit_chance=1, is_zombie=True, name='7')
+
+            self.assertEqual(zombie.name, '7')
+            self.assertEqual(repr(zombie), '7')
+            mock_pool.get.assert_not_called()
+
+
+class NamePoolTest(TestCase):
+
+    def test_get(self):
+        pool = NamePool(batch_size=3)
+
+        name = pool.get()
+        first_name, last_name = name.split(' ')
+        self.assertTrue(first_name.istitle())
+        self.assertTrue(last_name.istitle())
+        self.assertEqual(len(pool._drawn), 2)
+
+    @mock.patch('builtins.open', wraps=open)
+    def test_get__loads_files_once(self, mock_open: mock.MagicMock):
+        pool = NamePool(batch_size=2)
+
+        for _ in range(10):
+            pool.get()
+
+        self.assertEqual(mock_open.call_count, 3)
+
+    def test_draw(self):
+        pool = NamePool()
+
+        self.assertEqual(len(pool.draw(50)), 50)
+
+    @mock.patch('random.random', mock.Mock(return_value=0))
+    def test_draw__most_common(self):
+        pool = NamePool()
+
+        self.assertIn(pool.draw(1)[0], ('James Smith', 'Mary Smith'))
@@ -0,0 +1,150 @@
+from unittest import TestCase
+
+import numpy as np
+
+from models import BaseHumanoid
+from population import Population, HumanoidView, PopulationQueue
+
+
+class PopulationTest(TestCase):
+
+    def test___init__(self):
+        population = Population(3)
+
+        self.assertEqual(len(population), 3)
+        self.assertTrue(np.all(population.base_chance == 1))
+        self.assertFalse(population.hit_modifier.any())
+        self.assertFalse(population.defense_modifier.any())
+        self.assertFalse(population.zombie.any())
+        self.assertFalse(population.evaded.any())
+        self.assertEqual(population.names, dict())
+
+    def test_create(self):
+        population = Population.create(
+            survivor_count=4, zombie_count=6, hit_chance=120, zombify_chance=30,
+            zombie_variety=2, weapon_variety=5, armor_variety=3
+        )
+
+        self.assertEqual(len(population), 10)
+        self.assertFalse(population.zombie[:4].any())
+        self.assertTrue(population.zombie[4:].all())
+        self.assertTrue(np.all(population.base_chance[:4] == 99))
+        self.assertTrue(np.all(population.base_chance[4:] == 30))
+        self.assertTrue(np.all((population.hit_modifier[:4] >= 0) & (population.hit_modifier[:4] <= 5)))
+        self.assertTrue(np.all((population.hit_modifier[4:] >= -2) & (population.hit_modifier[4:] <= 2)))
+        self.assertTrue(np.all((population.defense_modifier[:4] >= 0) & (population.defense_modifier[:4] <= 3)))
+        self.assertFalse(population.defense_modifier[4:].any())
+
+    def test_create__no_varieties(self):
+        population = Population.create(survivor_count=2, zombie_count=2, hit_chance=50, zombify_chance=30)
+
+        self.assertFalse(population.hit_modifier.any())
+        self.assertFalse(population.defense_modifier.any())
+
+    def test_hit_chance(self):
+        population = Population(3)
+        population.base_chance[:] = 10
+        population.hit_modifier[1] = 2
+        population.evaded[:] = True
+        population.zombie[2] = True
+
+        self.assertEqual(list(population.hit_chance(np.arange(3))), [13, 15, 10])
+        self.assertEqual(population.hit_chance(0), 13)
+
+    def test_name(self):
+        population = Population(4, numbered_from=2)
+
+        name = population.name(0)
+        self.assertIsInstance(name, str)
+        self.assertTrue(name)
+        self.assertEqual(population.name(0), name)  # generated only once
+        self.assertEqual(population.name(2), '1')
+        self.assertEqual(population.name(3), '2')
+        self.assertNotIn(2, population.names)
+
+    def test___getitem__(self):
+        population = Population(2)
+
+        view = population[-1]
+        self.assertIsInstance(view, HumanoidView)
+        self.assertIsInstance(view, BaseHumanoid)
+        self.assertEqual(view.index, 1)
+        with self.assertRaises(IndexError):
+            population[2]
+
+    def test_nbytes(self):
+        self.assertEqual(Population(10).nbytes, 10 * (1 + 4 + 4 + 1 + 1))
+
+
+class HumanoidViewTest(TestCase):
+
+    def setUp(self) -> None:
+        self.population = Population.create(survivor_count=1, zombie_count=1, hit_chance=40, zombify_chance=20)
+        self.survivor = self.population[0]
+        self.zombie = self.population[1]
+
+    def test_attributes(self):
+        self.assertEqual(self.survivor.hit_chance, 40)
+        self.assertEqual(self.survivor.defense, 0)
+        self.assertTrue(self.survivor)
+        self.assertFalse(self.survivor.evaded)
+        self.assertEqual(self.zombie.hit_chance, 20)
+        self.assertFalse(self.zombie)
+        self.assertEqual(self.zombie.name, '1')
+        self.assertEqual(str(self.zombie), '1')
+
+    def test_writes_through(self):
+        self.survivor.evaded = True
+        self.survivor.hit_chance = 150
+        self.survivor.name = 'Foo Bar'
+
+        self.assertTrue(self.population.evaded[0])
+        self.assertEqual(self.population.base_chance[0], 99)
+        self.assertEqual(self.population[0].name, 'Foo Bar')
+        self.assertEqual(self.population[0].hit_chance, 99 + 3)
+
+    def test_zombify(self):
+        self.survivor.zombify(hit_chance=25, zombie_variety=0)
+
+        self.assertTrue(self.population.zombie[0])
+        self.assertEqual(self.survivor.hit_chance, 25)
+        self.assertFalse(self.survivor)
+
+    def test_modifier_info(self):
+        self.population.hit_modifier[0] = 5
+        self.population.defense_modifier[0] = 3
+
+        self.assertEqual(self.survivor.modifier_info, '(5⚔ 3🛡)')
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(self.survivor, '__dict__'))
+
+
+class PopulationQueueTest(TestCase):
+
+    def test_fifo(self):
+        population = Population.create(survivor_count=1, zombie_count=3, hit_chance=40, zombify_chance=20)
+        zombies = PopulationQueue(population)
+        for index in range(1, 4):
+            zombies.put(population[index])
+
+        self.assertEqual(zombies.qsize(), 3)
+        self.assertEqual([zombie.name for zombie in zombies.queue], ['1', '2', '3'])
+
+        first = zombies.get()
+        self.assertIsInstance(first, HumanoidView)
+        self.assertEqual(first.name, '1')
+        zombies.put(first)  # wraps around the ring
+        zombies.put(population[0])
+        self.assertEqual([zombie.index for zombie in zombies.queue], [2, 3, 1, 0])
+        self.assertFalse(zombies.empty())
+
+    def test_bounds(self):
+        population = Population(1)
+        zombies = PopulationQueue(population)
+
+        with self.assertRaises(IndexError):
+            zombies.queue.popleft()
+        zombies.put(population[0])
+        with self.assertRaises(IndexError):
+            zombies.queue.append(population[0])
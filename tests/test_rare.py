@@ -0,0 +1,54 @@
+import math
+from unittest import TestCase
+
+from rare import estimate_win_probability
+
+
+def exact_win_probability(zombie_count: int, hit_chance: int, zombify_chance: int) -> float:
+    """ A single survivor without varieties wins if it kills every zombie before one bites """
+    kill, kill_evaded, bite = (hit_chance - 1) / 100, (hit_chance + 2) / 100, (zombify_chance - 1) / 100
+    # Once evaded, every zombie is either killed or bites, whichever comes first
+    per_zombie = kill_evaded / (kill_evaded + (1 - kill_evaded) * bite)
+    probability = 1.0  # not evaded yet with no zombie left
+    for zombies in range(1, zombie_count + 1):
+        probability = kill * probability + (1 - kill) * (1 - bite) * per_zombie ** zombies
+    return probability
+
+
+class RareTest(TestCase):
+
+    def test_estimate_win_probability(self):
+        config = dict(zombie_count=20, survivor_count=1, hit_chance=50, zombify_chance=40)
+        expected = exact_win_probability(20, 50, 40)
+
+        estimate = estimate_win_probability(config, levels=5, trajectories=60, replications=5, seed=1)
+
+        self.assertLess(abs(estimate.probability - expected), 3 * estimate.relative_error * expected)
+        self.assertLess(estimate.low, estimate.probability)
+        self.assertGreater(estimate.high, estimate.probability)
+        self.assertAlmostEqual(estimate.log10_probability, math.log10(estimate.probability))
+
+    def test_estimate_win_probability__rare(self):
+        config = dict(zombie_count=100, survivor_count=1, hit_chance=60, zombify_chance=30)
+        expected = exact_win_probability(100, 60, 30)
+
+        estimate = estimate_win_probability(config, levels=10, trajectories=20, replications=2, seed=3)
+
+        # Around 1e-8, plain repetition would need about a billion battles to see a single win
+        self.assertLess(expected, 1e-7)
+        self.assertLess(abs(estimate.log10_probability - math.log10(expected)), 1)
+        self.assertLess(estimate.attacks, 10 ** 5)
+
+    def test_estimate_win_probability__hopeless(self):
+        config = dict(zombie_count=50, survivor_count=1, hit_chance=1, zombify_chance=99)
+
+        estimate = estimate_win_probability(config, levels=2, trajectories=5, replications=2, seed=1)
+
+        self.assertEqual(estimate.probability, 0.0)
+        self.assertEqual(estimate.log10_probability, -math.inf)
+
+    def test_estimate_win_probability__invalid(self):
+        with self.assertRaises(ValueError):
+            estimate_win_probability(dict(), replications=1)
+        with self.assertRaises(ValueError):
+            estimate_win_probability(dict(foo=1))
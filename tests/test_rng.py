@@ -0,0 +1,88 @@
+import json
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from rng import RandomStream, make_rng, spawn_rngs, numpy_generator, rng_state, restore_rng
+
+
+class RandomStreamTest(TestCase):
+
+    def test_reproducible(self):
+        first = RandomStream(42, block_size=8)
+        second = RandomStream(42, block_size=8)
+
+        self.assertEqual([first.randint(1, 100) for _ in range(50)], [second.randint(1, 100) for _ in range(50)])
+
+    def test_random__refills_blocks(self):
+        stream = RandomStream(1, block_size=4)
+
+        values = [stream.random() for _ in range(10)]
+
+        self.assertEqual(len(set(values)), 10)
+        self.assertTrue(all(0 <= value < 1 for value in values))
+
+    def test_randint__bounds(self):
+        stream = RandomStream(7)
+
+        values = {stream.randint(-2, 2) for _ in range(1000)}
+
+        self.assertEqual(values, {-2, -1, 0, 1, 2})
+
+    def test_choice(self):
+        stream = RandomStream(7)
+
+        self.assertEqual({stream.choice('ab') for _ in range(100)}, {'a', 'b'})
+
+    def test_spawn(self):
+        children = RandomStream(3).spawn(2)
+        again = RandomStream(3).spawn(2)
+
+        self.assertEqual(len(children), 2)
+        first_values = [child.random() for child in children]
+        self.assertNotEqual(first_values[0], first_values[1])
+        self.assertEqual(first_values[1], again[1].random())
+
+    def test_seed_sequence(self):
+        seed = np.random.SeedSequence(5)
+
+        self.assertIs(RandomStream(seed).seed_sequence, seed)
+
+
+class HelperTest(TestCase):
+
+    def test_make_rng(self):
+        self.assertIs(make_rng(None), random)
+        self.assertIsInstance(make_rng(1), RandomStream)
+
+    def test_spawn_rngs(self):
+        self.assertEqual(spawn_rngs(random, 3), [random, random, random])
+        streams = spawn_rngs(RandomStream(1), 3)
+        self.assertEqual(len(streams), 3)
+        self.assertTrue(all(isinstance(stream, RandomStream) for stream in streams))
+
+    def test_numpy_generator(self):
+        stream = RandomStream(1)
+
+        self.assertIsNone(numpy_generator(random))
+        self.assertIs(numpy_generator(stream), stream.generator)
+
+
+class RngStateTest(TestCase):
+
+    def test_stream(self):
+        stream = RandomStream(3, block_size=8)
+        [stream.random() for _ in range(5)]
+
+        restored = restore_rng(json.loads(json.dumps(rng_state(stream))))
+
+        self.assertEqual([restored.random() for _ in range(20)], [stream.random() for _ in range(20)])
+        self.assertEqual(restored.seed_sequence.entropy, stream.seed_sequence.entropy)
+
+    def test_random_module(self):
+        state = json.loads(json.dumps(rng_state(random)))
+        expected = [random.random() for _ in range(5)]
+
+        self.assertIs(restore_rng(state), random)
+        self.assertEqual([random.random() for _ in range(5)], expected)
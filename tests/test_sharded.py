@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import deque
+from queue import Empty
+from typing import Dict, List
+from unittest import TestCase
+from unittest.mock import Mock
+
+from events import EventSink
+from main import ZombieSurvival
+from models import Humanoid
+from sharded import ShardedZombiePool
+
+
+class ShardedZombiePoolTest(TestCase):
+
+    def test_put_get__fifo_per_shard(self):
+        pool = ShardedZombiePool(shards=3)
+        for zombie in range(4):
+            pool.put(zombie)
+
+        self.assertEqual(pool.qsize(), 4)
+        self.assertEqual([pool.get_nowait() for _ in range(4)], [0, 1, 2, 3])
+        self.assertTrue(pool.empty())
+        with self.assertRaises(Empty):
+            pool.get_nowait()
+
+    def test_get_nowait__steals(self):
+        pool = ShardedZombiePool(shards=2)
+        for zombie in range(9):
+            pool.put(zombie)
+        taken = []
+
+        # A second thread gets the other, empty shard
+        thread = threading.Thread(target=lambda: taken.append(pool.get_nowait()))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(taken, [0])
+        # Half of the rest moved over with the stolen zombie
+        self.assertEqual([len(shard) for shard in pool.shards], [4, 4])
+        self.assertEqual(sorted(pool.queue), list(range(1, 9)))
+
+    def test_get_nowait__no_zombie_lost_while_stolen(self):
+        moving = threading.Event()
+
+        class SlowDeque(deque):
+            def pop(self):
+                zombie = super().pop()
+                moving.set()
+                time.sleep(0.05)  # the stolen zombie is in neither shard meanwhile
+                return zombie
+
+        pool = ShardedZombiePool(shards=3)
+        pool.shards[2] = SlowDeque([1, 2, 3])
+        taken: Dict[int, List[int]] = {0: [], 1: []}
+
+        def fight(shard: int, attacks: int) -> None:
+            pool._local.shard = shard
+            for _ in range(attacks):
+                try:
+                    taken[shard].append(pool.get_nowait())
+                except Empty:
+                    return
+
+        thief = threading.Thread(target=fight, args=(0, 1))
+        thief.start()
+        moving.wait(5)
+        # More threads than zombies per shard, this one runs dry while the thief moves the last zombie
+        other = threading.Thread(target=fight, args=(1, 3))
+        other.start()
+        thief.join()
+        other.join()
+
+        # The other thread didn't give up while the last zombie was on its way to the thief's shard
+        self.assertEqual(taken, {0: [1], 1: [2, 3]})
+        self.assertTrue(pool.empty())
+
+    def test_pool_engine__takes_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        concurrent = []
+
+        class MeetingPool(ShardedZombiePool):
+            def get_nowait(self):
+                if not concurrent:
+                    # Both workers must be inside at once, which a lock around the pool would prevent
+                    try:
+                        barrier.wait()
+                        concurrent.append(True)
+                    except threading.BrokenBarrierError:
+                        concurrent.append(False)
+                return super().get_nowait()
+
+        game = ZombieSurvival()
+        game.events = EventSink()
+        game.engine = 'pool'
+        game.workers = 2
+        game.zombie_count = 20
+        game.survivor_count = 4
+        game._zombie_queue = lambda: MeetingPool(game.workers)
+
+        result = game.simulate()
+
+        self.assertTrue(concurrent[0])
+        self.assertTrue(result.zombies_left == 0 or result.survivors_left == 0)
+
+    def test_fight_execution__waits_for_zombie_in_fight(self):
+        game = ZombieSurvival()
+        game.events = EventSink()
+        game.zombies = ShardedZombiePool(shards=2)
+        game.zombies.put(Humanoid(hit_chance=30, is_zombie=True))
+        survivor = Humanoid(hit_chance=50)
+        # Another survivor fights the only zombie, which misses and returns
+        zombie = game._in_fight.take(game.zombies)
+
+        fight = threading.Thread(
+            target=game._fight_execution, kwargs=dict(survivor=survivor, rng=Mock(randint=Mock(return_value=1)))
+        )
+        fight.start()
+        time.sleep(0.05)
+        self.assertTrue(fight.is_alive())
+        game.zombies.put(zombie)
+        game._in_fight.done()
+        fight.join(5)
+
+        self.assertFalse(fight.is_alive())
+        self.assertTrue(game.zombies.empty())
+        self.assertTrue(survivor)
+
+    def test_battle__threads_no_result_with_both_sides_left(self):
+        for _ in range(100):
+            game = ZombieSurvival()
+            game.events = EventSink()
+            game.zombie_pool = 'sharded'
+            game.workers = 4
+            game.zombie_count = 2
+            game.survivor_count = 40
+
+            result = game.simulate()
+
+            self.assertFalse(result.zombies_left and result.survivors_left, result)
+
+    def test_battle__all_humanoids_accounted(self):
+        for engine in ('threads', 'turns', 'pool'):
+            with self.subTest(engine=engine):
+                game = ZombieSurvival()
+                game.events = EventSink()
+                game.zombie_pool = 'sharded'
+                game.engine = engine
+                game.workers = 4
+                game.zombie_count = 300
+                game.survivor_count = 20
+
+                result = game.simulate()
+
+                self.assertIsInstance(game.zombies, ShardedZombiePool)
+                self.assertEqual(result.zombies_left, game.zombies.qsize())
+                # Every humanoid is either a living survivor or a zombie in the pool, nobody got lost
+                zombies = game.zombies.queue
+                self.assertEqual(len(zombies), len({id(zombie) for zombie in zombies}))
+                self.assertTrue(all(not zombie for zombie in zombies))
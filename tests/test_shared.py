@@ -0,0 +1,94 @@
+import pickle
+from multiprocessing.shared_memory import SharedMemory
+from unittest import TestCase
+
+import numpy as np
+
+from main import ZombieSurvival
+from models import BattleResult
+from shared import SharedBattle, SharedPopulation
+
+
+class SharedPopulationTest(TestCase):
+
+    def setUp(self) -> None:
+        self.population = SharedPopulation(5)
+
+    def tearDown(self) -> None:
+        self.population.release()
+
+    def test_claim_give_back(self):
+        self.population.give_back(np.array([3, 4, 1]))
+
+        self.assertEqual(self.population.claim(2).tolist(), [3, 4])
+        self.assertEqual(self.population.fighting, 2)
+        self.population.give_back(np.array([0, 2, 3]), claimed=2)
+        self.assertEqual((self.population.queued, self.population.fighting), (4, 0))
+        # Wraps around the end of the ring
+        self.assertEqual(self.population.claim(10).tolist(), [1, 0, 2, 3])
+        self.assertEqual(self.population.claim(1).tolist(), [])
+        self.assertEqual((self.population.queued, self.population.fighting), (0, 4))
+
+    def test_pickle__attaches(self):
+        self.population.hit_modifier[2] = 7
+        self.population.give_back(np.array([2]))
+
+        attached = pickle.loads(pickle.dumps(self.population))
+        try:
+            self.assertEqual(attached.hit_modifier[2], 7)
+            self.assertEqual(attached.claim(1).tolist(), [2])
+            self.assertEqual(self.population.queued, 0)
+        finally:
+            attached.release()
+
+
+class SharedBattleTest(TestCase):
+
+    def test_from_game(self):
+        game = ZombieSurvival()
+        game.zombie_count = 7
+        game.survivor_count = 2
+
+        battle = SharedBattle.from_game(game, workers=4)
+
+        self.assertEqual(battle.population.queued, 7)
+        self.assertEqual(battle.workers, 2)  # no more workers than survivors
+        battle.population.release()
+
+    def test_run__survivors_always_hit(self):
+        battle = SharedBattle(zombie_count=100, survivor_count=4, hit_chance=99, zombify_chance=1, workers=2)
+        battle.population.hit_modifier[:4] = 2  # 99 + 2, every roll hits
+
+        result = battle.run()
+
+        self.assertEqual(result, BattleResult('survivors', 4, 0, result.duration))
+
+    def test_run__zombies_always_bite(self):
+        battle = SharedBattle(zombie_count=2, survivor_count=5, hit_chance=1, zombify_chance=99, workers=2)
+        battle.population.hit_modifier[5:] = 2  # 99 + 2 always bites, 1 never hits
+
+        result = battle.run()
+
+        # Every bitten survivor rejoined the horde
+        self.assertEqual(result, BattleResult('zombies', 0, 2 + 5, result.duration))
+
+    def test_run__consistent_counts(self):
+        for seed in range(5):
+            battle = SharedBattle(
+                zombie_count=200, survivor_count=20, hit_chance=60, zombify_chance=40,
+                zombie_variety=3, weapon_variety=3, armor_variety=2, rng=np.random.default_rng(seed), workers=3
+            )
+            result = battle.run()
+            if result.winner == 'survivors':
+                self.assertEqual(result.zombies_left, 0)
+            else:
+                self.assertEqual(result.survivors_left, 0)
+
+    def test_run__releases_memory(self):
+        battle = SharedBattle(zombie_count=10, survivor_count=2, hit_chance=50, zombify_chance=50, workers=2)
+        name = battle.population.memory.name
+
+        battle.run()
+
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=name)
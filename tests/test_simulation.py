@@ -0,0 +1,171 @@
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from models import BattleResult
+from simulation import simulate_once, simulate_many, simulate_stream, simulate_adaptive, summarize_many
+
+
+class SimulationTest(TestCase):
+
+    @patch('builtins.print')
+    def test_simulate_once(self, mock_print: MagicMock):
+        result = simulate_once(dict(zombie_count=3, survivor_count=2))
+
+        self.assertIsInstance(result, BattleResult)
+        self.assertIn(result.winner, ('survivors', 'zombies'))
+        if result.winner == 'survivors':
+            self.assertEqual(result.zombies_left, 0)
+            self.assertGreater(result.survivors_left, 0)
+        else:
+            self.assertEqual(result.survivors_left, 0)
+            self.assertGreater(result.zombies_left, 0)
+        self.assertGreaterEqual(result.duration, 0)
+        mock_print.assert_not_called()
+
+    def test_simulate_once__unknown_setting(self):
+        with self.assertRaises(ValueError):
+            simulate_once(dict(foo=1))
+
+    @patch('builtins.print')
+    def test_simulate_many(self, mock_print: MagicMock):
+        results = simulate_many(dict(zombie_count=2, survivor_count=2), runs=5)
+
+        self.assertEqual(len(results), 5)
+        for result in results:
+            self.assertIsInstance(result, BattleResult)
+        mock_print.assert_not_called()
+
+    def test_simulate_many__parallel(self):
+        results = simulate_many(dict(zombie_count=2, survivor_count=2), runs=6, parallel=True, max_workers=2)
+
+        self.assertEqual(len(results), 6)
+        for result in results:
+            self.assertIsInstance(result, BattleResult)
+
+    def test_simulate_once__vectorized(self):
+        result = simulate_once(dict(zombie_count=30, survivor_count=3), engine='vectorized')
+
+        self.assertIsInstance(result, BattleResult)
+
+    def test_simulate_many__buckets_seeded(self):
+        config = dict(zombie_count=10 ** 7, survivor_count=10 ** 6, zombie_variety=3, weapon_variety=2)
+
+        first = simulate_many(config, runs=3, seed=5, engine='buckets')
+        second = simulate_many(config, runs=3, seed=5, engine='buckets')
+
+        self.assertEqual([result[:3] for result in first], [result[:3] for result in second])
+
+    def test_simulate_once__shared(self):
+        result = simulate_once(dict(zombie_count=30, survivor_count=3), engine='shared')
+
+        self.assertIsInstance(result, BattleResult)
+
+    def test_simulate_once__unknown_engine(self):
+        with self.assertRaises(ValueError):
+            simulate_once(dict(), engine='foo')
+
+    def test_simulate_many__vectorized_parallel(self):
+        results = simulate_many(dict(zombie_count=2, survivor_count=2), runs=4, parallel=True, max_workers=2,
+                                engine='vectorized')
+
+        self.assertEqual(len(results), 4)
+
+    def test_simulate_many__seeded(self):
+        config = dict(zombie_count=40, survivor_count=1, zombie_variety=5, weapon_variety=5)
+
+        first = simulate_many(config, runs=10, seed=42)
+        second = simulate_many(config, runs=10, seed=42, parallel=True, max_workers=2)
+
+        self.assertEqual([result[:3] for result in first], [result[:3] for result in second])
+
+    def test_simulate_many__vectorized_seeded(self):
+        config = dict(zombie_count=200, survivor_count=20)
+
+        first = simulate_many(config, runs=5, seed=7, engine='vectorized')
+        second = simulate_many(config, runs=5, seed=7, engine='vectorized')
+
+        self.assertEqual([result[:3] for result in first], [result[:3] for result in second])
+
+    def test_simulate_many__turns_seeded(self):
+        config = dict(zombie_count=100, survivor_count=10)
+
+        first = simulate_many(config, runs=5, seed=3, engine='turns')
+        second = simulate_many(config, runs=5, seed=3, engine='turns', parallel=True, max_workers=2)
+
+        self.assertEqual([result[:3] for result in first], [result[:3] for result in second])
+
+    def test_simulate_stream(self):
+        config = dict(zombie_count=20, survivor_count=2)
+        stream = simulate_stream(config, runs=3, engine='turns', seed=8)
+
+        self.assertIsInstance(next(stream), BattleResult)
+        self.assertEqual(
+            [result.zombies_left for result in simulate_stream(config, runs=3, engine='turns', seed=8)],
+            [result.zombies_left for result in simulate_many(config, runs=3, engine='turns', seed=8)]
+        )
+
+    def test_simulate_adaptive__stops_early(self):
+        estimate = simulate_adaptive(dict(zombie_count=2, survivor_count=5, hit_chance=95), precision=0.05,
+                                     engine='turns', seed=1, batch_size=50)
+
+        self.assertTrue(estimate.converged)
+        self.assertLess(estimate.runs, 1000)
+        self.assertLessEqual((estimate.high - estimate.low) / 2, 0.05)
+        self.assertTrue(estimate.low <= estimate.win_probability <= estimate.high)
+
+    def test_simulate_adaptive__budget(self):
+        estimate = simulate_adaptive(dict(zombie_count=20, survivor_count=5), precision=0.001, max_runs=60,
+                                     engine='turns', seed=1, batch_size=25)
+
+        self.assertFalse(estimate.converged)
+        self.assertEqual(estimate.runs, 60)
+
+    def test_simulate_adaptive__target(self):
+        config = dict(zombie_count=2, survivor_count=5, hit_chance=95)
+        estimate = simulate_adaptive(config, precision=0.001, engine='turns', seed=1, batch_size=50, target=0.5)
+
+        self.assertTrue(estimate.converged)
+        self.assertEqual(estimate.runs, 50)
+        self.assertGreater(estimate.low, 0.5)
+
+    def test_simulate_adaptive__matches_simulate_many(self):
+        config = dict(zombie_count=10, survivor_count=3)
+        estimate = simulate_adaptive(config, precision=0.5, min_runs=40, batch_size=40, engine='turns', seed=2)
+
+        results = simulate_many(config, runs=40, engine='turns', seed=2)
+        self.assertEqual(estimate.runs, 40)
+        self.assertEqual(estimate.win_probability, sum(r.winner == 'survivors' for r in results) / 40)
+        self.assertAlmostEqual(estimate.zombies_left, sum(r.zombies_left for r in results) / 40)
+
+    def test_simulate_adaptive__parallel(self):
+        estimate = simulate_adaptive(dict(zombie_count=5, survivor_count=2), precision=0.2, max_runs=40,
+                                     parallel=True, max_workers=2, engine='turns', seed=3, batch_size=20)
+
+        self.assertGreaterEqual(estimate.runs, 20)
+
+    def test_summarize_many(self):
+        config = dict(zombie_count=12, survivor_count=3)
+        summary = summarize_many(config, runs=30, engine='turns', seed=6)
+
+        results = simulate_many(config, runs=30, engine='turns', seed=6)
+        self.assertEqual(summary.runs, 30)
+        self.assertEqual(summary.survivor_wins, sum(r.winner == 'survivors' for r in results))
+        self.assertAlmostEqual(summary.zombies_left.mean, sum(r.zombies_left for r in results) / 30)
+        self.assertEqual(summary.kills.count, 90)
+
+    def test_summarize_many__parallel(self):
+        config = dict(zombie_count=12, survivor_count=3)
+        serial = summarize_many(config, runs=10, engine='turns', seed=6)
+
+        merged = summarize_many(config, runs=10, parallel=True, max_workers=2, engine='turns', seed=6)
+
+        self.assertEqual(merged.runs, 10)
+        self.assertEqual(merged.survivor_wins, serial.survivor_wins)
+        self.assertAlmostEqual(merged.kills.mean, serial.kills.mean)
+        self.assertEqual(merged.zombies_left.counts, serial.zombies_left.counts)
+
+    def test_summarize_many__vectorized(self):
+        summary = summarize_many(dict(zombie_count=12, survivor_count=3), runs=5, engine='vectorized', seed=6)
+
+        self.assertEqual(summary.runs, 5)
+        self.assertEqual(summary.kills.count, 0)
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from events import EventSink, Verbosity
+from main import ZombieSurvival
+from simulation import simulate_many
+from solver import solve, solve_game
+
+
+class SolverTest(TestCase):
+
+    def test_solve__one_on_one(self):
+        result = solve(zombie_count=1, survivor_count=1, hit_chance=60, zombify_chance=30)
+
+        # evaded survivors fight on until they kill the zombie or get bitten
+        evaded_win = 0.62 / (1 - 0.38 * 0.71)
+        win = 0.59 + 0.41 * 0.71 * evaded_win
+        self.assertAlmostEqual(result.win_probability, win)
+        self.assertAlmostEqual(result.outcomes[('survivors', 1)], win)
+        self.assertAlmostEqual(result.outcomes[('zombies', 2)], 1 - win)
+        self.assertAlmostEqual(result.expected_survivors, win)
+        self.assertAlmostEqual(result.expected_zombies, 2 * (1 - win))
+
+    def test_solve__probabilities_sum_up(self):
+        result = solve(zombie_count=30, survivor_count=6, hit_chance=40, zombify_chance=50)
+
+        self.assertAlmostEqual(sum(result.outcomes.values()), 1)
+        for (winner, count), probability in result.outcomes.items():
+            self.assertIn(winner, ('survivors', 'zombies'))
+            self.assertGreater(count, 0)
+            self.assertGreaterEqual(probability, 0)
+
+    def test_solve__certain_outcomes(self):
+        # zombies with the lowest chance never bite
+        self.assertAlmostEqual(solve(5, 2, hit_chance=99, zombify_chance=1).win_probability, 1)
+        self.assertEqual(solve(0, 2, hit_chance=50, zombify_chance=50).outcomes, {('survivors', 2): 1.0})
+
+    def test_solve__matches_simulation(self):
+        result = solve(zombie_count=3, survivor_count=1, hit_chance=50, zombify_chance=40)
+
+        runs = simulate_many(dict(zombie_count=3, survivor_count=1, hit_chance=50, zombify_chance=40),
+                             runs=4000, seed=9, engine='turns')
+        win_rate = sum(run.winner == 'survivors' for run in runs) / len(runs)
+
+        self.assertAlmostEqual(result.win_probability, win_rate, delta=0.03)
+
+    def test_solve_game(self):
+        game = ZombieSurvival()
+        game.events = EventSink(Verbosity.SILENT)
+
+        self.assertEqual(solve_game(game), solve(20, 5, 60, 30))
+
+        game.armor_variety = 2
+        with self.assertRaises(ValueError):
+            solve_game(game)
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from typing import Dict
+from unittest import TestCase
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only the interactive menu and name generation need these
+INTERACTIVE_MODULES = ('PyInquirer', 'prompt_toolkit', 'names')
+# Generous on purpose, a worker process spending more than this on imports got something heavy again
+IMPORT_BUDGET = 2.0  # seconds
+
+
+def import_times(module: str) -> Dict[str, float]:
+    """ Cumulative import time in seconds of every module a fresh interpreter loads for `import module` """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    times = dict()
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+class StartupTest(TestCase):
+
+    def test_headless_imports(self):
+        for module in ('main', 'simulation', 'cli'):
+            with self.subTest(module=module):
+                times = import_times(module)
+
+                self.assertIn(module, times)
+                for interactive in INTERACTIVE_MODULES:
+                    self.assertNotIn(interactive, times)
+                self.assertLess(times[module], IMPORT_BUDGET)
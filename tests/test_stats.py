@@ -0,0 +1,119 @@
+import math
+import random
+import statistics
+from unittest import TestCase
+
+from models import BattleResult
+from stats import BatchSummary, RunningMean, StreamingStats, linear_edges, wilson_interval, z_score
+
+
+class StatsTest(TestCase):
+
+    def test_z_score(self):
+        self.assertAlmostEqual(z_score(0.95), 1.959964, places=5)
+
+    def test_wilson_interval(self):
+        low, high = wilson_interval(50, 100)
+
+        self.assertAlmostEqual(low, 0.4038, places=4)
+        self.assertAlmostEqual(high, 0.5962, places=4)
+
+    def test_wilson_interval__edges(self):
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+        low, high = wilson_interval(0, 20)
+        self.assertAlmostEqual(low, 0.0)
+        self.assertGreater(high, 0.0)
+        low, high = wilson_interval(20, 20)
+        self.assertLess(low, 1.0)
+        self.assertAlmostEqual(high, 1.0)
+
+    def test_running_mean(self):
+        values = [3, 1, 4, 1, 5, 9, 2, 6]
+        running = RunningMean()
+        for value in values:
+            running.add(value)
+
+        self.assertEqual(running.count, 8)
+        self.assertAlmostEqual(running.mean, statistics.mean(values))
+        self.assertAlmostEqual(running.variance, statistics.variance(values))
+        self.assertAlmostEqual(running.half_width(), 1.959964 * statistics.stdev(values) / 8 ** 0.5, places=5)
+
+    def test_running_mean__too_few(self):
+        running = RunningMean()
+        running.add(1)
+
+        self.assertEqual(running.variance, 0.0)
+        self.assertEqual(running.half_width(), float('inf'))
+
+
+class StreamingStatsTest(TestCase):
+
+    def test_add(self):
+        values = [0.5, 2.5, 2.7, 9.9, 4.2]
+        stats = StreamingStats(linear_edges(0, 10, 5))
+        stats.extend(values)
+
+        self.assertEqual(stats.counts, [1, 2, 1, 0, 1])
+        self.assertEqual((stats.minimum, stats.maximum), (0.5, 9.9))
+        self.assertAlmostEqual(stats.mean, statistics.mean(values))
+        self.assertAlmostEqual(stats.variance, statistics.variance(values))
+
+    def test_add__outside_the_bins(self):
+        stats = StreamingStats(linear_edges(0, 10, 5))
+        stats.extend([-3, 42])
+
+        self.assertEqual(stats.counts, [1, 0, 0, 0, 1])
+        self.assertEqual(stats.quantile(1), 42)
+
+    def test_merge(self):
+        values = [random.Random(number).uniform(0, 100) for number in range(1000)]
+        first, second = StreamingStats(linear_edges(0, 100, 20)), StreamingStats(linear_edges(0, 100, 20))
+        first.extend(values[:300])
+        second.extend(values[300:])
+        everything = StreamingStats(linear_edges(0, 100, 20))
+        everything.extend(values)
+
+        first.merge(second)
+
+        self.assertEqual(first.count, 1000)
+        self.assertAlmostEqual(first.mean, everything.mean)
+        self.assertAlmostEqual(first.variance, everything.variance)
+        self.assertEqual(first.counts, everything.counts)
+        self.assertEqual((first.minimum, first.maximum), (min(values), max(values)))
+
+    def test_merge__different_bins(self):
+        with self.assertRaises(ValueError):
+            StreamingStats(linear_edges(0, 10, 5)).merge(StreamingStats(linear_edges(0, 10, 2)))
+
+    def test_quantile(self):
+        values = [random.Random(number).uniform(0, 100) for number in range(5000)]
+        stats = StreamingStats(linear_edges(0, 100, 50))
+        stats.extend(values)
+
+        for q in (0.1, 0.5, 0.9):
+            self.assertAlmostEqual(stats.quantile(q), statistics.quantiles(values, n=10)[int(q * 10) - 1], delta=2)
+        self.assertTrue(math.isnan(StreamingStats(linear_edges(0, 1, 1)).quantile(0.5)))
+
+    def test_quantile__integer(self):
+        stats = StreamingStats(linear_edges(0, 4, 4), integer=True)
+        stats.extend([0] * 9 + [3])
+
+        self.assertEqual(stats.quantile(0.5), 0)
+        self.assertEqual(stats.quantile(1), 3)
+
+
+class BatchSummaryTest(TestCase):
+
+    def test_add_merge(self):
+        first, second = BatchSummary(zombie_count=10, survivor_count=2), BatchSummary(zombie_count=10, survivor_count=2)
+        first.add(BattleResult(winner='survivors', survivors_left=2, zombies_left=0, duration=0.1), kills=[4, 6])
+        second.add(BattleResult(winner='zombies', survivors_left=0, zombies_left=7, duration=0.3), kills=[1, 2])
+        second.add(BattleResult(winner='zombies', survivors_left=0, zombies_left=5, duration=0.2))
+
+        first.merge(second)
+
+        self.assertEqual(first.runs, 3)
+        self.assertAlmostEqual(first.win_rate, 1 / 3)
+        self.assertAlmostEqual(first.zombies_left.mean, 4)
+        self.assertAlmostEqual(first.kills.mean, 13 / 4)
+        self.assertEqual(first.to_dict()['zombies_left']['max'], 7)
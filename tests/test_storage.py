@@ -0,0 +1,90 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from models import BattleResult
+from storage import ResultStore, ResultWriter
+
+
+def result(number: int) -> BattleResult:
+    if number % 2:
+        return BattleResult(winner='zombies', survivors_left=0, zombies_left=number, duration=number / 10)
+    return BattleResult(winner='survivors', survivors_left=number, zombies_left=0, duration=number / 10)
+
+
+class ResultStoreTest(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_roundtrip(self):
+        with ResultWriter(self.directory.name, buffer_size=3) as writer:
+            self.assertEqual(writer.extend(result(number) for number in range(10)), 10)
+
+        store = ResultStore(self.directory.name)
+
+        self.assertEqual(len(store), 10)
+        self.assertEqual(list(store), [result(number) for number in range(10)])
+        self.assertEqual(store[-1], result(9))
+        with self.assertRaises(IndexError):
+            store[10]
+
+    def test_columns__plain_npy_and_memory_mapped(self):
+        with ResultWriter(self.directory.name) as writer:
+            writer.extend(result(number) for number in range(4))
+
+        store = ResultStore(self.directory.name)
+
+        self.assertIsInstance(store.columns['zombies_left'], np.memmap)
+        np.testing.assert_array_equal(np.load(os.path.join(self.directory.name, 'zombies_left.npy')), [0, 1, 0, 3])
+
+    def test_writer__flushed_rows_visible(self):
+        writer = ResultWriter(self.directory.name, buffer_size=2)
+        writer.extend(result(number) for number in range(3))
+
+        self.assertEqual(len(ResultStore(self.directory.name)), 2)
+        writer.close()
+        self.assertEqual(len(ResultStore(self.directory.name)), 3)
+
+    def test_writer__appends(self):
+        with ResultWriter(self.directory.name) as writer:
+            writer.extend(result(number) for number in range(2))
+        with ResultWriter(self.directory.name) as writer:
+            writer.append(result(2))
+
+        self.assertEqual(list(ResultStore(self.directory.name)), [result(0), result(1), result(2)])
+
+    def test_writer__drops_torn_rows(self):
+        with ResultWriter(self.directory.name) as writer:
+            writer.extend(result(number) for number in range(2))
+        # A crash in the middle of a flush leaves some columns longer than the others
+        with open(os.path.join(self.directory.name, 'winner.npy'), 'ab') as column_file:
+            column_file.write(b'\x01')
+
+        with ResultWriter(self.directory.name) as writer:
+            self.assertEqual(writer.count, 2)
+            writer.append(result(3))
+
+        self.assertEqual(list(ResultStore(self.directory.name)), [result(0), result(1), result(3)])
+
+    def test_summary(self):
+        with ResultWriter(self.directory.name) as writer:
+            writer.extend(result(number) for number in range(5))
+
+        summary = ResultStore(self.directory.name).summary(chunk_size=2)
+
+        self.assertEqual(summary['runs'], 5)
+        self.assertEqual(summary['survivor_wins'], 3)
+        self.assertAlmostEqual(summary['mean_survivors_left'], 6 / 5)
+        self.assertAlmostEqual(summary['mean_zombies_left'], 4 / 5)
+        self.assertAlmostEqual(summary['mean_duration'], 1 / 5)
+
+    def test_summary__empty(self):
+        ResultWriter(self.directory.name).close()
+
+        self.assertEqual(ResultStore(self.directory.name).summary()['runs'], 0)
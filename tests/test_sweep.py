@@ -0,0 +1,107 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from models import BattleResult
+from simulation import simulate_many, simulate_once
+from sweep import ResultCache, expand_grid, sweep
+
+
+class ExpandGridTest(TestCase):
+
+    def test_expand_grid(self):
+        points = expand_grid(dict(hit_chance=[40, 60], zombie_count=[5, 10, 20]))
+
+        self.assertEqual(len(points), 6)
+        self.assertEqual(points[0], dict(hit_chance=40, zombie_count=5))
+        self.assertEqual(points[-1], dict(hit_chance=60, zombie_count=20))
+
+
+class ResultCacheTest(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_key(self):
+        key = ResultCache.key(dict(hit_chance=40, zombie_count=5), 'turns', 1, 3)
+
+        self.assertEqual(key, ResultCache.key(dict(zombie_count=5, hit_chance=40), 'turns', 1, 3))
+        self.assertNotEqual(key, ResultCache.key(dict(hit_chance=40, zombie_count=5), 'turns', 2, 3))
+        self.assertNotEqual(key, ResultCache.key(dict(hit_chance=40, zombie_count=5), 'pool', 1, 3))
+        with patch('sweep.ENGINE_VERSION', -1):
+            self.assertNotEqual(key, ResultCache.key(dict(hit_chance=40, zombie_count=5), 'turns', 1, 3))
+
+    def test_put_get(self):
+        results = [BattleResult(winner='zombies', survivors_left=0, zombies_left=3, duration=0.5)]
+
+        self.cache.put('foo', results)
+
+        self.assertEqual(self.cache.get('foo'), results)
+        self.assertIsNone(self.cache.get('bar'))
+
+    def test_evict__least_recently_used(self):
+        results = [BattleResult(winner='zombies', survivors_left=0, zombies_left=3, duration=0.5)]
+        for key in ('old', 'used', 'new'):
+            self.cache.put(key, results)
+        os.utime(os.path.join(self.directory.name, 'old.json'), (1, 1))
+        os.utime(os.path.join(self.directory.name, 'used.json'), (2, 2))
+        self.cache.get('used')
+
+        self.cache.max_bytes = self.cache.nbytes - 1
+        self.cache.evict()
+
+        self.assertIsNone(self.cache.get('old'))
+        self.assertIsNotNone(self.cache.get('used'))
+        self.assertIsNotNone(self.cache.get('new'))
+
+
+class SweepTest(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_sweep__only_missing_points(self):
+        grid = dict(zombie_count=[5], survivor_count=[1, 2])
+        first = sweep(grid, runs=2, engine='turns', seed=3, cache=self.cache, parallel=False)
+
+        extended = dict(zombie_count=[5], survivor_count=[1, 2, 3])
+        with patch('sweep.simulate_once', wraps=simulate_once) as mock_simulate:
+            second = sweep(extended, runs=2, engine='turns', seed=3, cache=self.cache, parallel=False)
+
+        self.assertEqual([point.cached for point in first], [False, False])
+        self.assertEqual([point.cached for point in second], [True, True, False])
+        self.assertEqual(mock_simulate.call_count, 2)
+        self.assertEqual(
+            [result.zombies_left for result in second[0].results],
+            [result.zombies_left for result in first[0].results]
+        )
+
+    def test_sweep__matches_simulate_many(self):
+        points = sweep(dict(zombie_count=[6]), runs=3, engine='turns', seed=4, parallel=False)
+
+        expected = simulate_many(dict(zombie_count=6), runs=3, engine='turns', seed=4)
+        self.assertEqual(
+            [(r.winner, r.survivors_left, r.zombies_left) for r in points[0].results],
+            [(r.winner, r.survivors_left, r.zombies_left) for r in expected]
+        )
+
+    def test_sweep__parallel(self):
+        points = sweep(dict(hit_chance=[40, 60]), runs=2, engine='turns', seed=5, cache=self.cache, max_workers=2)
+
+        again = sweep(dict(hit_chance=[40, 60]), runs=2, engine='turns', seed=5, cache=self.cache)
+
+        self.assertEqual([len(point.results) for point in points], [2, 2])
+        self.assertEqual([point.cached for point in again], [True, True])
+
+    def test_sweep__unknown_engine(self):
+        with self.assertRaises(ValueError):
+            sweep(dict(hit_chance=[40]), engine='foo')
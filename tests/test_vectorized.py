@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+import numpy as np
+
+from main import ZombieSurvival
+from models import BattleResult
+from vectorized import VectorizedBattle
+
+
+class VectorizedBattleTest(TestCase):
+
+    def test___init__(self):
+        battle = VectorizedBattle(zombie_count=4, survivor_count=3, hit_chance=150, zombify_chance=-5)
+
+        self.assertEqual(battle.horde_size, 4)
+        self.assertEqual(battle.horde.size, 4 + 3)
+        self.assertTrue(np.all(battle.horde[:4] == 1))  # clipped like Humanoid.hit_chance
+        self.assertTrue(np.all(battle.survivors.hit_chance(slice(None)) == 99))
+        self.assertTrue(np.all(battle.survivors.defense_modifier == 0))
+        self.assertFalse(battle.survivors.evaded.any())
+        self.assertFalse(battle.survivors.zombie.any())
+
+    def test___init____varieties(self):
+        battle = VectorizedBattle(
+            zombie_count=500, survivor_count=500, hit_chance=50, zombify_chance=50,
+            zombie_variety=5, weapon_variety=10, armor_variety=7
+        )
+
+        zombies = battle.horde[:500]
+        self.assertTrue(np.all((zombies >= 45) & (zombies <= 55)))
+        survivor_hit = battle.survivors.hit_chance(slice(None))
+        self.assertTrue(np.all((survivor_hit >= 50) & (survivor_hit <= 60)))
+        defense = battle.survivors.defense_modifier
+        self.assertTrue(np.all((defense >= 0) & (defense <= 7)))
+
+    def test_from_game(self):
+        game = ZombieSurvival()
+        game.zombie_count = 7
+        game.survivor_count = 2
+
+        battle = VectorizedBattle.from_game(game)
+
+        self.assertEqual(battle.horde_size, 7)
+        self.assertEqual(len(battle.survivors), 2)
+
+    def test_run__survivors_always_hit(self):
+        battle = VectorizedBattle(zombie_count=10, survivor_count=3, hit_chance=99, zombify_chance=1)
+        battle.survivors.hit_modifier[:] = 2  # 99 + 2, every roll hits
+
+        result = battle.run()
+
+        self.assertEqual(result, BattleResult('survivors', 3, 0, result.duration))
+        self.assertEqual(battle.attacks, 10)
+        self.assertEqual(battle.rounds, 4)
+
+    def test_run__zombies_always_bite(self):
+        battle = VectorizedBattle(zombie_count=2, survivor_count=5, hit_chance=1, zombify_chance=99)
+        battle.survivors.base_chance[:] = 1  # never hits
+        battle.horde[:] = 101  # always bites
+
+        result = battle.run()
+
+        self.assertEqual(result.winner, 'zombies')
+        self.assertEqual(result.survivors_left, 0)
+        self.assertEqual(result.zombies_left, 2 + 5)
+        self.assertTrue(battle.survivors.zombie.all())
+
+    def test_run__evade_bonus(self):
+        battle = VectorizedBattle(zombie_count=1, survivor_count=1, hit_chance=1, zombify_chance=1)
+        battle.survivors.hit_modifier[:] = -1  # never hits
+        battle.horde[:] = 0  # never bites, so the survivor evades
+
+        battle._fight_round()
+        self.assertTrue(battle.survivors.evaded[0])
+        self.assertEqual(battle.horde_size, 1)
+
+        battle.survivors.base_chance[:] = 98
+        battle.survivors.hit_modifier[:] = 0  # 98 + 3 always hits
+        result = battle.run()
+        self.assertEqual(result.winner, 'survivors')
+
+    def test_run__consistent_counts(self):
+        for _ in range(20):
+            result = VectorizedBattle(zombie_count=50, survivor_count=10, hit_chance=60, zombify_chance=30).run()
+            if result.winner == 'survivors':
+                self.assertEqual(result.zombies_left, 0)
+            else:
+                self.assertEqual(result.survivors_left, 0)
@@ -0,0 +1,127 @@
+from time import perf_counter
+from typing import Optional
+
+import numpy as np
+
+from models import BattleResult, bound_chance
+from population import Population
+from simulation import battle_settings
+
+__all__ = ['VectorizedBattle']
+
+
+class VectorizedBattle:
+    """
+    Alternative to the thread per survivor fight engine.
+    Every round pairs each living survivor with one zombie from the front of the horde and resolves all
+    survivor attacks and zombie counterattacks with batched random draws, following the rules of `Humanoid`.
+    """
+    rng: np.random.Generator
+    zombify_chance: int
+    zombie_variety: int
+
+    survivors: Population
+
+    # Zombies as ring buffer of their hit chances, missed zombies go back to the end
+    horde: np.ndarray
+    horde_head: int
+    horde_size: int
+
+    rounds: int
+    attacks: int
+
+    def __init__(
+            self,
+            zombie_count: int,
+            survivor_count: int,
+            hit_chance: int,
+            zombify_chance: int,
+            zombie_variety: int = 0,
+            weapon_variety: int = 0,
+            armor_variety: int = 0,
+            rng: Optional[np.random.Generator] = None
+    ):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.zombify_chance = bound_chance(zombify_chance)
+        self.zombie_variety = zombie_variety or 0
+
+        self.survivors = Population.create(
+            survivor_count=survivor_count,
+            zombie_count=0,
+            hit_chance=hit_chance,
+            zombify_chance=zombify_chance,
+            weapon_variety=weapon_variety,
+            armor_variety=armor_variety,
+            rng=self.rng
+        )
+
+        # Zombies never outnumber the initial horde plus every survivor turned
+        self.horde = np.empty(zombie_count + survivor_count, dtype=np.int32)
+        self.horde_head = 0
+        self.horde_size = 0
+        self._put_zombies(self._new_zombies(zombie_count))
+
+        self.rounds = 0
+        self.attacks = 0
+
+    @classmethod
+    def from_game(cls, game, rng: Optional[np.random.Generator] = None) -> 'VectorizedBattle':
+        """ Builds a battle from the settings of a `ZombieSurvival` instance """
+        return cls(**battle_settings(game), rng=rng)
+
+    def run(self) -> BattleResult:
+        start_time = perf_counter()
+        while self.horde_size and self._fight_round():
+            pass
+
+        survivors_left = int(np.count_nonzero(~self.survivors.zombie))
+        return BattleResult(
+            winner='survivors' if survivors_left else 'zombies',
+            survivors_left=survivors_left,
+            zombies_left=self.horde_size,
+            duration=perf_counter() - start_time
+        )
+
+    def _fight_round(self) -> bool:
+        """ Resolves one round, returns False once no survivor is left """
+        alive = np.flatnonzero(~self.survivors.zombie)
+        if not alive.size:
+            return False
+
+        count = min(alive.size, self.horde_size)
+        if count < alive.size:
+            # Not enough zombies for everyone, so pick the attackers at random
+            alive = self.rng.choice(alive, size=count, replace=False)
+        zombies = self._take_zombies(count)
+        self.rounds += 1
+        self.attacks += count
+
+        # Survivors attack zombies
+        hits = self.rng.integers(1, 101, count) < self.survivors.hit_chance(alive)
+        missed = ~hits
+        attackers = alive[missed]
+        zombies = zombies[missed]
+        self._put_zombies(zombies)
+
+        # Zombies attack survivors
+        bites = self.rng.integers(1, 101, attackers.size) < zombies - self.survivors.defense_modifier[attackers]
+        bitten = attackers[bites]
+        self.survivors.zombie[bitten] = True
+        self.survivors.evaded[attackers[~bites]] = True
+        self._put_zombies(self._new_zombies(bitten.size))
+        return True
+
+    def _new_zombies(self, count: int) -> np.ndarray:
+        variety = self.zombie_variety
+        return self.zombify_chance + self.rng.integers(-variety, variety + 1, count)
+
+    def _take_zombies(self, count: int) -> np.ndarray:
+        index = (self.horde_head + np.arange(count)) % self.horde.size
+        self.horde_head = (self.horde_head + count) % self.horde.size
+        self.horde_size -= count
+        return self.horde[index]
+
+    def _put_zombies(self, hit_chances: np.ndarray) -> None:
+        index = (self.horde_head + self.horde_size + np.arange(hit_chances.size)) % self.horde.size
+        self.horde[index] = hit_chances
+        self.horde_size += hit_chances.size